@@ -0,0 +1,52 @@
+"""Заранее отрисованные анимации для индикаторов записи и отсчета"""
+import pygame
+
+
+class SpriteAnimation:
+    """Кадры анимации в одном листе спрайтов; отрисовка кадра — один blit"""
+
+    def __init__(self, sheet, frame_size):
+        self.sheet = sheet
+        self.frame_size = frame_size
+        width, height = frame_size
+        count = sheet.get_width() // width
+        self.frames = [sheet.subsurface((i * width, 0, width, height)) for i in range(count)]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        """Кадр по номеру (номер берется по модулю числа кадров)"""
+        return self.frames[index % len(self.frames)]
+
+    def rect(self, center):
+        """Прямоугольник, который занимает кадр с центром в center"""
+        rect = pygame.Rect((0, 0), self.frame_size)
+        rect.center = center
+        return rect
+
+    def draw(self, surface, center, index):
+        """Отрисовка кадра index с центром в center"""
+        width, height = self.frame_size
+        return surface.blit(self.frame(index), (center[0] - width // 2, center[1] - height // 2))
+
+
+def pulse_animation(radius=20, steps=10, rings=5, ring_step=3, color=(255, 0, 0)):
+    """Пульсирующий круг: ядро radius и затухающие кольца, растущие на steps кадров"""
+    outer = radius + steps - 1 + (rings - 1) * ring_step
+    size = outer * 2
+    sheet = pygame.Surface((size * steps, size), pygame.SRCALPHA).convert_alpha()
+    sheet.fill((0, 0, 0, 0))
+
+    for step in range(steps):
+        frame = sheet.subsurface((step * size, 0, size, size))
+        base = radius + step
+        for r in range(base, base + rings * ring_step, ring_step):
+            alpha = 150 - (r - base) * 10
+            if alpha > 0:
+                ring = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+                pygame.draw.circle(ring, (*color, alpha), (r, r), r)
+                frame.blit(ring, (outer - r, outer - r))
+        pygame.draw.circle(frame, color, (outer, outer), radius)
+
+    return SpriteAnimation(sheet, (size, size))
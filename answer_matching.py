@@ -0,0 +1,188 @@
+"""Сопоставление вариантов распознавания с ответами категории"""
+import re
+from functools import lru_cache
+
+_NON_LETTERS = re.compile(r"[^a-zа-я0-9 ]+")
+_ARTICLES = {"a", "an", "the"}
+
+# Упрощенная фонетика: близкие по звучанию буквы сводятся к одному ключу
+_EN_DIGRAPHS = [("tch", "ch"), ("ph", "f"), ("ck", "k"), ("gh", ""), ("wh", "w"), ("qu", "kw"),
+                ("sh", "x"), ("ch", "x"), ("th", "0"), ("dg", "j")]
+_EN_START = [("kn", "n"), ("wr", "r"), ("ps", "s")]
+_EN_LETTERS = str.maketrans({"q": "k", "x": "ks", "z": "s", "v": "f"})
+_RU_LETTERS = str.maketrans({
+    "б": "п", "в": "ф", "г": "к", "д": "т", "ж": "ш", "з": "с", "щ": "ш",
+    "о": "а", "я": "а", "е": "и", "э": "и", "ы": "и", "ю": "у", "ь": None, "ъ": None, "й": "и",
+})
+
+
+def normalize(text):
+    """Нижний регистр, е вместо ё, без пунктуации и артиклей"""
+    text = _NON_LETTERS.sub(" ", text.lower().replace("ё", "е"))
+    return " ".join(word for word in text.split() if word not in _ARTICLES)
+
+
+def _collapse(key):
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+def phonetic_key(word, language="en"):
+    """Фонетический ключ слова"""
+    if language == "ru":
+        return _collapse(word.translate(_RU_LETTERS))
+    for prefix, replacement in _EN_START:
+        if word.startswith(prefix):
+            word = replacement + word[len(prefix):]
+    for digraph, replacement in _EN_DIGRAPHS:
+        word = word.replace(digraph, replacement)
+    word = re.sub(r"c(?=[eiy])", "s", word).replace("c", "k").translate(_EN_LETTERS)
+    # Гласные важны только в начале слова
+    key = word[:1].translate(str.maketrans("eiouy", "aaaaa")) + re.sub(r"[aeiouy]", "", word[1:])
+    return _collapse(key)
+
+
+def _stems(word, language):
+    """Формы слова без окончаний множественного числа"""
+    stems = [word]
+    if language == "en":
+        if word.endswith("ies") and len(word) > 4:
+            stems.append(word[:-3] + "y")
+        if word.endswith("es") and len(word) > 3:
+            stems.append(word[:-2])
+        if word.endswith("s") and len(word) > 2:
+            stems.append(word[:-1])
+    return stems
+
+
+def _deletes(word, distance):
+    """Все строки, получаемые из word удалением не более distance букв"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a, b, limit):
+    """Расстояние Левенштейна или limit + 1, если оно больше limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_distance(word):
+    """Допустимое число опечаток: короткие слова сравниваются только точно и по звучанию"""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 7 else 2
+
+
+class AnswerIndex:
+    """Индекс ответов категории: нормализованные формы, фонетические ключи
+    и удаления букв для поиска с ограниченным расстоянием редактирования.
+    Строится один раз; проверка варианта — несколько обращений к словарям.
+    """
+
+    def __init__(self, answers, language="en"):
+        self.language = language
+        self.exact = {}
+        self.phonetic = {}
+        self.deletes = {}
+        # Число слов в ответах, от длинных фраз к коротким
+        self.lengths = sorted({len(normalize(answer).split()) for answer in answers}, reverse=True)
+        for answer in answers:
+            form = normalize(answer)
+            self.exact[form] = answer
+            self.phonetic.setdefault(phonetic_key(form, language), set()).add(answer)
+            for deleted in _deletes(form, max_distance(form)):
+                self.deletes.setdefault(deleted, set()).add(form)
+        # Неоднозначные фонетические ключи не используются
+        self.phonetic = {key: next(iter(found)) for key, found in self.phonetic.items() if len(found) == 1}
+
+    def match(self, text):
+        """Ответ категории, которому соответствует text, или None.
+
+        Сначала проверяется весь text, затем фразы из стольких же слов
+        подряд, сколько их в ответах категории (например, "ice cream" в
+        "I want ice cream").
+        """
+        form = normalize(text)
+        if not form:
+            return None
+        words = form.split()
+        candidates = [form] + [" ".join(words[i:i + n]) for n in self.lengths if n < len(words)
+                               for i in range(len(words) - n + 1)]
+        for candidate in candidates:
+            for stem in _stems(candidate, self.language):
+                answer = self._match_word(stem)
+                if answer is not None:
+                    return answer
+        return None
+
+    def match_any(self, alternatives, expected=None):
+        """Ответ категории по n-best вариантам: (ответ, вариант) или None.
+
+        Если какой-либо вариант совпал с expected, возвращается он, иначе —
+        первый совпавший вариант.
+        """
+        first = None
+        for alternative in alternatives:
+            answer = self.match(alternative)
+            if answer is None:
+                continue
+            if expected is None or answer == expected:
+                return answer, alternative
+            if first is None:
+                first = answer, alternative
+        return first
+
+    def _match_word(self, word):
+        if word in self.exact:
+            return self.exact[word]
+        answer = self.phonetic.get(phonetic_key(word, self.language))
+        if answer is not None:
+            return answer
+
+        limit = max_distance(word)
+        best, best_distance, tie = None, limit + 1, False
+        candidates = set()
+        for deleted in _deletes(word, limit):
+            candidates |= self.deletes.get(deleted, set())
+        for form in candidates:
+            distance = edit_distance(word, form, min(limit, max_distance(form)))
+            if distance < best_distance:
+                best, best_distance, tie = form, distance, False
+            elif distance == best_distance:
+                tie = True
+        if best is None or tie:
+            return None
+        return self.exact[best]
+
+
+@lru_cache(maxsize=64)
+def _cached_index(answers, language):
+    return AnswerIndex(answers, language)
+
+
+def answer_index(answers, language="en"):
+    """Индекс для набора ответов; для одной категории строится один раз"""
+    return _cached_index(tuple(answers), language)
+
+
+def resolve_answer(alternatives, answers, language="en", expected=None):
+    """Ответ категории из n-best вариантов или лучший вариант, если совпадений нет"""
+    if not alternatives:
+        return None
+    matched = answer_index(answers, language).match_any(alternatives, expected)
+    if matched is not None:
+        return matched[0]
+    return alternatives[0].lower()
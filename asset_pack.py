@@ -0,0 +1,173 @@
+"""Файл-пакет ресурсов: словарь каждой категории и уже декодированные пиксели изображений.
+
+Формат (все числа little-endian):
+
+    MAGIC (4 байта) | версия (uint16) | резерв (uint16) | длина индекса (uint32) |
+    начало пикселей (uint64) | индекс (JSON) | блоки категорий (JSON) |
+    пиксели RGB, каждое изображение выровнено по PIXEL_ALIGN
+
+Индекс содержит только названия категорий, число слов и картинок и
+положение блока каждой категории, поэтому открытие пакета не зависит от числа категорий.
+Блок категории хранит слова и положение пикселей каждого изображения.
+Пакет читается через mmap: несколько запущенных игр делят страничный кэш,
+а поверхности pygame создаются прямо из отображенных байтов.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+
+MAGIC = b"SGPK"
+VERSION = 2
+PIXEL_ALIGN = 64
+_HEADER = struct.Struct("<4sHHIQ")
+
+VOCABULARY_FILE = os.path.join("data", "vocabulary.json")
+PACK_FILE = os.path.join("images", "build", "assets.pack")
+
+
+class PackError(Exception):
+    """Файл пакета отсутствует или поврежден"""
+
+
+def load_vocabulary_file(path=VOCABULARY_FILE):
+    """Категории из файла словаря"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["categories"]
+
+
+def _pixels(image_path):
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        image = image.convert("RGB")
+        return image.width, image.height, image.tobytes()
+
+
+def write_pack(categories, image_path, path=PACK_FILE):
+    """Запись пакета.
+
+    categories — категории в формате data/vocabulary.json, image_path —
+    функция, возвращающая путь к файлу изображения по его имени или None.
+    """
+    blocks = []
+    pixel_data = []
+    pixel_offset = 0
+    for category_id, category in categories.items():
+        images = {}
+        for word in category["words"]:
+            source = image_path(word["image"]) if word.get("image") else None
+            if not source:
+                continue
+            width, height, data = _pixels(source)
+            padding = -pixel_offset % PIXEL_ALIGN
+            pixel_data.append(b"\0" * padding)
+            pixel_offset += padding
+            images[word["ru"]] = {"offset": pixel_offset, "width": width, "height": height}
+            pixel_data.append(data)
+            pixel_offset += len(data)
+        blocks.append(json.dumps({"words": category["words"], "images": images}, ensure_ascii=False).encode("utf-8"))
+
+    # Смещения блоков отсчитываются от конца индекса, пикселей — от начала их области
+    index = {}
+    block_offset = 0
+    for (category_id, category), block in zip(categories.items(), blocks):
+        index[category_id] = {"name": category["name"], "count": len(category["words"]),
+                              "images": sum(1 for word in category["words"] if word.get("image")),
+                              "block": [block_offset, len(block)]}
+        block_offset += len(block)
+    index_bytes = json.dumps({"categories": index}, ensure_ascii=False).encode("utf-8")
+    pixels_start = _HEADER.size + len(index_bytes) + block_offset
+    pixels_start += -pixels_start % PIXEL_ALIGN
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(index_bytes), pixels_start))
+        f.write(index_bytes)
+        for block in blocks:
+            f.write(block)
+        f.write(b"\0" * (pixels_start - f.tell()))
+        for chunk in pixel_data:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class AssetPack:
+    """Пакет ресурсов, открытый через mmap.
+
+    categories() читает только индекс; слова и поверхности категории
+    создаются при первом обращении к ней (load_category).
+    """
+
+    def __init__(self, path=PACK_FILE):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise PackError(f"не удалось открыть {path}: {e}")
+        if len(self._map) < _HEADER.size:
+            raise PackError(f"{path}: файл поврежден")
+        magic, version, _, index_length, self._pixels_start = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise PackError(f"{path}: неизвестный формат")
+        self._index = json.loads(bytes(self._map[_HEADER.size:_HEADER.size + index_length]))
+        self._blocks_start = _HEADER.size + index_length
+        self._view = memoryview(self._map)
+        self._categories = {}
+        self._surfaces = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path=PACK_FILE):
+        """Пакет или None, если его еще не собрали (python assets.py)"""
+        try:
+            return cls(path)
+        except PackError as e:
+            print(f"⚠️ Пакет ресурсов недоступен: {e}")
+            return None
+
+    def categories(self):
+        """Словарь id -> {"name", "count", "images"} без загрузки самих категорий"""
+        return {category_id: {"name": entry["name"], "count": entry["count"], "images": entry["images"]}
+                for category_id, entry in self._index["categories"].items()}
+
+    def category(self, category_id):
+        """Слова и положение изображений категории"""
+        with self._lock:
+            if category_id not in self._categories:
+                offset, length = self._index["categories"][category_id]["block"]
+                start = self._blocks_start + offset
+                self._categories[category_id] = json.loads(bytes(self._view[start:start + length]))
+            return self._categories[category_id]
+
+    def pixels(self, category_id, word_ru):
+        """(ширина, высота, memoryview RGB) изображения слова или None"""
+        image = self.category(category_id)["images"].get(word_ru)
+        if image is None:
+            return None
+        start = self._pixels_start + image["offset"]
+        end = start + image["width"] * image["height"] * 3
+        return image["width"], image["height"], self._view[start:end]
+
+    def load_category(self, category_id):
+        """Поверхности pygame всех изображений категории: {русское слово: Surface}"""
+        import pygame
+
+        with self._lock:
+            surfaces = self._surfaces.get(category_id)
+        if surfaces is not None:
+            return surfaces
+        surfaces = {}
+        for word_ru in self.category(category_id)["images"]:
+            width, height, data = self.pixels(category_id, word_ru)
+            # Поверхность ссылается на отображенные байты без копирования
+            surfaces[word_ru] = pygame.image.frombuffer(data, (width, height), "RGB")
+        with self._lock:
+            self._surfaces[category_id] = surfaces
+        return surfaces
+
+    def surface(self, category_id, word_ru):
+        """Поверхность изображения слова или None"""
+        return self.load_category(category_id).get(word_ru)
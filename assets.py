@@ -0,0 +1,220 @@
+"""Подготовка изображений: уменьшение до размера показа и манифест собранных файлов.
+
+Сборка изображений и пакета ресурсов (повторный запуск обрабатывает только
+измененные исходники):
+
+    python assets.py
+"""
+import hashlib
+import json
+import os
+import sys
+
+IMAGES_DIR = "images"
+BUILD_DIR = os.path.join(IMAGES_DIR, "build")
+MANIFEST_FILE = os.path.join(BUILD_DIR, "manifest.json")
+MANIFEST_VERSION = 1
+
+# Самый крупный размер показа: 600x450 в speaking_game_2 (в speaking_game_3 — 400x300)
+MAX_SIZE = (600, 450)
+# BMP загружается pygame без декодирования
+OUTPUT_FORMAT = "BMP"
+OUTPUT_EXTENSION = ".bmp"
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".avif", ".bmp", ".gif")
+
+
+def file_checksum(path):
+    """SHA-1 содержимого файла"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """Манифест сборки или пустой манифест, если сборки еще не было"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (FileNotFoundError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "max_size": list(MAX_SIZE), "images": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """Атомарная запись манифеста"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _source_changed(entry, source, stat, output):
+    if entry is None or not os.path.exists(output):
+        return True
+    if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+        return False
+    # Время изменилось, а содержимое нет (например, после git checkout)
+    return entry["checksum"] != file_checksum(source)
+
+
+def build(images_dir=IMAGES_DIR, build_dir=BUILD_DIR, max_size=MAX_SIZE, force=False):
+    """Уменьшает все изображения images_dir и обновляет манифест; возвращает (собрано, пропущено)"""
+    from PIL import Image
+
+    os.makedirs(build_dir, exist_ok=True)
+    manifest_path = os.path.join(build_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    if manifest.get("max_size") != list(max_size):
+        force = True
+    manifest["max_size"] = list(max_size)
+
+    built, skipped = [], []
+    changed = force or not os.path.exists(manifest_path)
+    sources = sorted(name for name in os.listdir(images_dir) if name.lower().endswith(SOURCE_EXTENSIONS))
+    for name in sources:
+        source = os.path.join(images_dir, name)
+        output_name = os.path.splitext(name)[0] + OUTPUT_EXTENSION
+        output = os.path.join(build_dir, output_name)
+        stat = os.stat(source)
+        entry = manifest["images"].get(name)
+        if not force and not _source_changed(entry, source, stat, output):
+            if entry["mtime"] != stat.st_mtime:
+                entry["mtime"] = stat.st_mtime
+                changed = True
+            skipped.append(name)
+            continue
+
+        try:
+            with Image.open(source) as image:
+                image = image.convert("RGB")
+                image.thumbnail(max_size, Image.LANCZOS)
+                image.save(output, OUTPUT_FORMAT)
+        except OSError as e:
+            print(f"❌ {name}: {e}")
+            changed = changed or manifest["images"].pop(name, None) is not None
+            continue
+        manifest["images"][name] = {
+            "output": output_name,
+            "width": image.width,
+            "height": image.height,
+            "checksum": file_checksum(source),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+        built.append(name)
+
+    # Удаленные исходники убираются из манифеста вместе с собранными файлами
+    for name in set(manifest["images"]) - set(sources):
+        stale_output = os.path.join(build_dir, manifest["images"].pop(name)["output"])
+        if os.path.exists(stale_output):
+            os.remove(stale_output)
+        changed = True
+
+    if changed or built:
+        save_manifest(manifest, manifest_path)
+    return built, skipped
+
+
+def built_image_path(name, images_dir=IMAGES_DIR, build_dir=BUILD_DIR):
+    """Путь к собранному изображению, к исходнику, если сборки нет, или None"""
+    built = os.path.join(build_dir, os.path.splitext(name)[0] + OUTPUT_EXTENSION)
+    if os.path.exists(built):
+        return built
+    source = os.path.join(images_dir, name)
+    return source if os.path.exists(source) else None
+
+
+def pack_outdated(pack_path, vocabulary_path):
+    """Нужно ли пересобрать пакет ресурсов (нет, другой формат, старше словаря или манифеста)"""
+    from asset_pack import AssetPack, PackError
+
+    try:
+        AssetPack(pack_path)
+    except PackError:
+        return True
+    pack_mtime = os.stat(pack_path).st_mtime
+    return any(os.stat(path).st_mtime > pack_mtime
+               for path in (vocabulary_path, MANIFEST_FILE) if os.path.exists(path))
+
+
+class AssetIndex:
+    """Сопоставление исходных путей изображений с собранными файлами.
+
+    Проверка выполняется один раз при запуске: отсутствующие исходники и
+    устаревшие или несобранные записи выводятся одним сообщением, а resolve()
+    дальше только смотрит в словарь.
+    """
+
+    def __init__(self, images_dir=IMAGES_DIR, build_dir=BUILD_DIR):
+        self.images_dir = images_dir
+        self.build_dir = build_dir
+        self.manifest = load_manifest(os.path.join(build_dir, "manifest.json"))
+        self.missing = []
+        self.stale = []
+        self.unbuilt = []
+        self._resolved = {}
+
+    def check(self, paths):
+        """Проверка списка путей к изображениям; о каждой проблеме сообщается один раз.
+
+        Возвращает True, если среди новых путей проблем нет.
+        """
+        reported = (len(self.missing), len(self.stale), len(self.unbuilt))
+        for path in paths:
+            if path in self._resolved:
+                continue
+            self._resolved[path] = self._check_one(path)
+
+        missing, stale, unbuilt = (found[count:] for found, count
+                                   in zip((self.missing, self.stale, self.unbuilt), reported))
+        problems = []
+        if missing:
+            problems.append(f"нет файлов: {', '.join(sorted(missing))}")
+        if stale:
+            problems.append(f"устарели: {', '.join(sorted(stale))}")
+        if unbuilt:
+            problems.append(f"не собраны: {', '.join(sorted(unbuilt))}")
+        if problems:
+            print(f"⚠️ Изображения: {'; '.join(problems)}")
+            if stale or unbuilt:
+                print("💡 Запустите 'python assets.py', чтобы пересобрать изображения")
+        return not problems
+
+    def resolve(self, path):
+        """Путь к собранному изображению, к исходнику, если сборки нет, или None"""
+        if path not in self._resolved:
+            self._resolved[path] = self._check_one(path)
+        return self._resolved[path]
+
+    def _check_one(self, path):
+        if not os.path.exists(path):
+            self.missing.append(os.path.basename(path))
+            return None
+        name = os.path.relpath(path, self.images_dir)
+        entry = self.manifest["images"].get(name)
+        output = os.path.join(self.build_dir, entry["output"]) if entry else None
+        if entry is None or not os.path.exists(output):
+            self.unbuilt.append(name)
+            return path
+        stat = os.stat(path)
+        if entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            self.stale.append(name)
+            return path
+        return output
+
+
+if __name__ == "__main__":
+    from asset_pack import PACK_FILE, VOCABULARY_FILE, load_vocabulary_file, write_pack
+
+    force = "--force" in sys.argv[1:]
+    built, skipped = build(force=force)
+    print(f"✅ Собрано изображений: {len(built)}, без изменений: {len(skipped)}")
+    for name in built:
+        print(f"   {name}")
+    if force or built or pack_outdated(PACK_FILE, VOCABULARY_FILE):
+        write_pack(load_vocabulary_file(), built_image_path)
+        print(f"📦 Пакет ресурсов: {PACK_FILE} ({os.path.getsize(PACK_FILE) // 1024} КБ)")
@@ -0,0 +1,250 @@
+"""Запись с микрофона через поток sounddevice с определением конца фразы"""
+import os
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+from scipy.io.wavfile import write
+
+
+class AudioClip:
+    """Записанный ответ в памяти: один буфер для распознавания и анализа"""
+
+    def __init__(self, samples, sample_rate):
+        self.samples = np.ascontiguousarray(samples).reshape(-1)
+        self.sample_rate = sample_rate
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        """Длительность в секундах"""
+        return len(self.samples) / float(self.sample_rate)
+
+    def as_array(self):
+        """Сэмплы как массив NumPy без копирования (только для чтения)"""
+        view = self.samples.view()
+        view.flags.writeable = False
+        return view
+
+    def as_audio_data(self):
+        """Сэмплы как sr.AudioData без копирования буфера"""
+        frame_data = memoryview(self.samples).cast("B")
+        return sr.AudioData(frame_data, self.sample_rate, self.samples.dtype.itemsize)
+
+    def save(self, path):
+        """Сохранение в WAV-файл"""
+        write(path, self.sample_rate, self.samples)
+        return path
+
+    def archive(self, directory, label="answer"):
+        """Сохранение копии ответа в каталог архива"""
+        os.makedirs(directory, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d_%H%M%S')}_{label}.wav"
+        return self.save(os.path.join(directory, filename))
+
+
+class VoiceActivityDetector:
+    """Определение речи по энергии и частоте пересечений нуля в блоках сигнала.
+
+    threshold — порог RMS (доля полной шкалы), max_zcr — доля пересечений нуля,
+    выше которой блок считается шумом. Фраза считается законченной после
+    trailing_silence секунд тишины; всплески короче min_speech игнорируются.
+    С noise_floor порог берется из оценки шума, а обновляют ее только блоки
+    заметно тише порога (не громче NOISE_MARGIN порога) и не сразу после
+    речи, чтобы шумные блоки и затухание слова не поднимали оценку.
+    """
+
+    NOISE_MARGIN = 0.5
+
+    def __init__(self, threshold=0.01, max_zcr=0.45, trailing_silence=0.8, min_speech=0.1, padding=0.15,
+                 noise_floor=None):
+        self.threshold = threshold
+        self.noise_floor = noise_floor
+        self.max_zcr = max_zcr
+        self.trailing_silence = trailing_silence
+        self.min_speech = min_speech
+        self.padding = padding
+        self.reset()
+
+    def reset(self, sample_rate=44100):
+        """Сброс состояния перед новой записью"""
+        self.sample_rate = sample_rate
+        self.position = 0
+        self.speech_start = None
+        self.speech_end = None
+
+    def block_features(self, block):
+        """RMS и доля пересечений нуля для блока сигнала"""
+        samples = block.reshape(-1).astype(np.float32)
+        if np.issubdtype(block.dtype, np.integer):
+            samples /= float(np.iinfo(block.dtype).max) + 1.0
+        if samples.size < 2:
+            return 0.0, 0.0
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        zcr = np.count_nonzero(np.diff(np.signbit(samples))) / float(samples.size - 1)
+        return rms, zcr
+
+    def current_threshold(self):
+        """Текущий порог RMS"""
+        if self.noise_floor is not None:
+            return self.noise_floor.threshold
+        return self.threshold
+
+    def is_speech(self, block):
+        """Есть ли речь в блоке"""
+        rms, zcr = self.block_features(block)
+        return rms > self.current_threshold() and zcr < self.max_zcr
+
+    def update(self, block):
+        """Учитывает очередной блок; возвращает True, когда фраза закончилась"""
+        start = self.position
+        self.position += len(block)
+        rms, zcr = self.block_features(block)
+        threshold = self.current_threshold()
+        speech = rms > threshold and zcr < self.max_zcr
+        if self.noise_floor is not None and rms < threshold * self.NOISE_MARGIN and not self._after_speech(start):
+            self.noise_floor.observe(rms)
+        if speech:
+            if self.speech_start is None:
+                self.speech_start = start
+            self.speech_end = self.position
+            return False
+
+        if self.speech_end is None:
+            return False
+        if self.position - self.speech_end < self.trailing_silence * self.sample_rate:
+            return False
+        if self.speech_end - self.speech_start < self.min_speech * self.sample_rate:
+            # Короткий щелчок, а не речь: ждем дальше
+            self.speech_start = self.speech_end = None
+            return False
+        return True
+
+    def _after_speech(self, position):
+        """Блок попадает в затухание только что закончившейся речи"""
+        return self.speech_end is not None and position - self.speech_end < self.padding * self.sample_rate
+
+    def trim(self, audio_data):
+        """Обрезка тишины в начале и в конце записи"""
+        if self.speech_start is None:
+            return audio_data[:0]
+        pad = int(self.padding * self.sample_rate)
+        return audio_data[max(0, self.speech_start - pad):self.speech_end + pad]
+
+
+def input_device_name():
+    """Имя устройства ввода по умолчанию"""
+    try:
+        import sounddevice as sd
+
+        return sd.query_devices(kind="input")["name"]
+    except Exception:
+        return "default"
+
+
+def measure_ambient(duration=1.0, sample_rate=44100):
+    """Запись фонового шума для калибровки; AudioClip или None"""
+    recorder = StreamRecorder(sample_rate)
+    if not recorder.start(duration):
+        return None
+    recorder.wait(duration + 1)
+    return recorder.stop()
+
+
+class StreamRecorder:
+    """Запись с микрофона в фоне: не блокирует игровой цикл.
+
+    Без vad пишет ровно duration секунд. С vad запись заканчивается после
+    паузы в конце фразы, duration остается жестким ограничением, а тишина
+    по краям обрезается.
+
+    stream_factory создает поток ввода с интерфейсом sd.InputStream; замеры
+    подменяют его вызываемым объектом, который проигрывает записанный звук.
+    """
+
+    stream_factory = None
+
+    def __init__(self, sample_rate=44100, channels=1, dtype="int16", vad=None, block_duration=0.02):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = dtype
+        self.vad = vad
+        self.block_duration = block_duration
+        self._stream = None
+        self._blocks = []
+        self._frames_left = 0
+        self._done = threading.Event()
+
+    @property
+    def active(self):
+        """Идет ли запись"""
+        return self._stream is not None
+
+    @property
+    def finished(self):
+        """Закончилась ли запись (пауза после фразы или лимит времени)"""
+        return self._done.is_set()
+
+    def start(self, duration):
+        """Начало записи не дольше duration секунд; False при ошибке"""
+        self.stop()
+        self._blocks = []
+        self._frames_left = int(duration * self.sample_rate)
+        self._done.clear()
+        if self.vad is not None:
+            self.vad.reset(self.sample_rate)
+        try:
+            # sounddevice нужен только для записи: без PortAudio модуль и VAD импортируются
+            import sounddevice as sd
+
+            stream_factory = self.stream_factory or sd.InputStream
+            self._stream = stream_factory(samplerate=self.sample_rate, channels=self.channels,
+                                           dtype=self.dtype, blocksize=int(self.sample_rate * self.block_duration),
+                                           callback=self._callback)
+            self._stream.start()
+        except Exception as e:
+            print(f"❌ Ошибка записи аудио: {e}")
+            self._stream = None
+            return False
+        return True
+
+    def wait(self, timeout=None):
+        """Ожидание окончания записи; True, если запись закончилась"""
+        return self._done.wait(timeout)
+
+    def stop(self):
+        """Остановка записи; возвращает AudioClip или None, если запись не шла"""
+        if self._stream is None:
+            return None
+        stream, self._stream = self._stream, None
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            print(f"⚠️ Ошибка остановки записи: {e}")
+        if not self._blocks:
+            return AudioClip(np.zeros(0, dtype=self.dtype), self.sample_rate)
+        audio_data = np.concatenate(self._blocks)
+        if self.vad is not None:
+            audio_data = self.vad.trim(audio_data)
+        return AudioClip(audio_data, self.sample_rate)
+
+    def _callback(self, indata, frames, time_info, status):
+        import sounddevice as sd
+
+        if self._done.is_set():
+            raise sd.CallbackStop
+        take = min(frames, self._frames_left)
+        phrase_done = False
+        if take > 0:
+            block = indata[:take].copy()
+            self._blocks.append(block)
+            self._frames_left -= take
+            if self.vad is not None:
+                phrase_done = self.vad.update(block)
+        if phrase_done or self._frames_left <= 0:
+            self._done.set()
+            raise sd.CallbackStop
@@ -0,0 +1,139 @@
+"""Корпус записанных ответов для замеров задержки: каждое слово словаря в четырех вариантах.
+
+Для каждого слова есть WAV-файлы правильного ответа (correct), ответа
+другим словом категории (wrong), тишины (silent) и правильного ответа в
+шумной комнате (noisy); manifest.json описывает файлы. Синтетический
+корпус «произносит» каждое слово тоном своей частоты, поэтому ToneBackend
+распознает его без модели и всегда одинаково. Файлы корпуса можно
+заменить настоящими записями с тем же manifest.json и распознавать их
+настоящим движком (latency.py --recognizer vosk).
+
+    python benchmarks/corpus.py   # создать benchmarks/corpus/
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import speech_recognition as sr
+
+import harness
+
+CORPUS_DIR = os.path.join(harness.ROOT, "benchmarks", "corpus")
+MANIFEST = "manifest.json"
+KINDS = ("correct", "wrong", "silent", "noisy")
+# Версия синтеза: при ее смене корпус создается заново
+VERSION = 1
+
+# Частота «слова» с номером i: BASE_FREQUENCY + i * FREQUENCY_STEP
+BASE_FREQUENCY = 200.0
+FREQUENCY_STEP = 25.0
+# Ответ: пауза перед словом, слово и пауза, по которой запись понимает, что ответ закончен
+LEAD = 0.2
+SPEECH = 0.6
+TRAIL = 1.2
+# Тишина дольше ожидания начала фразы в speaking_game_3 (5 секунд)
+SILENT = 6.0
+ROOM_NOISE = 0.002
+LOUD_NOISE = 0.03
+
+
+def corpus_words():
+    """Все слова словаря по порядку категорий"""
+    from vocabulary import vocabulary
+
+    return [word for category_id in vocabulary.categories() for word in vocabulary.words(category_id)]
+
+
+def frequency(index):
+    return BASE_FREQUENCY + index * FREQUENCY_STEP
+
+
+def utterance(index, noise, seed):
+    """Сигнал ответа словом с номером index на фоне шума"""
+    speech = np.concatenate([np.zeros(int(LEAD * harness.SAMPLE_RATE), dtype=np.int16),
+                             harness.tone(SPEECH, frequency(index)),
+                             np.zeros(int(TRAIL * harness.SAMPLE_RATE), dtype=np.int16)])
+    background = harness.silence(len(speech) / harness.SAMPLE_RATE, noise, seed=seed)
+    return np.clip(speech.astype(np.int32) + background[:len(speech)], -32768, 32767).astype(np.int16)
+
+
+def build(directory=CORPUS_DIR):
+    """Создание корпуса (если его еще нет); возвращает список записей manifest.json"""
+    path = os.path.join(directory, MANIFEST)
+    words = corpus_words()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == VERSION and len(manifest["entries"]) == len(words) * len(KINDS):
+            return manifest["entries"]
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for index, word in enumerate(words):
+        # Неправильный ответ — соседнее слово той же категории
+        same = [i for i, other in enumerate(words) if other.category == word.category]
+        wrong = same[(same.index(index) + 1) % len(same)]
+        signals = {
+            "correct": utterance(index, ROOM_NOISE, seed=index),
+            "wrong": utterance(wrong, ROOM_NOISE, seed=index),
+            "silent": harness.silence(SILENT, ROOM_NOISE, seed=index),
+            "noisy": utterance(index, LOUD_NOISE, seed=index),
+        }
+        for kind in KINDS:
+            name = f"{word.category}_{index:03d}_{kind}.wav"
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(harness.wav_bytes(signals[kind]))
+            entries.append({"file": name, "category": word.category, "ru": word.ru, "en": word.en,
+                            "kind": kind, "duration": round(len(signals[kind]) / harness.SAMPLE_RATE, 3)})
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION, "sample_rate": harness.SAMPLE_RATE, "entries": entries},
+                  f, ensure_ascii=False, indent=2)
+    return entries
+
+
+class ToneBackend:
+    """Детерминированный движок для синтетического корпуса: слово по основной частоте записи.
+
+    Запись тише порога или без тона слова считается неразборчивой
+    (sr.UnknownValueError), как у настоящих движков.
+    """
+
+    name = "tone"
+    MIN_RMS = 0.01
+
+    def __init__(self):
+        self.words = corpus_words()
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_alternatives(audio, language, vocabulary)[0]
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype="<i2").astype(np.float64) / 32768
+        if samples.size == 0 or np.sqrt(np.mean(samples ** 2)) < self.MIN_RMS:
+            raise sr.UnknownValueError()
+        spectrum = np.abs(np.fft.rfft(samples))
+        frequencies = np.fft.rfftfreq(samples.size, 1.0 / audio.sample_rate)
+        band = (frequencies >= BASE_FREQUENCY - FREQUENCY_STEP) & (frequencies <= frequency(len(self.words)))
+        peak = frequencies[band][np.argmax(spectrum[band])]
+        index = int(round((peak - BASE_FREQUENCY) / FREQUENCY_STEP))
+        if not 0 <= index < len(self.words) or abs(peak - frequency(index)) > FREQUENCY_STEP / 4:
+            raise sr.UnknownValueError()
+        word = self.words[index]
+        return [word.ru if language.startswith("ru") else word.en]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Создание корпуса ответов для замеров задержки")
+    parser.add_argument("--directory", default=CORPUS_DIR)
+    args = parser.parse_args()
+    harness.prepare()
+    entries = build(args.directory)
+    print(f"🎙️ Корпус: {len(entries)} записей в {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
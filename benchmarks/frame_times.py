@@ -0,0 +1,230 @@
+"""Замер времени кадра speaking_game_2 и speaking_game_3 без окна и микрофона.
+
+Каждая игра запускается в отдельном процессе с фиктивным драйвером SDL.
+Сценарий — экран игры и сценарий событий: нажатия клавиш выдаются по
+состоянию игры (начать запись, перейти к следующему слову, начать заново),
+микрофон проигрывает синтетический ответ, а распознает FakeBackend.
+Для каждого сценария измеряется время кадра (обработка событий,
+обновление, отрисовка, вывод на экран) без ожидания: кадры идут с
+частотой --fps, как в игре, но ожидание до следующего кадра в замер не входит.
+
+Отчет в JSON: p50/p95/p99 времени кадра, прирост числа блоков памяти
+за кадр (sys.getallocatedblocks), объем временных выделений за кадр
+(tracemalloc, отдельный проход) и доля попаданий в кэши поверхностей.
+
+    python benchmarks/frame_times.py --frames 600 --output frame_times.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import harness
+
+SCENARIOS = {
+    "2": ["menu", "game_classic", "game_training", "game_visual", "result"],
+    "3": ["game", "listening", "final"],
+}
+# Кадров в проходе с tracemalloc (он заметно замедляет кадр)
+TRACED_FRAMES = 100
+
+
+def paced(frames, fps, first=0):
+    """Номера кадров с ожиданием до начала каждого следующего кадра"""
+    interval = 1.0 / fps if fps else 0.0
+    next_time = time.perf_counter()
+    for frame in range(first, first + frames):
+        yield frame
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+def measure(step, frames, caches, fps=60):
+    """Времена кадров step(номер кадра), выделения памяти и попадания в кэши"""
+    before = {name: (cache.hits, cache.misses) for name, cache in caches.items()}
+    times, blocks = [], []
+    for frame in paced(frames, fps):
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        step(frame)
+        times.append((time.perf_counter() - start) * 1000)
+        blocks.append(sys.getallocatedblocks() - blocks_before)
+    result = harness.summarize(times)
+    result["alloc_blocks_per_frame"] = round(float(np.mean(blocks)), 1)
+
+    for name, cache in caches.items():
+        hits = cache.hits - before[name][0]
+        misses = cache.misses - before[name][1]
+        result[f"{name}_cache_hit_rate"] = round(hits / (hits + misses), 4) if hits + misses else None
+
+    # Временные выделения: пик памяти за кадр сверх памяти до кадра
+    allocated = []
+    tracemalloc.start()
+    try:
+        for frame in paced(min(frames, TRACED_FRAMES), fps, first=frames):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            step(frame)
+            allocated.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    result["alloc_kb_p50"] = round(float(np.percentile(allocated, 50)) / 1024, 2)
+    result["alloc_kb_p95"] = round(float(np.percentile(allocated, 95)) / 1024, 2)
+    return result
+
+
+def key(code, unicode=""):
+    import pygame
+
+    return pygame.event.Event(pygame.KEYDOWN, key=code, unicode=unicode, mod=0)
+
+
+def answer_signal():
+    """Ответ игрока: полсекунды «речи» и тишина с легким шумом"""
+    return np.concatenate([harness.silence(0.2, 0.002), harness.tone(0.5), harness.silence(1.0, 0.002)])
+
+
+def bench_game_2(frames, fps):
+    import pygame
+    from audio_capture import StreamRecorder
+    from recognizers import FakeBackend
+
+    # Запись идет в 20 раз быстрее реального времени, чтобы кадры не ждали игрока
+    StreamRecorder.stream_factory = harness.FakeMicrophone(answer_signal(), speed=20.0)
+    import speaking_game_2 as game_module
+    from render_cache import text_cache
+
+    game = game_module.SpeakingGame()
+    game.backend = FakeBackend(default=["cat", "house"])
+    caches = {"text": text_cache}
+
+    def player(frame):
+        """События игрока по состоянию игры"""
+        if game.current_state == "result":
+            return [key(pygame.K_r, "r")]
+        if game.current_state != "game":
+            return []
+        if game.waiting_for_input:
+            # Результат попытки виден несколько кадров
+            return [key(pygame.K_RETURN, "\r")] if frame % 10 == 0 else []
+        if not game.recording and not game.recognizing:
+            return [key(pygame.K_SPACE, " ")]
+        return []
+
+    def play(frame):
+        game.step(player(frame) + pygame.event.get())
+
+    def idle(frame):
+        game.step(pygame.event.get())
+
+    results = {}
+    for scenario in SCENARIOS["2"]:
+        if scenario == "menu":
+            game.current_state = "menu"
+            results[scenario] = measure(idle, frames, caches, fps)
+        elif scenario.startswith("game_"):
+            mode = {"game_classic": "1", "game_training": "2", "game_visual": "3"}[scenario]
+            game.load_category_images("1")
+            game.start_game("1", "1", mode)
+            results[scenario] = measure(play, frames, caches, fps)
+            game.recognition_pool.cancel_all()
+            game.recorder.stop()
+            game.recording = game.recognizing = game.waiting_for_input = False
+        elif scenario == "result":
+            game.start_game("1", "1", "1")
+            game.score = 120
+            game.finish_game()
+            results[scenario] = measure(idle, frames, caches, fps)
+    game.progress.close()
+    return results
+
+
+def bench_game_3(frames, fps):
+    import io
+
+    import pygame
+    import speech_recognition as sr
+
+    signal_wav = harness.wav_bytes(np.concatenate([harness.silence(1.0, 0.002), answer_signal()]))
+    import speaking_game_3 as game_module
+    from recognizers import FakeBackend
+    from render_cache import text_cache
+
+    # Вместо микрофона sr.Recognizer читает записанный ответ
+    game_module.SpeechGame.microphone_source = lambda self: sr.AudioFile(io.BytesIO(signal_wav))
+    game = game_module.SpeechGame()
+    game.backend = FakeBackend(default=["кот", "дом"])
+    caches = {"text": text_cache, "image": game_module.image_cache}
+
+    def browse(frame):
+        """Листание слов, перевод и подсказка"""
+        events = []
+        if frame % 60 == 0:
+            events.append(key(pygame.K_RIGHT))
+        elif frame % 60 == 30:
+            events.append(key(pygame.K_LEFT))
+        if frame % 45 == 0:
+            events.append(key(pygame.K_t, "t"))
+        if frame % 90 == 0:
+            events.append(key(pygame.K_h, "h"))
+        game.step(events + pygame.event.get())
+
+    def listen(frame):
+        events = [] if game.is_listening else [key(pygame.K_SPACE, " ")]
+        if frame % 120 == 119:
+            events.append(key(pygame.K_RETURN, "\r"))
+        game.step(events + pygame.event.get())
+        if game.game_completed:
+            game.game_completed = False
+            game.current_word_index = 0
+            game.reset_current_word_state()
+
+    def final(frame):
+        # Экран итогов ждет нажатия клавиши: событие ставится заранее
+        pygame.event.post(key(pygame.K_SPACE, " "))
+        game.show_final_screen()
+
+    results = {}
+    for scenario in SCENARIOS["3"]:
+        step = {"game": browse, "listening": listen, "final": final}[scenario]
+        results[scenario] = measure(step, frames, caches, fps)
+        game.cancel_listening()
+    game.progress.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени кадра игр без окна и микрофона")
+    parser.add_argument("--frames", type=int, default=600, help="кадров на сценарий")
+    parser.add_argument("--fps", type=int, default=60, help="частота кадров (0 — без ожидания)")
+    parser.add_argument("--game", choices=sorted(SCENARIOS), help="замер одной игры в этом процессе")
+    parser.add_argument("--output", help="файл для отчета JSON")
+    args = parser.parse_args()
+
+    if args.game:
+        harness.prepare()
+        bench = bench_game_2 if args.game == "2" else bench_game_3
+        print(json.dumps(bench(args.frames, args.fps)))
+        return
+
+    # Каждая игра открывает свое окно при импорте, поэтому замеры идут в отдельных процессах
+    report = {"frames": args.frames, "fps": args.fps, "python": sys.version.split()[0], "games": {}}
+    for game in sorted(SCENARIOS):
+        command = [sys.executable, os.path.abspath(__file__), "--game", game,
+                   "--frames", str(args.frames), "--fps", str(args.fps)]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        report["games"][f"speaking_game_{game}"] = json.loads(output.strip().splitlines()[-1])
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
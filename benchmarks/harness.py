@@ -0,0 +1,175 @@
+"""Общее окружение замеров: окно без экрана, микрофон из записи и сводка времен.
+
+prepare() нужно вызвать до импорта pygame и модулей игры: он включает
+фиктивные драйверы SDL, выбирает детерминированный движок распознавания и
+переносит файлы состояния (прогресс, калибровку) во временный каталог,
+чтобы замеры не трогали настоящую статистику игроков.
+"""
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 44100
+
+
+def prepare(state_dir=None):
+    """Настройка окружения; возвращает каталог файлов состояния"""
+    state_dir = state_dir or tempfile.mkdtemp(prefix="speaking_game_bench_")
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["SPEAKING_GAME_RECOGNIZER"] = "fake"
+    os.environ["SPEAKING_GAME_STATE_DIR"] = state_dir
+    os.environ["SPEAKING_GAME_PROFILE"] = "benchmark"
+    os.environ.pop("SPEAKING_GAME_AUDIO_ARCHIVE", None)
+    # Пути к словарю и изображениям в играх относительные
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return state_dir
+
+
+def tone(duration, frequency=220.0, amplitude=0.3, sample_rate=SAMPLE_RATE):
+    """Гармонический сигнал с обертонами — похож на гласный звук"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    signal = sum(np.sin(2 * np.pi * frequency * k * t) / k for k in (1, 2, 3))
+    return (signal / 1.84 * amplitude * 32767).astype(np.int16)
+
+
+def silence(duration, noise=0.0, sample_rate=SAMPLE_RATE, seed=0):
+    """Тишина с белым шумом заданного уровня (доля полной шкалы)"""
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(duration * sample_rate)) * noise * 32767).astype(np.int16)
+
+
+def wav_bytes(samples, sample_rate=SAMPLE_RATE):
+    """WAV-файл в памяти (16 бит, моно)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class FakeMicrophone:
+    """Поток ввода для StreamRecorder.stream_factory, проигрывающий сигнал.
+
+    signal проигрывается с начала при каждом открытии потока, после него
+    идет тишина. speed > 1 подает блоки быстрее реального времени.
+    """
+
+    def __init__(self, signal=None, speed=1.0):
+        self.signal = signal if signal is not None else np.zeros(0, dtype=np.int16)
+        self.speed = speed
+
+    def __call__(self, samplerate, channels, dtype, blocksize, callback, **kwargs):
+        return _FakeStream(self.signal, samplerate, channels, dtype, blocksize, callback, self.speed)
+
+
+class _FakeStream:
+    def __init__(self, signal, samplerate, channels, dtype, blocksize, callback, speed):
+        self.signal = signal
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize
+        self.callback = callback
+        self.speed = speed
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        position = 0
+        interval = self.blocksize / float(self.samplerate) / self.speed
+        next_time = time.perf_counter()
+        while self._running:
+            block = self.signal[position:position + self.blocksize]
+            if len(block) < self.blocksize:
+                block = np.concatenate([block, np.zeros(self.blocksize - len(block), dtype=self.signal.dtype)])
+            position += self.blocksize
+            try:
+                self.callback(np.repeat(block.reshape(-1, 1), self.channels, axis=1).astype(self.dtype),
+                              self.blocksize, None, None)
+            except Exception:
+                # sd.CallbackStop: запись закончена
+                break
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+        self._running = False
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+
+    def close(self):
+        pass
+
+
+class PacedAudioFile(sr.AudioFile):
+    """sr.AudioFile, который отдает запись не быстрее реального времени.
+
+    Замена sr.Microphone для sr.Recognizer: listen() ждет звук так же,
+    как с микрофона; speed > 1 ускоряет воспроизведение.
+    """
+
+    def __init__(self, filename_or_fileobject, speed=1.0):
+        super().__init__(filename_or_fileobject)
+        self.speed = speed
+
+    def __enter__(self):
+        super().__enter__()
+        self.stream = _PacedReader(self.stream, self.SAMPLE_RATE * self.speed)
+        return self
+
+
+class _PacedReader:
+    def __init__(self, stream, frames_per_second):
+        self.stream = stream
+        self.frames_per_second = frames_per_second
+        self.frames = 0
+        self.started = None
+
+    def read(self, size=-1):
+        if self.started is None:
+            self.started = time.perf_counter()
+        data = self.stream.read(size)
+        self.frames += size
+        time.sleep(max(0.0, self.started + self.frames / self.frames_per_second - time.perf_counter()))
+        return data
+
+
+def read_wav(path):
+    """Отсчеты WAV-файла (16 бит, моно)"""
+    with wave.open(path, "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+
+
+def summarize(values_ms):
+    """p50/p95/p99, среднее и максимум списка времен в миллисекундах"""
+    values = np.asarray(values_ms, dtype=np.float64)
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
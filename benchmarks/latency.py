@@ -0,0 +1,339 @@
+"""Задержка от показа слова до отклика игры на записанные ответы корпуса.
+
+Каждая запись корпуса (benchmarks/corpus.py: правильный, неправильный,
+тихий и зашумленный ответ на каждое слово) проходит через настоящий путь
+игры: запись с микрофона (его заменяет проигрывание файла), распознавание,
+анализ произношения и проверку ответа. speaking_game_1 и speaking_game_2
+проходят все уровни (от уровня зависит предел записи), speaking_game_3 —
+слова своего набора. Распознает ToneBackend, поэтому результат не зависит
+от сети и модели. Каждая игра запускается в отдельном процессе.
+
+Стадии ответа в отчете:
+    capture    — от начала записи до готового ответа (запись ждет паузы после слова)
+    recognize  — распознавание и сопоставление с ответами категории
+    analyze    — анализ произношения (в speaking_game_3 его нет)
+    score      — проверка ответа, повторение слова и запись попытки
+    wait       — остальное: очередь фоновых задач и ожидание кадра
+    total      — от показа слова до отклика игры
+
+С --speed N записи проигрываются в N раз быстрее; realtime_total_ms
+пересчитывает захват в реальное время и равен задержке, которую
+почувствует игрок. Если игра не откликнулась за --timeout секунд,
+распознавание отменяется, а ответ записывается как неправильный с
+timeout=true и не входит в сводку задержек.
+
+    python benchmarks/latency.py --output latency.json
+    python benchmarks/latency.py --speed 1 --games 2 --levels 1 --categories 1
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import harness
+
+STAGES = ("capture", "recognize", "analyze", "score")
+GAME_IDS = ("1", "2", "3")
+LEVELS = ("1", "2", "3")
+# У speaking_game_3 нет уровней
+NO_LEVEL = "-"
+# Наибольшее время ожидания отклика игры на один ответ (секунды)
+TIMEOUT = 30.0
+
+
+class Stopwatch:
+    """Время стадий одного ответа: обертки методов игры складывают длительность вызовов"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] += (time.perf_counter() - start) * 1000
+
+    def wrap(self, obj, name, stage):
+        """Замер вызовов метода obj.name как стадии stage (вызовы могут идти из фоновых потоков)"""
+        method = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            with self.stage(stage):
+                return method(*args, **kwargs)
+
+        setattr(obj, name, timed)
+
+    def mark(self, obj, name, stage):
+        """Стадия stage длится от reset() до вызова obj.name"""
+        method = getattr(obj, name)
+
+        def marked(*args, **kwargs):
+            self.stages[stage] = (time.perf_counter() - self.started) * 1000
+            return method(*args, **kwargs)
+
+        setattr(obj, name, marked)
+
+    def row(self, entry, level, correct, speed, timeout=False):
+        """Строка отчета для ответа, отклик на который только что показан (или не пришел за TIMEOUT)"""
+        total = (time.perf_counter() - self.started) * 1000
+        row = {"level": level, "category": entry["category"], "ru": entry["ru"], "kind": entry["kind"],
+               "correct": correct and not timeout, "timeout": timeout}
+        for stage in STAGES:
+            row[f"{stage}_ms"] = round(self.stages[stage], 3)
+        row["wait_ms"] = round(max(0.0, total - sum(self.stages.values())), 3)
+        row["total_ms"] = round(total, 3)
+        row["realtime_total_ms"] = round(total + self.stages["capture"] * (speed - 1), 3)
+        return row
+
+
+def run_until(game, clock, done, timeout):
+    """Игровой цикл до выполнения done(); False, если игра не откликнулась за timeout секунд"""
+    import pygame
+
+    deadline = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() >= deadline:
+            return False
+        game.step(pygame.event.get())
+        clock.tick(60)
+    return True
+
+
+def timed_out(game_name, entry, timeout):
+    print(f"⚠️ {game_name}: нет отклика на {entry['file']} за {timeout:.0f} с, распознавание отменено")
+
+
+def make_backend(name):
+    import corpus
+    from recognizers import create_backend
+
+    return corpus.ToneBackend() if name == corpus.ToneBackend.name else create_backend(name)
+
+
+def corpus_path(entry):
+    import corpus
+
+    return os.path.join(corpus.CORPUS_DIR, entry["file"])
+
+
+def bench_game_1(entries, levels, speed, recognizer, timeout=TIMEOUT):
+    from audio_capture import StreamRecorder
+
+    import corpus
+
+    microphone = harness.FakeMicrophone(harness.silence(2.0, corpus.ROOM_NOISE), speed)
+    StreamRecorder.stream_factory = microphone
+    import speaking_game_1 as game_module
+    from vocabulary import vocabulary
+
+    game = game_module.SpeakingGame()
+    game.backend = make_backend(recognizer)
+    watch = Stopwatch()
+    watch.wrap(game, "record_audio", "capture")
+    watch.wrap(game, "recognize_speech", "recognize")
+    watch.wrap(game, "analyze_pronunciation", "analyze")
+
+    rows = []
+    for level in levels:
+        time_limit = game.levels[level]["time_limit"]
+        for entry in entries:
+            word = vocabulary.word(entry["category"], entry["ru"])
+            answers = vocabulary.answers(word.category)
+            microphone.signal = harness.read_wav(corpus_path(entry))
+            watch.reset()
+            # Тот же порядок, что и в play_game
+            audio_clip = game.record_audio(duration=time_limit)
+            user_answer = game.recognize_speech(audio_clip, answers, word.en)
+            pronunciation = game.analyze_pronunciation(audio_clip, word.en) if audio_clip else None
+            with watch.stage("score"):
+                correct = bool(user_answer and user_answer == word.en)
+                game.scheduler.review(word, correct)
+                game.progress.attempt(word, correct, word.en, user_answer, 10 if correct else 0,
+                                      watch.stages["recognize"] / 1000, pronunciation)
+            rows.append(watch.row(entry, level, correct, speed))
+    game.progress.close()
+    return rows
+
+
+def bench_game_2(entries, levels, speed, recognizer, timeout=TIMEOUT):
+    from audio_capture import StreamRecorder
+
+    import corpus
+
+    microphone = harness.FakeMicrophone(harness.silence(2.0, corpus.ROOM_NOISE), speed)
+    StreamRecorder.stream_factory = microphone
+    import pygame
+
+    import speaking_game_2 as game_module
+    from vocabulary import vocabulary
+
+    game = game_module.SpeakingGame()
+    game.backend = make_backend(recognizer)
+    watch = Stopwatch()
+    watch.mark(game, "finish_recording", "capture")
+    watch.wrap(game, "recognize_speech", "recognize")
+    watch.wrap(game, "analyze_pronunciation", "analyze")
+    watch.wrap(game, "handle_recognition_done", "score")
+    clock = pygame.time.Clock()
+
+    rows = []
+    for level in levels:
+        # Тренировка: жизни не кончаются, игра не уходит на экран итогов
+        game.start_game(entries[0]["category"], level, "2")
+        for entry in entries:
+            word = vocabulary.word(entry["category"], entry["ru"])
+            game.current_words = [word]
+            game.current_word_index = 0
+            game.current_answers = vocabulary.answers(word.category)
+            game.waiting_for_input = False
+            microphone.signal = harness.read_wav(corpus_path(entry))
+            watch.reset()
+            # Игрок нажал пробел: дальше работает обычный игровой цикл до показа результата
+            game.start_recording()
+            if run_until(game, clock, lambda: game.last_result is not None, timeout):
+                rows.append(watch.row(entry, level, game.last_result["correct"], speed))
+                continue
+            timed_out("speaking_game_2", entry, timeout)
+            rows.append(watch.row(entry, level, False, speed, timeout=True))
+            # Как по ESC, но игра остается на экране слова
+            if game.recording:
+                game.recorder.stop()
+                game.recording = False
+            game.recognition_pool.cancel_all()
+            game.current_job = None
+            game.recognizing = False
+    game.progress.close()
+    return rows
+
+
+def bench_game_3(entries, levels, speed, recognizer, timeout=TIMEOUT):
+    import pygame
+
+    import speaking_game_3 as game_module
+
+    entries = [entry for entry in entries
+               if entry["category"] == game_module.GAME_CATEGORY and entry["ru"] in game_module.GAME_WORDS]
+    if not entries:
+        return []
+    # Калибровка при запуске слушает тишину
+    silent = next(entry for entry in entries if entry["kind"] == "silent")
+    game_module.SpeechGame.microphone_source = lambda self: harness.PacedAudioFile(corpus_path(silent), speed)
+    game = game_module.SpeechGame()
+    game.backend = make_backend(recognizer)
+    watch = Stopwatch()
+    # Задача распознавания сначала слушает микрофон, потом распознает
+    watch.wrap(game, "recognize_speech", "capture")
+    watch.wrap(game.backend, "recognize_alternatives", "recognize")
+    watch.wrap(game, "handle_recognition_done", "score")
+    clock = pygame.time.Clock()
+
+    rows = []
+    for entry in entries:
+        path = corpus_path(entry)
+        game_module.SpeechGame.microphone_source = lambda self, path=path: harness.PacedAudioFile(path, speed)
+        game.current_word_index = game_module.GAME_WORDS.index(entry["ru"])
+        game.reset_current_word_state()
+        watch.reset()
+        game.start_listening()
+        if not run_until(game, clock, lambda: not game.is_listening, timeout):
+            timed_out("speaking_game_3", entry, timeout)
+            game.cancel_listening()
+            rows.append(watch.row(entry, NO_LEVEL, False, speed, timeout=True))
+            continue
+        watch.stages["capture"] -= watch.stages["recognize"]
+        rows.append(watch.row(entry, NO_LEVEL, game.recognition_result == entry["ru"], speed))
+    game.cancel_listening()
+    game.progress.close()
+    return rows
+
+
+def summarize_rows(rows):
+    """Сводка по уровням: итоговая задержка, средние стадии и задержка по видам ответа.
+
+    Ответы без отклика (timeout) считаются неправильными, но в задержки не входят.
+    """
+    import corpus
+
+    levels = {}
+    for level in dict.fromkeys(row["level"] for row in rows):
+        level_rows = [row for row in rows if row["level"] == level]
+        answered = [row for row in level_rows if not row["timeout"]]
+        by_kind = {}
+        for kind in corpus.KINDS:
+            kind_rows = [row for row in level_rows if row["kind"] == kind]
+            if kind_rows:
+                by_kind[kind] = harness.summarize([row["realtime_total_ms"] for row in kind_rows
+                                                   if not row["timeout"]])
+                by_kind[kind]["correct_rate"] = round(sum(row["correct"] for row in kind_rows) / len(kind_rows), 4)
+        levels[level] = {
+            "realtime_total": harness.summarize([row["realtime_total_ms"] for row in answered]),
+            "total": harness.summarize([row["total_ms"] for row in answered]),
+            "stages_mean_ms": {stage: round(sum(row[f"{stage}_ms"] for row in answered) / len(answered), 3)
+                               if answered else None for stage in STAGES + ("wait",)},
+            "timeouts": len(level_rows) - len(answered),
+            "kinds": by_kind,
+        }
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка от показа слова до отклика игры на записанные ответы")
+    parser.add_argument("--games", nargs="+", choices=GAME_IDS, default=list(GAME_IDS))
+    parser.add_argument("--levels", nargs="+", choices=LEVELS, default=list(LEVELS),
+                        help="уровни speaking_game_1 и speaking_game_2")
+    parser.add_argument("--categories", nargs="+", help="категории словаря (по умолчанию все)")
+    parser.add_argument("--speed", type=float, default=10.0, help="ускорение воспроизведения записей")
+    parser.add_argument("--recognizer", default="tone", help="движок распознавания (tone — для синтетического корпуса)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="наибольшее ожидание отклика на ответ (секунды)")
+    parser.add_argument("--game", choices=GAME_IDS, help="замер одной игры в этом процессе")
+    parser.add_argument("--output", help="файл для полного отчета JSON (со строками по словам)")
+    args = parser.parse_args()
+
+    harness.prepare()
+    import corpus
+
+    entries = corpus.build()
+    if args.categories:
+        entries = [entry for entry in entries if entry["category"] in args.categories]
+
+    if args.game:
+        bench = {"1": bench_game_1, "2": bench_game_2, "3": bench_game_3}[args.game]
+        # Сообщения игры не должны смешиваться с отчетом
+        with contextlib.redirect_stdout(sys.stderr):
+            rows = bench(entries, args.levels, args.speed, args.recognizer, args.timeout)
+        print(json.dumps(rows, ensure_ascii=False))
+        return
+
+    report = {"speed": args.speed, "recognizer": args.recognizer, "python": sys.version.split()[0], "games": {}}
+    words = {}
+    for game in args.games:
+        command = [sys.executable, os.path.abspath(__file__), "--game", game, "--speed", str(args.speed),
+                   "--recognizer", args.recognizer, "--timeout", str(args.timeout), "--levels", *args.levels]
+        if args.categories:
+            command += ["--categories", *args.categories]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        rows = json.loads(output.strip().splitlines()[-1])
+        report["games"][f"speaking_game_{game}"] = {"levels": summarize_rows(rows)}
+        words[f"speaking_game_{game}"] = rows
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        for game, rows in words.items():
+            report["games"][game]["words"] = rows
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
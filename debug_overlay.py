@@ -0,0 +1,89 @@
+"""Отладочная панель по F3: частота кадров и скользящие задержки стадий (timing.py)"""
+import collections
+import time
+
+import pygame
+
+import timing
+from render_cache import font_lock
+
+BACKGROUND = (0, 0, 0, 190)
+TEXT_COLOR = (180, 255, 180)
+PADDING = 6
+
+
+class DebugOverlay:
+    """Панель поверх кадра игры; видна после нажатия F3.
+
+    Каждый кадр игра вызывает frame(), а перед renderer.present() — draw().
+    Текст обновляется раз в REFRESH секунд, поэтому панель перерисовывается
+    редко и почти не влияет на время кадра, которое показывает.
+    """
+
+    REFRESH = 0.5
+
+    def __init__(self, position=(10, 10), font_size=16):
+        self.position = position
+        self.font = pygame.font.SysFont("Arial", font_size)
+        self.visible = False
+        self._frames = collections.deque(maxlen=120)
+        self._lines = ()
+        self._rect = None
+        self._next_refresh = 0.0
+        timing.timings.gauges["fps"] = self.fps
+
+    def handle_event(self, event):
+        """Переключение панели; True, если событие обработано"""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.visible = not self.visible
+            self._next_refresh = 0.0
+            return True
+        return False
+
+    def idle_timeout(self, timeout):
+        """Ожидание события в простое (мс): видимой панели нужно обновлять частоту кадров"""
+        return min(timeout, int(self.REFRESH * 1000)) if self.visible else timeout
+
+    def frame(self):
+        """Отметка выведенного кадра"""
+        self._frames.append(time.perf_counter())
+
+    def fps(self):
+        """Частота кадров по последним кадрам"""
+        if len(self._frames) < 2 or self._frames[-1] == self._frames[0]:
+            return 0.0
+        return (len(self._frames) - 1) / (self._frames[-1] - self._frames[0])
+
+    def lines(self):
+        """Строки панели: частота кадров и p50/p95 последних вызовов каждой стадии"""
+        lines = [f"FPS: {self.fps():.1f}"]
+        if not timing.ENABLED:
+            lines.append("Замеры стадий выключены (SPEAKING_GAME_TIMING=1)")
+            return tuple(lines)
+        for name, stats in timing.timings.snapshot().items():
+            lines.append(f"{name}: {stats['p50_ms']:.1f} / {stats['p95_ms']:.1f} мс ({stats['count']})")
+        return tuple(lines)
+
+    def draw(self, renderer):
+        """Добавление панели в кадр LayeredRenderer"""
+        if not self.visible:
+            return
+        now = time.monotonic()
+        if now >= self._next_refresh:
+            self._lines = self.lines()
+            with font_lock:
+                width = max(self.font.size(line)[0] for line in self._lines) + 2 * PADDING
+            height = self.font.get_linesize() * len(self._lines) + 2 * PADDING
+            self._rect = pygame.Rect(self.position, (width, height))
+            self._next_refresh = now + self.REFRESH
+        rect, lines = self._rect, self._lines
+        renderer.region("debug_overlay", rect, lines, lambda: self._draw(renderer.screen, rect, lines))
+
+    def _draw(self, screen, rect, lines):
+        panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel.fill(BACKGROUND)
+        with font_lock:
+            rendered = [self.font.render(line, True, TEXT_COLOR) for line in lines]
+        for i, surface in enumerate(rendered):
+            panel.blit(surface, (PADDING, PADDING + i * self.font.get_linesize()))
+        screen.blit(panel, rect)
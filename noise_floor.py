@@ -0,0 +1,98 @@
+"""Оценка уровня фонового шума микрофона с сохранением между запусками"""
+import json
+import os
+
+import numpy as np
+
+import settings
+
+PROFILE_FILE = os.path.join(settings.STATE_DIR, "noise_profile.json")
+
+# speech_recognition считает энергию в единицах 16-битных сэмплов
+# и ставит порог в dynamic_energy_ratio раз выше шума
+_FULL_SCALE = 32768.0
+_ENERGY_RATIO = 1.5
+
+
+class NoiseFloor:
+    """Скользящая оценка RMS фонового шума для одного устройства ввода.
+
+    RMS хранится в долях полной шкалы. Оценка обновляется по блокам без речи,
+    поэтому калибровка нужна только один раз, а результат сохраняется в
+    PROFILE_FILE отдельно для каждого устройства.
+    """
+
+    def __init__(self, device, rms=None, factor=3.0, min_threshold=0.005, default_threshold=0.01,
+                 smoothing=0.05, path=PROFILE_FILE):
+        self.device = device
+        self.rms = rms
+        self.factor = factor
+        self.min_threshold = min_threshold
+        self.default_threshold = default_threshold
+        self.smoothing = smoothing
+        self.path = path
+
+    @classmethod
+    def load(cls, device, path=PROFILE_FILE, **kwargs):
+        """Загрузка сохраненной оценки для устройства"""
+        rms = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rms = json.load(f).get(device)
+        except (FileNotFoundError, ValueError):
+            pass
+        return cls(device, rms=rms, path=path, **kwargs)
+
+    @property
+    def calibrated(self):
+        """Есть ли оценка шума (из калибровки или из файла)"""
+        return self.rms is not None
+
+    @property
+    def threshold(self):
+        """Порог RMS для определения речи"""
+        if self.rms is None:
+            return self.default_threshold
+        return max(self.min_threshold, self.rms * self.factor)
+
+    def calibrate(self, samples):
+        """Калибровка по записи тишины"""
+        samples = np.asarray(samples).reshape(-1).astype(np.float32)
+        if samples.size == 0:
+            return
+        samples /= _FULL_SCALE
+        self.rms = float(np.sqrt(np.mean(samples * samples)))
+
+    def observe(self, block_rms):
+        """Учет RMS блока без речи в скользящей оценке"""
+        if self.rms is None:
+            self.rms = block_rms
+        else:
+            self.rms += self.smoothing * (block_rms - self.rms)
+
+    def apply_to(self, recognizer):
+        """Передача оценки в sr.Recognizer вместо adjust_for_ambient_noise"""
+        if self.rms is not None:
+            recognizer.energy_threshold = max(self.rms * _FULL_SCALE * _ENERGY_RATIO, 1)
+
+    def update_from(self, recognizer):
+        """Обновление оценки по порогу, который sr.Recognizer подстроил сам"""
+        self.rms = recognizer.energy_threshold / _ENERGY_RATIO / _FULL_SCALE
+
+    def save(self):
+        """Сохранение оценки в файл профилей"""
+        if self.rms is None:
+            return
+        try:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    profiles = json.load(f)
+            except (FileNotFoundError, ValueError):
+                profiles = {}
+            profiles[self.device] = self.rms
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(profiles, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Не удалось сохранить профиль шума: {e}")
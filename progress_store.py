@@ -0,0 +1,347 @@
+"""Прогресс игроков в SQLite: профили, история попыток и статистика по словам.
+
+База одна на компьютер (PROGRESS_FILE), каждый игрок — отдельный профиль
+(settings.PROFILE). Каждая попытка хранится целиком: слово, ожидаемый и
+распознанный ответ, время распознавания и признаки произношения. Счетчики
+по словам (word_stats) обновляются вместе с попыткой, поэтому точность по
+словам профиля читается без просмотра истории.
+
+Запись идет в фоновом потоке: события накапливаются в очереди и пишутся
+одной транзакцией на порцию, а база открыта в режиме WAL, так что чтение
+статистики не ждет записи. Журнал WAL сворачивается в базу каждые
+CHECKPOINT_EVERY событий и при закрытии, поэтому он не растет и стоимость
+записи не зависит от накопленной истории.
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import settings
+import timing
+
+PROGRESS_FILE = os.path.join(settings.STATE_DIR, "progress.db")
+# Статистика прежних версий игры (один файл на компьютер)
+LEGACY_STATS_FILE = os.path.join(settings.STATE_DIR, "game_stats.json")
+DEFAULT_PROFILE = "default"
+# Число событий, после которого журнал WAL сворачивается в базу
+CHECKPOINT_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    total_score INTEGER NOT NULL DEFAULT 0,
+    best_score INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles (id),
+    front_end TEXT,
+    category TEXT,
+    level TEXT,
+    mode TEXT,
+    started REAL NOT NULL,
+    finished REAL,
+    score INTEGER,
+    completed INTEGER
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles (id),
+    game_id INTEGER REFERENCES games (id),
+    word TEXT NOT NULL,
+    category TEXT,
+    expected TEXT,
+    recognized TEXT,
+    correct INTEGER NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0,
+    latency REAL,
+    features TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_profile_word ON attempts (profile_id, word, correct);
+CREATE INDEX IF NOT EXISTS attempts_profile_created ON attempts (profile_id, created);
+CREATE TABLE IF NOT EXISTS word_stats (
+    profile_id INTEGER NOT NULL REFERENCES profiles (id),
+    word TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    last_seen REAL,
+    due REAL,
+    ease REAL,
+    interval REAL,
+    reps INTEGER,
+    PRIMARY KEY (profile_id, word)
+) WITHOUT ROWID;
+"""
+
+_INSERT_GAME = ("INSERT INTO games (profile_id, front_end, category, level, mode, started) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+_FINISH_GAME = "UPDATE games SET finished = ?, score = ?, completed = ? WHERE id = ?"
+_GAME_STARTED = "UPDATE profiles SET games_played = games_played + 1 WHERE id = ?"
+_GAME_FINISHED = ("UPDATE profiles SET total_score = total_score + ?, "
+                  "best_score = MAX(best_score, ?) WHERE id = ?")
+_INSERT_ATTEMPT = ("INSERT INTO attempts (profile_id, game_id, word, category, expected, recognized, "
+                   "correct, points, latency, features, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_COUNT_ATTEMPT = ("INSERT INTO word_stats (profile_id, word, attempts, correct, last_seen) VALUES (?, ?, 1, ?, ?) "
+                  "ON CONFLICT (profile_id, word) DO UPDATE SET attempts = attempts + 1, "
+                  "correct = correct + excluded.correct, last_seen = excluded.last_seen")
+_SCHEDULE_WORD = ("INSERT INTO word_stats (profile_id, word, due, ease, interval, reps) VALUES (?, ?, ?, ?, ?, ?) "
+                  "ON CONFLICT (profile_id, word) DO UPDATE SET due = excluded.due, ease = excluded.ease, "
+                  "interval = excluded.interval, reps = excluded.reps")
+
+_STOP = object()
+
+
+def connect(path=PROGRESS_FILE):
+    """Соединение с базой прогресса (таблицы создаются при первом открытии)"""
+    connection = sqlite3.connect(path, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # В режиме WAL этого достаточно для сохранности всех завершенных транзакций, кроме последних при сбое ОС
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _read_legacy_stats(path=LEGACY_STATS_FILE):
+    """Счетчики и выученные слова из game_stats.json или None, если файла нет"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"⚠️ Файл {path} поврежден ({e}), статистика не перенесена")
+        return None
+    # Файлы speaking_game_1 и speaking_game_2 могут отличаться набором полей
+    stats = {key: saved.get(key, 0) for key in ("games_played", "total_score", "best_score")}
+    stats["words_learned"] = set(saved.get("words_learned", []))
+    return stats
+
+
+def _checkpoint(connection):
+    """Сворачивание журнала WAL в базу; пока базу читает другой процесс, журнал сворачивается частично"""
+    try:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error as e:
+        print(f"⚠️ Не удалось свернуть журнал прогресса: {e}")
+
+
+def _features(pronunciation):
+    """Числовые признаки произношения в JSON (без огибающей и подсказок)"""
+    if not pronunciation:
+        return None
+    return json.dumps({key: value for key, value in pronunciation.items()
+                       if value is None or isinstance(value, (int, float))})
+
+
+class ProgressStore:
+    """Прогресс одного профиля.
+
+    stats — статистика профиля в прежнем формате session_stats
+    (games_played, total_score, best_score, words_learned, schedule);
+    методы событий сразу обновляют ее и ставят запись в очередь фонового
+    потока. Методы чтения (accuracy, history, profiles) открывают отдельное
+    соединение. При первом открытии базы в нее переносится статистика из
+    game_stats.json.
+    """
+
+    def __init__(self, profile=DEFAULT_PROFILE, front_end=None, path=PROGRESS_FILE):
+        self.profile = profile
+        self.front_end = front_end
+        self.path = path
+        connection = connect(path)
+        try:
+            with connection:
+                # Блокировка записи сразу: игры, запущенные одновременно, не перенесут статистику дважды
+                connection.execute("BEGIN IMMEDIATE")
+                self.profile_id = self._profile_id(connection, profile)
+                self._import_legacy(connection)
+            self.stats = self._load(connection)
+        finally:
+            connection.close()
+        self._reader = None
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _profile_id(connection, name):
+        connection.execute("INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)", (name, time.time()))
+        return connection.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()[0]
+
+    def _import_legacy(self, connection):
+        """Перенос статистики из game_stats.json в текущий профиль (один раз на базу)"""
+        marked = connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                                    (self.profile,)).rowcount
+        if not marked:
+            return
+        stats = _read_legacy_stats(LEGACY_STATS_FILE)
+        if stats is not None:
+            connection.execute(
+                "UPDATE profiles SET games_played = games_played + ?, total_score = total_score + ?, "
+                "best_score = MAX(best_score, ?) WHERE id = ?",
+                (stats["games_played"], stats["total_score"], stats["best_score"], self.profile_id))
+            connection.executemany(_COUNT_ATTEMPT, [(self.profile_id, word, 1, None)
+                                                    for word in stats["words_learned"]])
+            print(f"📦 Статистика из {LEGACY_STATS_FILE} перенесена в профиль '{self.profile}'")
+
+    def _load(self, connection):
+        games_played, total_score, best_score = connection.execute(
+            "SELECT games_played, total_score, best_score FROM profiles WHERE id = ?", (self.profile_id,)).fetchone()
+        rows = connection.execute("SELECT word, correct, due, ease, interval, reps FROM word_stats "
+                                  "WHERE profile_id = ?", (self.profile_id,)).fetchall()
+        return {
+            "games_played": games_played,
+            "total_score": total_score,
+            "best_score": best_score,
+            "words_learned": {word for word, correct, *_ in rows if correct},
+            "schedule": {word: list(state) for word, _, *state in rows if state[0] is not None},
+        }
+
+    # События игры
+
+    def game_started(self, category=None, level=None, mode=None):
+        self.stats["games_played"] += 1
+        self._queue.put(("game_started", (category, level, mode, time.time())))
+
+    def attempt(self, word, correct, expected=None, recognized=None, points=0, latency=None, pronunciation=None):
+        """Ответ на слово (Word); latency — время распознавания в секундах"""
+        if correct:
+            self.stats["words_learned"].add(word.ru)
+        self._queue.put(("attempt", (word.ru, word.category, expected, recognized, int(correct), points,
+                                     latency, pronunciation, time.time())))
+
+    def scheduled(self, word_ru, state):
+        """Новое состояние интервального повторения слова (Scheduler on_change)"""
+        self.stats["schedule"][word_ru] = list(state)
+        self._queue.put(("scheduled", (word_ru,) + tuple(state)))
+
+    def game_finished(self, score=None, completed=True):
+        """Итог игры; рекордом считается только пройденная до конца игра.
+
+        Игра без очков (score=None) не меняет счет профиля; ее итог — число
+        правильных ответов — и так есть в истории попыток.
+        """
+        if score is not None:
+            self.stats["total_score"] += score
+            if completed:
+                self.stats["best_score"] = max(self.stats["best_score"], score)
+        self._queue.put(("game_finished", (score, completed, time.time())))
+
+    def close(self):
+        """Запись оставшихся событий"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    # Запросы
+
+    def _read(self, sql, parameters=()):
+        if self._reader is None:
+            self._reader = connect(self.path)
+        return self._reader.execute(sql, parameters).fetchall()
+
+    def accuracy(self, profile=None):
+        """Точность по словам профиля: {русское слово: (правильно, попыток)}"""
+        profile_id = self.profile_id if profile is None else self._find_profile(profile)
+        rows = self._read("SELECT word, correct, attempts FROM word_stats WHERE profile_id = ? AND attempts > 0",
+                          (profile_id,))
+        return {word: (correct, attempts) for word, correct, attempts in rows}
+
+    def history(self, word=None, limit=50, profile=None):
+        """Последние попытки профиля (все или по одному слову), от новых к старым"""
+        profile_id = self.profile_id if profile is None else self._find_profile(profile)
+        columns = "word, expected, recognized, correct, points, latency, features, created"
+        if word is None:
+            rows = self._read(f"SELECT {columns} FROM attempts WHERE profile_id = ? "
+                              "ORDER BY created DESC LIMIT ?", (profile_id, limit))
+        else:
+            rows = self._read(f"SELECT {columns} FROM attempts WHERE profile_id = ? AND word = ? "
+                              "ORDER BY id DESC LIMIT ?", (profile_id, word, limit))
+        return rows
+
+    def profiles(self):
+        """Имена всех профилей"""
+        return [name for name, in self._read("SELECT name FROM profiles ORDER BY name")]
+
+    def _find_profile(self, name):
+        rows = self._read("SELECT id FROM profiles WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        return rows[0][0]
+
+    # Фоновая запись
+
+    def _writer(self):
+        connection = connect(self.path)
+        game_id = None
+        written = 0
+        try:
+            stop = False
+            while not stop:
+                events = [self._queue.get()]
+                while True:
+                    try:
+                        events.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                attempts, counts, schedules = [], [], []
+                try:
+                    # Одна транзакция на порцию; попытки и счетчики пишутся через executemany
+                    with timing.stage("save_progress"), connection:
+                        for event in events:
+                            if event is _STOP:
+                                stop = True
+                                continue
+                            kind, values = event
+                            if kind == "game_started":
+                                category, level, mode, started = values
+                                game_id = connection.execute(_INSERT_GAME, (self.profile_id, self.front_end,
+                                                                            category, level, mode, started)).lastrowid
+                                connection.execute(_GAME_STARTED, (self.profile_id,))
+                            elif kind == "attempt":
+                                word, category, expected, recognized, correct, points, latency, pronunciation, created = values
+                                attempts.append((self.profile_id, game_id, word, category, expected, recognized,
+                                                 correct, points, latency, _features(pronunciation), created))
+                                counts.append((self.profile_id, word, correct, created))
+                            elif kind == "scheduled":
+                                schedules.append((self.profile_id,) + values)
+                            elif kind == "game_finished":
+                                score, completed, finished = values
+                                if game_id is not None:
+                                    connection.execute(_FINISH_GAME, (finished, score, int(completed), game_id))
+                                if score is not None:
+                                    connection.execute(_GAME_FINISHED,
+                                                       (score, score if completed else 0, self.profile_id))
+                                game_id = None
+                        connection.executemany(_INSERT_ATTEMPT, attempts)
+                        connection.executemany(_COUNT_ATTEMPT, counts)
+                        connection.executemany(_SCHEDULE_WORD, schedules)
+                except sqlite3.Error as e:
+                    print(f"⚠️ Не удалось сохранить прогресс: {e}")
+                written += len(events)
+                if written >= CHECKPOINT_EVERY or stop:
+                    written = 0
+                    _checkpoint(connection)
+        finally:
+            connection.close()
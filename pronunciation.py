@@ -0,0 +1,169 @@
+"""Признаки произношения: огибающая громкости, длительность речи, SNR, клиппинг, высота тона"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FRAME_DURATION = 0.02
+HOP_DURATION = 0.01
+PITCH_FRAME_DURATION = 0.04
+PITCH_RANGE = (60.0, 400.0)
+PITCH_FRAMES = 16
+
+# Пороги оценки (RMS в долях полной шкалы)
+MIN_DURATION, MAX_DURATION = 0.5, 3.0
+QUIET_RMS, LOUD_RMS = 0.03, 0.3
+MAX_CLIPPING = 0.01
+MIN_SNR_DB = 10.0
+
+# Сколько шагов обрабатывается за раз (ограничивает временные массивы)
+CHUNK_HOPS = 100
+
+
+def _to_float(samples):
+    samples = np.asarray(samples).reshape(-1)
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(np.float32) / (float(np.iinfo(samples.dtype).max) + 1.0)
+    return samples.astype(np.float32, copy=False)
+
+
+def _scan(samples, hop):
+    """Один проход по сигналу блоками: энергия каждого шага hop и число клиппированных сэмплов"""
+    samples = np.asarray(samples).reshape(-1)
+    hop_count = samples.size // hop
+    hop_energy = np.empty(hop_count, dtype=np.float32)
+    clipped = 0
+    if np.issubdtype(samples.dtype, np.integer):
+        limit = np.iinfo(samples.dtype).max - 1
+    else:
+        limit = 0.999
+    for first in range(0, hop_count, CHUNK_HOPS):
+        last = min(first + CHUNK_HOPS, hop_count)
+        chunk = samples[first * hop:last * hop]
+        clipped += np.count_nonzero((chunk >= limit) | (chunk <= -limit))
+        blocks = _to_float(chunk).reshape(-1, hop)
+        hop_energy[first:last] = np.einsum("ij,ij->i", blocks, blocks)
+    return hop_energy, clipped
+
+
+def rms_envelope(samples, sample_rate, frame_duration=FRAME_DURATION, hop_duration=HOP_DURATION):
+    """RMS по перекрывающимся кадрам; возвращает (огибающая, шаг в сэмплах)"""
+    hop = max(1, int(hop_duration * sample_rate))
+    envelope, _ = _envelope(samples, hop, max(1, int(round(frame_duration / hop_duration))))
+    return envelope, hop
+
+
+def _envelope(samples, hop, hops_per_frame):
+    hop_energy, clipped = _scan(samples, hop)
+    if hop_energy.size < hops_per_frame:
+        return np.zeros(0, dtype=np.float32), clipped
+    # Энергия кадра — сумма энергий входящих в него шагов
+    frame_energy = np.convolve(hop_energy, np.ones(hops_per_frame, dtype=np.float32), mode="valid")
+    return np.sqrt(frame_energy / (hop * hops_per_frame)), clipped
+
+
+def estimate_pitch(samples, sample_rate, frame_duration=PITCH_FRAME_DURATION, pitch_range=PITCH_RANGE,
+                   max_frames=PITCH_FRAMES):
+    """Оценка основного тона (Гц) по автокорреляции самых громких кадров"""
+    x = _to_float(samples)
+    frame = int(frame_duration * sample_rate)
+    min_lag = int(sample_rate / pitch_range[1])
+    max_lag = min(int(sample_rate / pitch_range[0]), frame - 1)
+    if x.size < frame or max_lag <= min_lag:
+        return None
+
+    # Неперекрывающиеся кадры как представление без копирования
+    frames = sliding_window_view(x, frame)[::frame]
+    loudness = np.einsum("ij,ij->i", frames, frames)
+    loudest = frames[np.argsort(loudness)[-max_frames:]]
+    loudest = loudest - loudest.mean(axis=1, keepdims=True)
+
+    # Автокорреляция всех кадров сразу через БПФ
+    spectrum = np.fft.rfft(loudest, n=2 * frame, axis=1)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :frame]
+    zero_lag = autocorr[:, 0]
+    voiced = zero_lag > 0
+    if not voiced.any():
+        return None
+    autocorr = autocorr[voiced] / zero_lag[voiced, None]
+    window = autocorr[:, min_lag:max_lag + 1]
+    lags = np.argmax(window, axis=1) + min_lag
+    strength = window[np.arange(len(lags)), lags - min_lag]
+    lags = lags[strength > 0.3]
+    if lags.size == 0:
+        return None
+    return float(sample_rate / np.median(lags))
+
+
+def analyze_audio(samples, sample_rate, noise_rms=None):
+    """Признаки произношения для записанного ответа.
+
+    noise_rms — известный уровень шума (доля полной шкалы); без него шум
+    оценивается по самым тихим кадрам записи.
+    """
+    raw = np.asarray(samples).reshape(-1)
+    hop = max(1, int(HOP_DURATION * sample_rate))
+    envelope, clipped = _envelope(raw, hop, int(round(FRAME_DURATION / HOP_DURATION)))
+    features = {
+        "total_duration": raw.size / float(sample_rate),
+        "speech_duration": 0.0,
+        "voiced_duration": 0.0,
+        "speech_rms": 0.0,
+        "noise_rms": noise_rms,
+        "snr_db": None,
+        "clipping_ratio": float(clipped) / raw.size if raw.size else 0.0,
+        "pitch_hz": None,
+        "envelope": envelope,
+    }
+    if envelope.size == 0:
+        features["feedback"] = pronunciation_feedback(features)
+        return features
+
+    noise = noise_rms if noise_rms else float(np.percentile(envelope, 10))
+    features["noise_rms"] = noise
+    # Если шум оценен по самой записи и речь занимает ее почти целиком,
+    # оценка завышена — тогда порог не поднимается выше половины пика
+    peak = float(envelope.max())
+    noise_reliable = bool(noise_rms) or noise * 3.0 <= peak * 0.5
+    threshold = max(0.005, peak * 0.1, min(noise * 3.0, peak * 0.5))
+    voiced = envelope > threshold
+    if voiced.any():
+        indices = np.flatnonzero(voiced)
+        features["speech_duration"] = float(indices[-1] - indices[0] + 1) * hop / sample_rate
+        features["voiced_duration"] = float(indices.size) * hop / sample_rate
+        features["speech_rms"] = float(np.sqrt(np.mean(np.square(envelope[voiced], dtype=np.float64))))
+        if noise > 0 and noise_reliable:
+            features["snr_db"] = float(20.0 * np.log10(features["speech_rms"] / noise))
+        start, end = indices[0] * hop, indices[-1] * hop + int(FRAME_DURATION * sample_rate)
+        features["pitch_hz"] = estimate_pitch(raw[start:end], sample_rate)
+
+    features["feedback"] = pronunciation_feedback(features)
+    return features
+
+
+def pronunciation_feedback(features):
+    """Текстовые подсказки по признакам произношения"""
+    if features["speech_duration"] == 0:
+        return ["🔇 Речь не обнаружена"]
+
+    feedback = []
+    duration = features["speech_duration"]
+    if duration < MIN_DURATION:
+        feedback.append("🗣️ Слишком коротко")
+    elif duration > MAX_DURATION:
+        feedback.append("🗣️ Слишком долго")
+    else:
+        feedback.append("🗣️ Хорошая длительность")
+
+    if features["clipping_ratio"] > MAX_CLIPPING:
+        feedback.append("🔊 Слишком громко: звук искажается")
+    elif features["speech_rms"] < QUIET_RMS:
+        feedback.append("🔈 Слишком тихо")
+    elif features["speech_rms"] > LOUD_RMS:
+        feedback.append("🔊 Слишком громко")
+    else:
+        feedback.append("🔊 Хорошая громкость")
+
+    if features["snr_db"] is not None and features["snr_db"] < MIN_SNR_DB:
+        feedback.append("🌫️ Много фонового шума")
+    if features["pitch_hz"]:
+        feedback.append(f"🎵 Высота голоса: {features['pitch_hz']:.0f} Гц")
+    return feedback
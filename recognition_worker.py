@@ -0,0 +1,76 @@
+"""Распознавание речи в фоновых потоках с доставкой результата событием pygame"""
+import queue
+import threading
+
+import pygame
+
+# Событие с результатом распознавания: event.result, event.job и поля, переданные в submit
+RECOGNITION_DONE = pygame.event.custom_type()
+
+
+class RecognitionJob:
+    """Задача распознавания: task(job, *args) с признаком отмены"""
+
+    def __init__(self, task, args, event_fields):
+        self.task = task
+        self.args = args
+        self.event_fields = event_fields
+        self.cancelled = False
+        self.state = None
+
+    def cancel(self):
+        """Отмена: задача не запустится, а ее результат не будет доставлен"""
+        self.cancelled = True
+
+
+class RecognitionPool:
+    """Постоянные фоновые потоки, выполняющие задачи распознавания из общей очереди.
+
+    worker_state — фабрика состояния потока (например, sr.Recognizer). Она
+    вызывается один раз в каждом потоке, и задача получает результат как
+    job.state, поэтому распознаватели переиспользуются между задачами.
+    """
+
+    def __init__(self, workers=1, worker_state=None):
+        self._jobs = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker_state = worker_state
+        for _ in range(workers):
+            thread = threading.Thread(target=self._run)
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, task, *args, **event_fields):
+        """Ставит task(job, *args) в очередь; результат придет событием RECOGNITION_DONE"""
+        job = RecognitionJob(task, args, event_fields)
+        with self._lock:
+            self._pending.add(job)
+        self._jobs.put(job)
+        return job
+
+    def cancel_all(self):
+        """Отмена всех ожидающих и выполняющихся задач"""
+        with self._lock:
+            for job in self._pending:
+                job.cancel()
+            self._pending.clear()
+
+    def _run(self):
+        state = self._worker_state() if self._worker_state else None
+        while True:
+            job = self._jobs.get()
+            if job.cancelled:
+                with self._lock:
+                    self._pending.discard(job)
+                continue
+            job.state = state
+            try:
+                result = job.task(job, *job.args)
+            except Exception as e:
+                print(f"❌ Ошибка распознавания: {e}")
+                result = None
+            with self._lock:
+                self._pending.discard(job)
+            if not job.cancelled:
+                pygame.event.post(pygame.event.Event(RECOGNITION_DONE, result=result, job=job, **job.event_fields))
@@ -0,0 +1,262 @@
+"""Сменные движки распознавания речи за единым интерфейсом"""
+import hashlib
+import http.client
+import json
+import threading
+import urllib.parse
+
+import speech_recognition as sr
+
+import settings
+
+
+class RecognizerBackend:
+    """Движок распознавания.
+
+    recognize(audio, language, vocabulary) получает sr.AudioData и возвращает
+    распознанный текст. Как и sr.Recognizer, при неразборчивой речи бросает
+    sr.UnknownValueError, а при ошибке движка — sr.RequestError. vocabulary —
+    список ожидаемых слов; локальные движки ограничивают ими поиск.
+
+    recognize_alternatives возвращает n-best список гипотез, начиная с
+    наиболее вероятной; движки без n-best отдают одну гипотезу.
+    """
+
+    name = "base"
+
+    def recognize(self, audio, language, vocabulary=None):
+        raise NotImplementedError
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        return [self.recognize(audio, language, vocabulary)]
+
+
+class GoogleBackend(RecognizerBackend):
+    """Облачное распознавание Google (нужен интернет)"""
+
+    name = "google"
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognizer.recognize_google(audio, language=language)
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        # show_all возвращает весь ответ сервиса: {"alternative": [{"transcript": ...}, ...]}
+        response = self.recognizer.recognize_google(audio, language=language, show_all=True)
+        alternatives = response.get("alternative", []) if isinstance(response, dict) else []
+        transcripts = [item["transcript"] for item in alternatives if item.get("transcript")]
+        if not transcripts:
+            raise sr.UnknownValueError()
+        return transcripts
+
+
+class SphinxBackend(RecognizerBackend):
+    """Офлайн-распознавание PocketSphinx с поиском только по словарю категории"""
+
+    name = "sphinx"
+
+    def __init__(self, recognizer=None, sensitivity=0.8):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.sensitivity = sensitivity
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_alternatives(audio, language, vocabulary)[0]
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        keywords = [(word, self.sensitivity) for word in vocabulary] if vocabulary else None
+        text = self.recognizer.recognize_sphinx(audio, language=language, keyword_entries=keywords)
+        # В режиме ключевых слов sphinx возвращает найденные слова через пробел
+        found = text.split()
+        if not found:
+            raise sr.UnknownValueError()
+        return found if keywords else [text]
+
+
+class VoskBackend(RecognizerBackend):
+    """Офлайн-распознавание Vosk с грамматикой из словаря категории.
+
+    Модели указываются в settings.VOSK_MODELS по коду языка ("en", "ru") и
+    загружаются один раз при первом обращении.
+    """
+
+    name = "vosk"
+    sample_rate = 16000
+    max_alternatives = 5
+
+    def __init__(self, model_paths=None):
+        self.model_paths = model_paths or settings.VOSK_MODELS
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, language):
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError("missing vosk module: ensure that vosk is set up correctly.")
+        lang = language.split("-")[0].lower()
+        with self._lock:
+            if lang not in self._models:
+                path = self.model_paths.get(lang)
+                if not path:
+                    raise sr.RequestError(f"vosk model for '{lang}' is not configured")
+                vosk.SetLogLevel(-1)
+                self._models[lang] = vosk.Model(path)
+            return vosk, self._models[lang]
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_alternatives(audio, language, vocabulary)[0]
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        vosk, model = self._model(language)
+        if vocabulary:
+            grammar = json.dumps(list(vocabulary) + ["[unk]"], ensure_ascii=False)
+            decoder = vosk.KaldiRecognizer(model, self.sample_rate, grammar)
+        else:
+            decoder = vosk.KaldiRecognizer(model, self.sample_rate)
+        decoder.SetMaxAlternatives(self.max_alternatives)
+        decoder.AcceptWaveform(bytes(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)))
+        result = json.loads(decoder.FinalResult())
+        hypotheses = [item.get("text", "") for item in result.get("alternatives", [])] or [result.get("text", "")]
+        texts = [text.replace("[unk]", "").strip() for text in hypotheses]
+        texts = [text for text in texts if text]
+        if not texts:
+            raise sr.UnknownValueError()
+        return texts
+
+
+class FakeBackend(RecognizerBackend):
+    """Детерминированный движок для тестов и замеров.
+
+    Сначала ищет ответ по отпечатку аудио (см. audio_digest) в transcripts,
+    затем берет очередной ответ из responses, иначе возвращает default.
+    Ответ None означает неразборчивую речь, список — n-best гипотезы.
+    """
+
+    name = "fake"
+
+    def __init__(self, transcripts=None, responses=(), default=None):
+        self.transcripts = dict(transcripts or {})
+        self.responses = list(responses)
+        self.default = default
+        self.calls = 0
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_alternatives(audio, language, vocabulary)[0]
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        self.calls += 1
+        digest = audio_digest(audio)
+        if digest in self.transcripts:
+            text = self.transcripts[digest]
+        elif self.responses:
+            text = self.responses.pop(0)
+        else:
+            text = self.default
+        if not text:
+            raise sr.UnknownValueError()
+        return list(text) if isinstance(text, (list, tuple)) else [text]
+
+
+class RemoteBackend(RecognizerBackend):
+    """Распознавание на общем сервере класса (scoring_server.py).
+
+    Каждый поток держит свое соединение HTTP/1.1 с keep-alive, поэтому
+    повторные запросы не открывают новое соединение. Если сервер закрыл
+    простаивающее соединение, запрос один раз повторяется по новому.
+    """
+
+    name = "remote"
+
+    def __init__(self, url=None, timeout=30.0):
+        parsed = urllib.parse.urlsplit(url or settings.RECOGNITION_SERVER)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        self._local.connection = None
+
+    def score(self, audio, language, vocabulary=None, noise_rms=None):
+        """Ответ сервера: {"alternatives", "pronunciation", "queue_ms", "batch_size"}"""
+        body = encode_utterance(audio, language, vocabulary, noise_rms)
+        for attempt in range(2):
+            try:
+                connection = self._connection()
+                connection.request("POST", "/recognize", body, {"Content-Type": UTTERANCE_CONTENT_TYPE})
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                self._drop_connection()
+                if attempt:
+                    raise sr.RequestError(f"recognition server {self.host}:{self.port} is unavailable: {e}")
+        if payload.get("error") == "unknown":
+            raise sr.UnknownValueError()
+        if response.status != 200 or "error" in payload:
+            raise sr.RequestError(f"recognition server error: {payload.get('message', response.status)}")
+        return payload
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_alternatives(audio, language, vocabulary)[0]
+
+    def recognize_alternatives(self, audio, language, vocabulary=None):
+        return self.score(audio, language, vocabulary)["alternatives"]
+
+
+# Тело запроса к серверу: строка JSON с параметрами, затем сырые сэмплы
+UTTERANCE_CONTENT_TYPE = "application/x-speaking-game-utterance"
+
+
+def encode_utterance(audio, language, vocabulary=None, noise_rms=None):
+    """Запрос распознавания sr.AudioData для scoring_server"""
+    header = {
+        "language": language,
+        "sample_rate": audio.sample_rate,
+        "sample_width": audio.sample_width,
+        "vocabulary": list(vocabulary) if vocabulary else None,
+        "noise_rms": noise_rms,
+    }
+    return json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n" + bytes(audio.frame_data)
+
+
+def decode_utterance(body):
+    """(параметры, sr.AudioData) из тела запроса"""
+    header, _, frame_data = bytes(body).partition(b"\n")
+    header = json.loads(header)
+    return header, sr.AudioData(frame_data, header["sample_rate"], header["sample_width"])
+
+
+def audio_digest(audio):
+    """Отпечаток сырых данных sr.AudioData"""
+    return hashlib.sha1(bytes(audio.frame_data)).hexdigest()
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "sphinx": SphinxBackend,
+    "vosk": VoskBackend,
+    "remote": RemoteBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name=None):
+    """Создание движка по имени (по умолчанию из settings.RECOGNIZER_BACKEND)"""
+    name = (name or settings.RECOGNIZER_BACKEND).lower()
+    if name not in BACKENDS:
+        print(f"⚠️ Неизвестный движок распознавания '{name}', используется google")
+        name = "google"
+    return BACKENDS[name]()
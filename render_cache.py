@@ -0,0 +1,145 @@
+"""Кэши готовых к отрисовке поверхностей pygame"""
+import queue
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# Метка для изображений, которые не удалось загрузить
+_MISSING = object()
+
+# pygame.font не рассчитан на одновременную отрисовку из нескольких потоков:
+# весь текст (кэш строк, карточки перевода) рисуется под этой блокировкой
+font_lock = threading.Lock()
+
+
+def display_ready(surface, size=None):
+    """Копия поверхности нужного размера в пиксельном формате экрана.
+
+    Масштабирование сглаженное; результат предназначен для кэширования,
+    чтобы при отрисовке кадра оставался только blit.
+    """
+    size = tuple(size) if size else surface.get_size()
+    if surface.get_size() != size:
+        if surface.get_bitsize() not in (24, 32):
+            surface = surface.convert(32)
+        surface = pygame.transform.smoothscale(surface, size)
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+class SurfaceCache:
+    """LRU-кэш изображений, уже приведенных к формату экрана и нужному размеру"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetch_queue = None
+
+    def get(self, path, size):
+        """Возвращает поверхность для (путь, размер) или None, если файл не загружается"""
+        key = (path, tuple(size))
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self._surfaces.move_to_end(key)
+                self.hits += 1
+                return None if surface is _MISSING else surface
+            self.misses += 1
+
+        surface = self._load(path, key[1])
+        self._store(key, surface)
+        return None if surface is _MISSING else surface
+
+    def prefetch(self, paths, size):
+        """Загружает изображения в кэш в фоновом потоке"""
+        if self._prefetch_queue is None:
+            self._prefetch_queue = queue.Queue()
+            thread = threading.Thread(target=self._prefetch_worker)
+            thread.daemon = True
+            thread.start()
+        for path in paths:
+            self._prefetch_queue.put((path, tuple(size)))
+
+    def clear(self):
+        """Очистка кэша"""
+        with self._lock:
+            self._surfaces.clear()
+            self.current_bytes = 0
+
+    def _prefetch_worker(self):
+        while True:
+            path, size = self._prefetch_queue.get()
+            key = (path, size)
+            with self._lock:
+                cached = key in self._surfaces
+            if not cached:
+                self._store(key, self._load(path, size))
+
+    def _load(self, path, size):
+        try:
+            return display_ready(pygame.image.load(path), size)
+        except (pygame.error, OSError):
+            return _MISSING
+
+    @staticmethod
+    def _surface_bytes(surface):
+        if surface is _MISSING:
+            return 0
+        return surface.get_pitch() * surface.get_height()
+
+    def _store(self, key, surface):
+        size = self._surface_bytes(surface)
+        with self._lock:
+            if key in self._surfaces:
+                self.current_bytes -= self._surface_bytes(self._surfaces.pop(key))
+            self._surfaces[key] = surface
+            self.current_bytes += size
+            # Вытесняем самые старые записи, пока не уложимся в лимит
+            while self.current_bytes > self.max_bytes and len(self._surfaces) > 1:
+                _, old = self._surfaces.popitem(last=False)
+                self.current_bytes -= self._surface_bytes(old)
+
+
+class TextCache:
+    """LRU-кэш отрендеренных строк по ключу (шрифт, текст, цвет, сглаживание)"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, font, text, antialias, color):
+        """Замена font.render, возвращающая закэшированную поверхность"""
+        key = (font, text, tuple(color), antialias)
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self._surfaces.move_to_end(key)
+                self.hits += 1
+                return surface
+            self.misses += 1
+
+        with font_lock:
+            surface = font.render(text, antialias, color)
+        with self._lock:
+            self._surfaces[key] = surface
+            while len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Очистка кэша"""
+        with self._lock:
+            self._surfaces.clear()
+
+
+# Общий кэш текста для всех экранов
+text_cache = TextCache()
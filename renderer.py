@@ -0,0 +1,108 @@
+"""Послойная отрисовка экрана с обновлением только измененных областей"""
+import pygame
+
+# Наибольшее ожидание события в простое, мс (кадр все равно рисуется хотя бы так часто)
+IDLE_TIMEOUT = 1000
+
+
+class LayeredRenderer:
+    """Статичный слой рисуется один раз, динамические области — только при изменении.
+
+    Каждый кадр экран описывается так:
+        renderer.begin(static_key, draw_static)
+        renderer.region(name, rect, key, draw)
+        ...
+        renderer.present()
+
+    draw_static и draw рисуют прямо на экран. Область перерисовывается, когда
+    меняется ее ключ или прямоугольник, когда она исчезает из кадра или когда
+    она пересекается с другой перерисовываемой областью.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self._static = None
+        self._static_key = None
+        self._regions = {}
+        self._frame = []
+        self._full_redraw = True
+
+    def invalidate(self):
+        """Принудительная полная перерисовка на следующем кадре"""
+        self._static_key = None
+
+    def row(self, y, font):
+        """Прямоугольник строки текста во всю ширину экрана"""
+        return pygame.Rect(0, y, self.screen.get_width(), font.get_height())
+
+    def begin(self, static_key, draw_static):
+        """Начало кадра: статичный слой перерисовывается только при смене ключа"""
+        self._frame = []
+        if static_key != self._static_key or self._static is None:
+            draw_static()
+            self._static = self.screen.copy()
+            self._static_key = static_key
+            self._full_redraw = True
+
+    def region(self, name, rect, key, draw):
+        """Динамическая область кадра; draw вызывается только если она изменилась"""
+        self._frame.append((name, pygame.Rect(rect), key, draw))
+
+    def present(self):
+        """Отрисовка измененных областей и вывод их на дисплей"""
+        frame, self._frame = self._frame, []
+        previous = self._regions
+        self._regions = {name: (rect, key) for name, rect, key, _ in frame}
+
+        if self._full_redraw:
+            self._full_redraw = False
+            for _, _, _, draw in frame:
+                draw()
+            pygame.display.flip()
+            return
+
+        # Исчезнувшие области нужно стереть
+        dirty = [rect for name, (rect, _) in previous.items() if name not in self._regions]
+        redraw = set()
+        for name, rect, key, _ in frame:
+            old = previous.get(name)
+            if old is None or old != (rect, key):
+                redraw.add(name)
+                dirty.append(rect)
+                if old is not None:
+                    dirty.append(old[0])
+
+        # Области, задетые стиранием, перерисовываются тоже
+        grown = bool(dirty)
+        while grown:
+            grown = False
+            for name, rect, _, _ in frame:
+                if name not in redraw and rect.collidelist(dirty) != -1:
+                    redraw.add(name)
+                    dirty.append(rect)
+                    grown = True
+
+        if not dirty:
+            return
+        for rect in dirty:
+            self.screen.blit(self._static, rect, rect)
+        for name, _, _, draw in frame:
+            if name in redraw:
+                draw()
+        pygame.display.update(dirty)
+
+
+def next_events(clock, animating, fps=60, idle_timeout=IDLE_TIMEOUT):
+    """События для следующего кадра игрового цикла.
+
+    Пока что-то анимируется, кадры идут с частотой fps. В простое цикл
+    засыпает в pygame.event.wait до первого события (ввод, результат
+    распознавания) или до idle_timeout миллисекунд и не занимает процессор.
+    """
+    if animating:
+        clock.tick(fps)
+        return pygame.event.get()
+    event = pygame.event.wait(idle_timeout)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    events.extend(pygame.event.get())
+    return events
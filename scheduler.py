@@ -0,0 +1,135 @@
+"""Интервальное повторение слов: сроки и коэффициенты легкости (SM-2) в очереди с приоритетом"""
+import heapq
+import itertools
+import random
+import time
+
+MINUTE = 60.0
+DAY = 24 * 60 * MINUTE
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Ошибочный ответ повторяется в ближайшей игре
+RELEARN_INTERVAL = 10 * MINUTE
+# Интервалы первых двух правильных ответов
+FIRST_INTERVALS = (DAY, 6 * DAY)
+
+# Поля состояния слова, которое хранится в статистике списком (для JSON)
+DUE, EASE, INTERVAL, REPS = range(4)
+
+
+class Scheduler:
+    """Выбор слов для игры по сроку повторения.
+
+    states — словарь русское слово -> [срок, легкость, интервал, повторения]
+    из статистики игрока; планировщик меняет его на месте, поэтому он
+    сохраняется вместе со статистикой. Слова из learned без истории считаются
+    один раз правильно отвеченными сегодня. on_change(русское слово, состояние)
+    вызывается при каждом изменении состояния слова.
+
+    Для каждой категории при первом обращении строится куча (срок, порядок,
+    слово): выбор k слов стоит O(k log n). Новые слова получают срок на
+    момент создания планировщика — раньше них идут только просроченные
+    повторения. Обновленные записи добавляются в кучу заново, а устаревшие
+    пропускаются при извлечении.
+    """
+
+    def __init__(self, vocabulary, states, learned=(), now=None, rng=None, on_change=None):
+        self.vocabulary = vocabulary
+        self.states = states
+        self.rng = rng or random.Random()
+        self.on_change = on_change
+        now = time.time() if now is None else now
+        self._new_due = now
+        for word_ru in learned:
+            if word_ru not in states:
+                self._update(word_ru, [now + FIRST_INTERVALS[0], DEFAULT_EASE, FIRST_INTERVALS[0], 1])
+        self._heaps = {}
+        self._order = itertools.count()
+
+    def _update(self, word_ru, state):
+        self.states[word_ru] = state
+        if self.on_change is not None:
+            self.on_change(word_ru, state)
+
+    def due(self, word_ru):
+        """Срок повторения слова"""
+        state = self.states.get(word_ru)
+        return state[DUE] if state else self._new_due
+
+    def _heap(self, category_id):
+        heap = self._heaps.get(category_id)
+        if heap is None:
+            words = list(self.vocabulary.words(category_id))
+            # Случайный порядок среди слов с одинаковым сроком (например, новых)
+            self.rng.shuffle(words)
+            heap = [(self.due(word.ru), next(self._order), word) for word in words]
+            heapq.heapify(heap)
+            self._heaps[category_id] = heap
+        return heap
+
+    def _take(self, category_id, count, taken):
+        """Извлечение до count актуальных записей категории, не входящих в taken"""
+        heap = self._heap(category_id)
+        picked = []
+        skipped = []
+        while heap and len(picked) < count:
+            entry = heapq.heappop(heap)
+            due, _, word = entry
+            if due != self.due(word.ru):
+                continue
+            if word.ru in taken:
+                skipped.append(entry)
+                continue
+            picked.append(entry)
+            taken.add(word.ru)
+        # Слова остаются в очереди до ответа на них
+        for entry in picked + skipped:
+            heapq.heappush(heap, entry)
+        return [word for _, _, word in picked]
+
+    def related(self, category_id):
+        """Другие категории, начиная с соседних по порядку в словаре"""
+        ids = list(self.vocabulary.categories())
+        position = ids.index(category_id)
+        return sorted((other for other in ids if other != category_id),
+                      key=lambda other: abs(ids.index(other) - position))
+
+    def select(self, category_id, count):
+        """count слов с ближайшим сроком повторения (list of Word).
+
+        Если в категории меньше слов, недостающие по очереди берутся из
+        связанных категорий.
+        """
+        taken = set()
+        words = self._take(category_id, count, taken)
+        others = self.related(category_id)
+        while len(words) < count and others:
+            for other in list(others):
+                extra = self._take(other, 1, taken)
+                if not extra:
+                    others.remove(other)
+                    continue
+                words.extend(extra)
+                if len(words) == count:
+                    break
+        return words
+
+    def review(self, word, correct, now=None):
+        """Учет ответа на слово: новый срок и легкость по SM-2"""
+        now = time.time() if now is None else now
+        state = self.states.get(word.ru) or [now, DEFAULT_EASE, 0.0, 0]
+        if correct:
+            state[REPS] += 1
+            if state[REPS] <= len(FIRST_INTERVALS):
+                state[INTERVAL] = FIRST_INTERVALS[state[REPS] - 1]
+            else:
+                state[INTERVAL] *= state[EASE]
+        else:
+            state[REPS] = 0
+            state[INTERVAL] = RELEARN_INTERVAL
+            state[EASE] = max(MIN_EASE, state[EASE] - 0.2)
+        state[DUE] = now + state[INTERVAL]
+        self._update(word.ru, state)
+        if word.category in self._heaps:
+            heapq.heappush(self._heaps[word.category], (state[DUE], next(self._order), word))
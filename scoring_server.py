@@ -0,0 +1,280 @@
+"""Сервер распознавания для класса: один компьютер распознает ответы всех игр.
+
+Игры подключаются движком remote (SPEAKING_GAME_RECOGNIZER=remote,
+SPEAKING_GAME_SERVER=http://адрес:8765). Запросы от всех клиентов попадают
+в общую очередь и распределяются по пулу процессов; каждый процесс один
+раз загружает свой движок. Движки, которые умеют распознавать пакетом
+(recognize_batch), получают небольшие пакеты (до max_batch запросов или
+max_wait секунд ожидания); остальным каждый запрос отдается отдельно
+первому свободному процессу. Вместе с гипотезами сервер
+возвращает признаки произношения (pronunciation.analyze_audio).
+
+    python scoring_server.py --backend vosk --workers 4
+    python scoring_server.py --backend standin   # замер без модели
+
+GET /stats отдает пропускную способность и задержки очереди.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import speech_recognition as sr
+
+from pronunciation import analyze_audio
+from recognizers import BACKENDS, RecognizerBackend, UTTERANCE_CONTENT_TYPE, decode_utterance
+
+DEFAULT_PORT = 8765
+MAX_BODY = 16 * 1024 * 1024
+# Соединение без запросов закрывается через это время
+IDLE_TIMEOUT = 60.0
+_SAMPLE_TYPES = {2: "<i2", 4: "<i4"}
+
+
+class StandInBackend(RecognizerBackend):
+    """Модель-заглушка для замеров: фиксированная стоимость пакета и каждого запроса.
+
+    Возвращает первое слово словаря запроса (или "hello"); batch_cost
+    моделирует накладные расходы запуска модели, которые делятся на пакет.
+    """
+
+    name = "standin"
+
+    def __init__(self, batch_cost=0.05, item_cost=0.005):
+        self.batch_cost = batch_cost
+        self.item_cost = item_cost
+
+    def recognize(self, audio, language, vocabulary=None):
+        return self.recognize_batch([(audio, language, vocabulary)])[0][0]
+
+    def recognize_batch(self, items):
+        time.sleep(self.batch_cost + self.item_cost * len(items))
+        return [[vocabulary[0] if vocabulary else "hello"] for _, _, vocabulary in items]
+
+
+# Движок процесса пула (создается один раз в каждом процессе)
+_backend = None
+
+
+def _backend_class(name):
+    return StandInBackend if name == StandInBackend.name else BACKENDS[name]
+
+
+def _init_worker(backend_name, options):
+    global _backend
+    _backend = _backend_class(backend_name)(**options)
+
+
+def _pronunciation(header, audio):
+    dtype = _SAMPLE_TYPES.get(audio.sample_width)
+    if dtype is None:
+        return None
+    samples = np.frombuffer(audio.frame_data, dtype=dtype)
+    features = analyze_audio(samples, audio.sample_rate, noise_rms=header.get("noise_rms"))
+    features.pop("envelope", None)
+    return features
+
+
+def _recognize_one(audio, language, vocabulary):
+    try:
+        return {"alternatives": _backend.recognize_alternatives(audio, language, vocabulary)}
+    except sr.UnknownValueError:
+        return {"error": "unknown"}
+    except sr.RequestError as e:
+        return {"error": "request", "message": str(e)}
+
+
+def _recognize_batch(bodies):
+    """Распознавание пакета запросов в процессе пула"""
+    started = time.perf_counter()
+    utterances = [decode_utterance(body) for body in bodies]
+    items = [(audio, header["language"], header.get("vocabulary")) for header, audio in utterances]
+    recognize_batch = getattr(_backend, "recognize_batch", None)
+    if recognize_batch is not None:
+        results = [{"alternatives": alternatives} for alternatives in recognize_batch(items)]
+    else:
+        results = [_recognize_one(*item) for item in items]
+    for result, (header, audio) in zip(results, utterances):
+        result["pronunciation"] = _pronunciation(header, audio)
+    return results, time.perf_counter() - started
+
+
+class ScoringServer:
+    """HTTP-сервер с очередью и пакетной обработкой запросов распознавания"""
+
+    def __init__(self, backend="vosk", workers=2, max_batch=8, max_wait=0.02, backend_options=None):
+        self.backend = backend
+        self.workers = workers
+        # Пакет одного процесса распознается по очереди, поэтому без recognize_batch запросы не собираются в пакеты
+        self.max_batch = max_batch if hasattr(_backend_class(backend), "recognize_batch") else 1
+        self.max_wait = max_wait
+        self.backend_options = backend_options or {}
+        self._pool = None
+        self._queue = None
+        self._slots = None
+        self._started = time.time()
+        self.requests = 0
+        self.batches = 0
+        # Последние замеры для /stats
+        self.queue_times = collections.deque(maxlen=1000)
+        self.batch_times = collections.deque(maxlen=1000)
+
+    async def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        """Запуск сервера (до остановки процесса)"""
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(self.backend, self.backend_options))
+        self._queue = asyncio.Queue()
+        # Пакетов в работе не больше, чем процессов: остальные запросы копятся в очереди
+        self._slots = asyncio.Semaphore(self.workers)
+        batcher = asyncio.ensure_future(self._batcher())
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🎧 Сервер распознавания ({self.backend}, процессов: {self.workers}, "
+              f"пакет до {self.max_batch}) на {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._pool.shutdown(cancel_futures=True)
+
+    async def recognize(self, body):
+        """Постановка запроса в очередь; результат — словарь ответа"""
+        future = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        await self._queue.put((time.perf_counter(), body, future))
+        return await future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            results, batch_time = await loop.run_in_executor(self._pool, _recognize_batch,
+                                                             [body for _, body, _ in batch])
+        except Exception as e:
+            results = [{"error": "request", "message": str(e)}] * len(batch)
+            batch_time = time.perf_counter() - started
+        finally:
+            self._slots.release()
+        self.batches += 1
+        self.batch_times.append(batch_time)
+        for (queued, _, future), result in zip(batch, results):
+            queue_time = started - queued
+            self.queue_times.append(queue_time)
+            if not future.done():
+                future.set_result(dict(result, queue_ms=queue_time * 1000, batch_size=len(batch)))
+
+    def stats(self):
+        """Пропускная способность и задержки по последним запросам"""
+        uptime = time.time() - self._started
+        queue_ms = np.array(self.queue_times) * 1000
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "requests_per_second": self.requests / uptime if uptime else 0.0,
+            "queue_ms_p50": float(np.percentile(queue_ms, 50)) if queue_ms.size else None,
+            "queue_ms_p95": float(np.percentile(queue_ms, 95)) if queue_ms.size else None,
+            "batch_ms_mean": float(np.mean(self.batch_times)) * 1000 if self.batch_times else None,
+        }
+
+    async def _handle_connection(self, reader, writer):
+        # Соединение обслуживает запросы по очереди, пока клиент его не закроет (keep-alive)
+        try:
+            while True:
+                request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            _write_response(writer, 400, {"error": "request", "message": str(e)}, False)
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, headers, body):
+        if method == "POST" and path == "/recognize":
+            if headers.get("content-type") != UTTERANCE_CONTENT_TYPE:
+                return 415, {"error": "request", "message": f"expected {UTTERANCE_CONTENT_TYPE}"}
+            return 200, await self.recognize(body)
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+        return 404, {"error": "request", "message": f"{method} {path}: not found"}
+
+
+async def _read_request(reader):
+    """(метод, путь, заголовки, тело) или None, если клиент закрыл соединение"""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise ValueError(f"request body is larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 415: "Unsupported Media Type"}
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер распознавания речи для класса")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default="vosk", choices=sorted(set(BACKENDS) - {"remote"} | {"standin"}))
+    parser.add_argument("--workers", type=int, default=2, help="число процессов распознавания")
+    parser.add_argument("--max-batch", type=int, default=8, help="наибольший размер пакета (для движков с recognize_batch)")
+    parser.add_argument("--max-wait", type=float, default=0.02, help="ожидание пакета, секунд")
+    args = parser.parse_args()
+    server = ScoringServer(args.backend, args.workers, args.max_batch, args.max_wait)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Сервер остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Настройки игры, задаваемые переменными окружения"""
+import os
+
+# Каталог файлов состояния: прогресс игроков и калибровка микрофона
+STATE_DIR = os.environ.get("SPEAKING_GAME_STATE_DIR", ".")
+
+# Каталог для архива записанных ответов (пусто — ответы не сохраняются на диск)
+AUDIO_ARCHIVE_DIR = os.environ.get("SPEAKING_GAME_AUDIO_ARCHIVE") or None
+
+# Движок распознавания: google, sphinx, vosk, remote или fake (см. recognizers.BACKENDS)
+RECOGNIZER_BACKEND = os.environ.get("SPEAKING_GAME_RECOGNIZER", "google")
+
+# Каталоги моделей Vosk по коду языка
+VOSK_MODELS = {
+    "en": os.environ.get("SPEAKING_GAME_VOSK_MODEL_EN"),
+    "ru": os.environ.get("SPEAKING_GAME_VOSK_MODEL_RU"),
+}
+
+# Адрес сервера распознавания класса (scoring_server.py) для движка remote
+RECOGNITION_SERVER = os.environ.get("SPEAKING_GAME_SERVER", "http://127.0.0.1:8765")
+
+# Профиль игрока в базе прогресса (на общем компьютере — у каждого свой)
+PROFILE = os.environ.get("SPEAKING_GAME_PROFILE", "default")
+
+# Замеры времени стадий (timing.py): сводка сессии и метрики Prometheus пишутся в TIMING_DIR
+TIMING = os.environ.get("SPEAKING_GAME_TIMING", "").lower() in ("1", "true", "yes")
+TIMING_DIR = os.environ.get("SPEAKING_GAME_TIMING_DIR") or os.path.join(STATE_DIR, "timings")
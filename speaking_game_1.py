@@ -1,63 +1,48 @@
 import speech_recognition as sr
-import sounddevice as sd
-from scipy.io.wavfile import write
-import tempfile
 import os
-import random
 import time
 import sys
-import json
 from datetime import datetime
-import wave
-import numpy as np
+from audio_capture import StreamRecorder, VoiceActivityDetector, input_device_name, measure_ambient
+from noise_floor import NoiseFloor
+from pronunciation import analyze_audio
+from recognizers import create_backend
+from answer_matching import resolve_answer
+import settings
+from scheduler import Scheduler
+from progress_store import ProgressStore
+import timing
+from timing import timed
+from vocabulary import vocabulary
 
 class SpeakingGame:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
+        timing.start_session("speaking_game_1")
+        self.backend = create_backend()
+        # Уровень шума калибруется один раз и хранится между запусками
+        self.noise_floor = NoiseFloor.load(input_device_name())
+        if not self.noise_floor.calibrated:
+            self.calibrate_microphone()
+        # Определение конца ответа: запись останавливается после паузы
+        self.vad = VoiceActivityDetector(trailing_silence = 0.8, noise_floor = self.noise_floor)
         self.score = 0
         self.lives = 3
         self.streak = 0
         self.max_streak = 0
-        self.session_stats = {
-            "games_played": 0,
-            "total_score": 0,
-            "best_score": 0,
-            "words_learned": set()
-        }
-        
         # Загрузка статистики
         self.load_stats()
         
+        # Сроки повторения слов хранятся вместе со статистикой, изменения пишутся в базу прогресса
+        self.scheduler = Scheduler(vocabulary, self.session_stats["schedule"],
+                                   learned=self.session_stats["words_learned"],
+                                   on_change=self.progress.scheduled)
+        
         self.levels = {
             "1": {"name": "Новичок", "words": 5, "time_limit": 10, "multiplier": 1},
             "2": {"name": "Средний", "words": 8, "time_limit": 8, "multiplier": 1.5},
             "3": {"name": "Эксперт", "words": 12, "time_limit": 5, "multiplier": 2}
         }
         
-        # Тематические наборы слов
-        self.word_categories = {
-            "1": {"name": "Базовые слова", "words": {
-                "кот": "cat", "собака": "dog", "дом": "house", "солнце": "sun",
-                "вода": "water", "книга": "book", "стол": "table", "окно": "window",
-                "яблоко": "apple", "машина": "car", "рука": "hand", "нога": "leg"
-            }},
-            "2": {"name": "Еда и напитки", "words": {
-                "хлеб": "bread", "молоко": "milk", "чай": "tea", "кофе": "coffee",
-                "суп": "soup", "сыр": "cheese", "мясо": "meat", "рыба": "fish",
-                "фрукты": "fruits", "овощи": "vegetables", "салат": "salad"
-            }},
-            "3": {"name": "Природа и животные", "words": {
-                "дерево": "tree", "цветок": "flower", "птица": "bird", "лес": "forest",
-                "река": "river", "море": "sea", "горы": "mountains", "небо": "sky",
-                "звезда": "star", "луна": "moon", "погода": "weather"
-            }},
-            "4": {"name": "Город и транспорт", "words": {
-                "город": "city", "улица": "street", "парк": "park", "магазин": "shop",
-                "школа": "school", "больница": "hospital", "автобус": "bus",
-                "поезд": "train", "самолет": "airplane", "велосипед": "bicycle"
-            }}
-        }
-        
         # Система достижений
         self.achievements = {
             "first_blood": {"name": "Первая кровь", "desc": "Завершите первую игру", "earned": False},
@@ -68,61 +53,23 @@ class SpeakingGame:
         }
 
     def load_stats(self):
-        """Загрузка статистики из файла"""
-        try:
-            with open("game_stats.json", "r", encoding = "utf-8") as f:
-                self.session_stats = json.load(f)
-                # Преобразование set обратно из list
-                self.session_stats["words_learned"] = set(self.session_stats.get("words_learned", []))
-        except FileNotFoundError:
-            pass
+        """Загрузка статистики профиля игрока из базы прогресса (запись идет в фоновом потоке)"""
+        self.progress = ProgressStore(settings.PROFILE, front_end="speaking_game_1")
+        self.session_stats = self.progress.stats
 
-    def save_stats(self):
-        """Сохранение статистики в файл"""
-        try:
-            stats_to_save = self.session_stats.copy()
-            stats_to_save["words_learned"] = list(stats_to_save["words_learned"])
-            with open("game_stats.json", "w", encoding = "utf-8") as f:
-                json.dump(stats_to_save, f, ensure_ascii = False, indent = 2)
-        except Exception as e:
-            print(f"⚠️ Не удалось сохранить статистику: {e}")
+    @timed
+    def calibrate_microphone(self, duration = 1.0):
+        """Однократная калибровка уровня фонового шума"""
+        print("🔇 Калибровка микрофона: помолчите секунду...")
+        ambient = measure_ambient(duration)
+        if ambient:
+            self.noise_floor.calibrate(ambient.as_array())
+            self.noise_floor.save()
 
-    def analyze_pronunciation(self, audio_file, correct_word):
-        """Анализ произношения (упрощенная версия)"""
-        try:
-            with wave.open(audio_file, 'rb') as wav_file:
-                frames = wav_file.getnframes()
-                rate = wav_file.getframerate()
-                duration = frames / float(rate)
-                
-                # Читаем аудиоданные
-                signal = wav_file.readframes(frames)
-                audio_data = np.frombuffer(signal, dtype = np.int16)
-                
-                # Простой анализ громкости
-                volume = np.sqrt(np.mean(audio_data**2))
-                
-                feedback = []
-                
-                # Проверка длительности
-                if duration < 0.5:
-                    feedback.append("🗣️ Слишком коротко")
-                elif duration > 3.0:
-                    feedback.append("🗣️ Слишком долго")
-                else:
-                    feedback.append("🗣️ Хорошая длительность")
-                
-                # Проверка громкости
-                if volume < 1000:
-                    feedback.append("🔈 Слишком тихо")
-                elif volume > 10000:
-                    feedback.append("🔊 Слишком громко")
-                else:
-                    feedback.append("🔊 Хорошая громкость")
-                
-                return feedback
-        except:
-            return ["🔧 Анализ произношения недоступен"]
+    @timed
+    def analyze_pronunciation(self, audio_clip, correct_word):
+        """Анализ произношения: словарь признаков, подсказки — в ключе feedback"""
+        return analyze_audio(audio_clip.as_array(), audio_clip.sample_rate, noise_rms = self.noise_floor.rms)
 
     def check_achievements(self):
         """Проверка и выдача достижений"""
@@ -160,31 +107,35 @@ class SpeakingGame:
                 ach = self.achievements[ach_id]
                 print(f"   🎊 {ach['name']}: {ach['desc']}")
 
+    @timed
     def record_audio(self, duration = 5, sample_rate = 44100):
-        """Запись аудио с микрофона"""
+        """Запись ответа с микрофона до паузы после фразы (не дольше duration секунд)"""
         print("\n🎤 Запись начинается... Говорите!")
-        try:
-            audio_data = sd.rec(int(duration * sample_rate), samplerate = sample_rate, channels = 1, dtype = 'int16')
-            sd.wait()
-            
-            with tempfile.NamedTemporaryFile(suffix = '.wav', delete = False) as tmp_file:
-                write(tmp_file.name, sample_rate, audio_data)
-                return tmp_file.name
-        except Exception as e:
-            print(f"❌ Ошибка записи аудио: {e}")
+        recorder = StreamRecorder(sample_rate, vad = self.vad)
+        if not recorder.start(duration):
+            return None
+        recorder.wait(duration + 1)
+        audio_clip = recorder.stop()
+        if not audio_clip:
+            print("🔇 Речь не обнаружена")
             return None
+        
+        # На диск ответ попадает только при включенном архиве
+        if settings.AUDIO_ARCHIVE_DIR:
+            audio_clip.archive(settings.AUDIO_ARCHIVE_DIR)
+        return audio_clip
 
-    def recognize_speech(self, audio_file):
-        """Распознавание речи из аудиофайла"""
-        if not audio_file:
+    @timed
+    def recognize_speech(self, audio_clip, answers = None, expected = None):
+        """Распознавание речи из записанного ответа (answers — ответы категории, expected — правильный)"""
+        if not audio_clip:
             return None
             
         try:
-            with sr.AudioFile(audio_file) as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration = 0.5)
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio, language = 'en-US')
-                return text.lower()
+            audio = audio_clip.as_audio_data()
+            alternatives = self.backend.recognize_alternatives(audio, 'en-US', answers)
+            # Любая из n-best гипотез, совпавшая с ответом категории, дает этот ответ
+            return resolve_answer(alternatives, answers, 'en', expected) if answers else alternatives[0].lower()
         except sr.UnknownValueError:
             return None
         except sr.RequestError as e:
@@ -192,10 +143,8 @@ class SpeakingGame:
             return None
 
     def get_word_list(self, category_id, level):
-        """Получение списка слов в зависимости от категории и уровня"""
-        category = self.word_categories[category_id]
-        all_words = list(category["words"].keys())
-        return random.sample(all_words, self.levels[level]["words"])
+        """Слова для игры: сначала те, которые пора повторить (недостающие — из соседних категорий)"""
+        return self.scheduler.select(category_id, self.levels[level]["words"])
 
     def show_ascii_art(self, state):
         """Показ ASCII графики"""
@@ -259,12 +208,12 @@ class SpeakingGame:
     def choose_category(self):
         """Выбор категории слов"""
         print(f"\n📚 ВЫБЕРИТЕ КАТЕГОРИЮ СЛОВ:")
-        for key, category in self.word_categories.items():
-            print(f"   {key}. {category['name']} ({len(category['words'])} слов)")
+        for key, name in vocabulary.categories().items():
+            print(f"   {key}. {name} ({vocabulary.size(key)} слов)")
         
         while True:
             choice = input("\nВаш выбор (1-4): ").strip()
-            if choice in self.word_categories:
+            if choice in vocabulary:
                 return choice
             print("❌ Пожалуйста, выберите от 1 до 4")
 
@@ -284,9 +233,6 @@ class SpeakingGame:
         """Основной игровой цикл"""
         self.show_ascii_art("welcome")
         
-        # Обновление статистики
-        self.session_stats["games_played"] += 1
-        
         # Выбор режима
         game_mode = self.choose_mode()
         is_training = game_mode == "2"
@@ -297,7 +243,7 @@ class SpeakingGame:
         
         # Выбор категории
         category_id = self.choose_category()
-        category = self.word_categories[category_id]
+        category_name = vocabulary.name(category_id)
         
         # Выбор уровня сложности
         print(f"\n🎚️  ВЫБЕРИТЕ УРОВЕНЬ СЛОЖНОСТИ:")
@@ -313,8 +259,11 @@ class SpeakingGame:
         current_level = self.levels[level_choice]
         words = self.get_word_list(category_id, level_choice)
         
+        # Обновление статистики
+        self.progress.game_started(category_id, level_choice, game_mode)
+        
         print(f"\n🚀 НАЧИНАЕМ!")
-        print(f"📚 Категория: {category['name']}")
+        print(f"📚 Категория: {category_name}")
         print(f"🎯 Уровень: {current_level['name']}")
         print(f"🔤 Слов для перевода: {len(words)}")
         print(f"⏱️  Время на ответ: {current_level['time_limit']} секунд")
@@ -326,24 +275,32 @@ class SpeakingGame:
         
         # Игровой цикл
         perfect_game = True
-        for i, word_ru in enumerate(words, 1):
+        # Недостающие слова могут прийти из соседних категорий
+        answers = tuple(dict.fromkeys(vocabulary.answers(category_id) + tuple(word.en for word in words)))
+        for i, word in enumerate(words, 1):
+            word_ru = word.ru
             print(f"\n{'='*50}")
             self.show_progress(i, len(words), self.score, self.lives if not is_training else 999, self.streak)
             print(f"\n🔤 Русское слово: {word_ru.upper()}")
             print(f"⏱️  У вас {current_level['time_limit']} секунд...")
             
-            correct_answer = category["words"][word_ru]
+            correct_answer = word.en
             self.show_ascii_art("microphone")
             
             # Запись и распознавание
-            audio_file = self.record_audio(duration=current_level['time_limit'])
-            user_answer = self.recognize_speech(audio_file)
+            audio_clip = self.record_audio(duration=current_level['time_limit'])
+            recognition_start = time.perf_counter()
+            user_answer = self.recognize_speech(audio_clip, answers, correct_answer)
+            latency = time.perf_counter() - recognition_start
             
             # Анализ произношения
-            pronunciation_feedback = self.analyze_pronunciation(audio_file, correct_answer) if audio_file else []
+            pronunciation = self.analyze_pronunciation(audio_clip, correct_answer) if audio_clip else None
+            pronunciation_feedback = pronunciation["feedback"] if pronunciation else []
             
             # Проверка ответа
-            if user_answer and user_answer == correct_answer:
+            correct = bool(user_answer and user_answer == correct_answer)
+            self.scheduler.review(word, correct)
+            if correct:
                 self.streak += 1
                 self.max_streak = max(self.max_streak, self.streak)
                 base_points = 10
@@ -352,7 +309,7 @@ class SpeakingGame:
                 points_earned = base_points + streak_bonus + level_bonus
                 
                 self.score += points_earned
-                self.session_stats["words_learned"].add(word_ru)
+                self.progress.attempt(word, True, correct_answer, user_answer, points_earned, latency, pronunciation)
                 
                 self.show_ascii_art("correct")
                 print(f"✅ Отлично! Вы сказали: '{user_answer}'")
@@ -366,6 +323,7 @@ class SpeakingGame:
             else:
                 self.streak = 0
                 perfect_game = False
+                self.progress.attempt(word, False, correct_answer, user_answer, latency=latency, pronunciation=pronunciation)
                 
                 if not is_training:
                     self.lives -= 1
@@ -401,7 +359,7 @@ class SpeakingGame:
         
         # Завершение игры
         if is_training or self.lives > 0:
-            print(f"\n🎊 Поздравляем! Вы завершили {category['name']}!")
+            print(f"\n🎊 Поздравляем! Вы завершили {category_name}!")
             print(f"🏆 Ваш финальный счет: {self.score}")
             
             # Бонусы
@@ -417,11 +375,12 @@ class SpeakingGame:
             
             print(f"💎 Итоговый счет: {self.score}")
             
-            # Обновление лучшего счета
             if self.score > self.session_stats["best_score"]:
-                self.session_stats["best_score"] = self.score
                 print("🏅 Новый рекорд!")
         
+        # Итог игры; рекордом считается только пройденная игра
+        self.progress.game_finished(self.score, completed=is_training or self.lives > 0)
+        
         # Проверка достижений
         new_achievements = self.check_achievements()
         
@@ -431,8 +390,8 @@ class SpeakingGame:
         # Показать достижения
         self.show_achievements(new_achievements)
         
-        # Сохранить статистику
-        self.save_stats()
+        # Сохранить уровень шума (статистика уже в хранилище прогресса)
+        self.noise_floor.save()
         
         # Предложение сыграть еще раз
         print(f"\n{'=' * 50}")
@@ -443,6 +402,7 @@ class SpeakingGame:
             self.lives = 3
             self.play_game()
         else:
+            self.progress.close()
             print("\nСпасибо за игру! До встречи! 👋")
             print("Ваш прогресс сохранен.")
 
@@ -2,17 +2,28 @@ import pygame
 import sys
 import os
 import requests
-from PIL import Image, ImageDraw, ImageFont
 import io
-import json
 import speech_recognition as sr
-import sounddevice as sd
-from scipy.io.wavfile import write
-import tempfile
-import random
 import time
-import numpy as np
-import wave
+import settings
+from scheduler import Scheduler
+from progress_store import ProgressStore
+from vocabulary import vocabulary, image_path
+from render_cache import text_cache
+from renderer import LayeredRenderer, IDLE_TIMEOUT, next_events
+from animation import pulse_animation
+from audio_capture import StreamRecorder, VoiceActivityDetector, input_device_name, measure_ambient
+from noise_floor import NoiseFloor
+from pronunciation import analyze_audio
+from recognizers import create_backend
+from answer_matching import resolve_answer
+from assets import AssetIndex
+from asset_pack import AssetPack
+from translation_cards import CardDeck
+from recognition_worker import RecognitionPool, RECOGNITION_DONE
+from debug_overlay import DebugOverlay
+import timing
+from timing import timed
 # Инициализация Pygame
 pygame.init()
 
@@ -20,6 +31,7 @@ pygame.init()
 WIDTH, HEIGHT = 1000, 700
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Говори Правильно - Игра с Переводом")
+renderer = LayeredRenderer(screen)
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -36,100 +48,45 @@ font = pygame.font.SysFont('Arial', 24)
 title_font = pygame.font.SysFont('Arial', 32, bold=True)
 large_font = pygame.font.SysFont('Arial', 48, bold=True)
 
+# Анимация индикатора записи
+RECORDING_CENTER = (WIDTH//2 - 300, HEIGHT - 100 + font.get_height()//2)
+
+# Место карточки перевода в визуальном режиме
+CARD_RECT = pygame.Rect(WIDTH//2 - 300, HEIGHT//2 - 225, 600, 450)
+recording_pulse = pulse_animation(radius=10, ring_step=2)
+
 class SpeakingGame:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
+        timing.start_session("speaking_game_2")
+        self.backend = create_backend()
+        # Уровень шума калибруется один раз и хранится между запусками
+        self.noise_floor = NoiseFloor.load(input_device_name())
+        if not self.noise_floor.calibrated:
+            self.calibrate_microphone()
+        # Запись заканчивается после паузы в конце ответа, time_limit — предел
+        vad = VoiceActivityDetector(trailing_silence=0.8, noise_floor=self.noise_floor)
+        self.recorder = StreamRecorder(vad=vad)
+        self.recognition_pool = RecognitionPool()
         self.score = 0
         self.lives = 3
         self.streak = 0
         self.max_streak = 0
-        self.session_stats = {
-            "games_played": 0,
-            "total_score": 0,
-            "best_score": 0,
-            "words_learned": set()
-        }
-        
         # Загрузка статистики
         self.load_stats()
         
+        # Сроки повторения слов хранятся вместе со статистикой, изменения пишутся в базу прогресса
+        self.scheduler = Scheduler(vocabulary, self.session_stats["schedule"],
+                                   learned=self.session_stats["words_learned"],
+                                   on_change=self.progress.scheduled)
+        
         self.levels = {
             "1": {"name": "Новичок", "words": 5, "time_limit": 10, "multiplier": 1},
             "2": {"name": "Средний", "words": 8, "time_limit": 8, "multiplier": 1.5},
             "3": {"name": "Эксперт", "words": 12, "time_limit": 5, "multiplier": 2}
         }
         
-        # Тематические наборы слов с изображениями
-        self.word_categories = {
-            "1": {"name": "Базовые слова", "words": {
-                "кот": "cat", "собака": "dog", "дом": "house", "солнце": "sun",
-                "вода": "water", "книга": "book", "стол": "table", "окно": "window",
-                "яблоко": "apple", "машина": "car", "рука": "hand", "нога": "leg"
-            }, "images":{
-                "кот": "cat.jpg",
-                "собака": "dog.webp",
-                "дом": "house.jpg",
-                "солнце": "sun.jpg",
-                "вода": "water.jpg", 
-                "книга": "book.jpg", 
-                "стол": "table.jpg", 
-                "окно": "window.jpg",
-                "яблоко": "apple.jpg", 
-                "машина": "car.jpg", 
-                "рука": "hand.jpg", 
-                "нога": "leg.jpg"
-            }},
-            "2": {"name": "Еда и напитки", "words": {
-                "хлеб": "bread", "молоко": "milk", "чай": "tea", "кофе": "coffee",
-                "суп": "soup", "сыр": "cheese", "мясо": "meat", "рыба": "fish",
-                "фрукты": "fruits", "овощи": "vegetables", "салат": "salad"
-            }, "images":{
-                "хлеб": "bread.jpg", 
-                "молоко": "milk.jpg", 
-                "чай": "tea.jpg", 
-                "кофе": "coffee.jpg",
-                "суп": "soup.jpg", 
-                "сыр": "cheese.jpg", 
-                "мясо": "meat.jpg", 
-                "рыба": "fish.jpg",
-                "фрукты": "fruits.jpg", 
-                "овощи": "vegetables.jpg", 
-                "салат": "salad.jpg"
-            }},
-            "3": {"name": "Природа и животные", "words": {
-                "дерево": "tree", "цветок": "flower", "птица": "bird", "лес": "forest",
-                "река": "river", "море": "sea", "горы": "mountains", "небо": "sky",
-                "звезда": "star", "луна": "moon", "погода": "weather"
-            }, "images":{
-                "дерево": "tree.jpg", 
-                "цветок": "flower.jpg", 
-                "птица": "bird.jpg", 
-                "лес": "forest.jpg",
-                "река": "river.jpg", 
-                "море": "sea.jpg", 
-                "горы": "mountains.jpg", 
-                "небо": "sky.jpg",
-                "звезда": "star.jpg", 
-                "луна": "moon.jpg", 
-                "погода": "weather.jpg"
-            }},
-            "4": {"name": "Город и транспорт", "words": {
-                "город": "city", "улица": "street", "парк": "park", "магазин": "shop",
-                "школа": "school", "больница": "hospital", "автобус": "bus",
-                "поезд": "train", "самолет": "airplane", "велосипед": "bicycle"
-            }, "images": {
-                "город": "city.jpg", 
-                "улица": "street.jpg", 
-                "парк": "park.jpg", 
-                "магазин": "shop.jpg",
-                "школа": "school.jpg", 
-                "больница": "hospital.jpg", 
-                "автобус": "bus.jpg",
-                "поезд": "train.jpg", 
-                "самолет": "airplane.jpg", 
-                "велосипед": "bicycle.jpg"
-            }}
-        }
+        # Отсутствующие и несобранные изображения сообщаются один раз при выборе категории
+        self.assets = AssetIndex()
         
         # Система достижений
         self.achievements = {
@@ -145,133 +102,91 @@ class SpeakingGame:
         self.current_state = "menu"
         self.current_word_index = 0
         self.current_words = []
+        self.current_answers = ()
         self.current_category = None
         self.current_level = None
         self.game_mode = None
         self.recording = False
         self.recording_start_time = 0
         self.recording_duration = 0
+        self.recognizing = False
+        # Задача распознавания текущей попытки; результаты других задач не засчитываются
+        self.current_job = None
         self.last_result = None
+        self.new_record = False
         self.waiting_for_input = False
         self.current_image = None
+        self.cards = CardDeck(CARD_RECT.size)
+        
+        # Картинки слов читаются из пакета ресурсов только для выбранной категории
+        self.asset_pack = AssetPack.open()
+        self.category_images = {}
+        # Отладочная панель (F3): частота кадров и задержки стадий
+        self.overlay = DebugOverlay()
 
-    def create_unified_translation_image(self, russian_word, english_translation, category_id):
-        """Создает единое изображение с русским и английским текстом"""
-        try:
-            # Параметры изображения
-            width, height = 800, 600
-            image = Image.new('RGB', (width, height), color=(30, 30, 50))
-            draw = ImageDraw.Draw(image)
-            
-            # Загрузка шрифтов
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 48)
-                subtitle_font = ImageFont.truetype("arial.ttf", 36)
-                info_font = ImageFont.truetype("arial.ttf", 20)
-            except:
-                title_font = ImageFont.load_default()
-                subtitle_font = ImageFont.load_default()
-                info_font = ImageFont.load_default()
-            
-            # Заголовок
-            title_text = "🎓 ОБУЧЕНИЕ АНГЛИЙСКОМУ"
-            title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-            title_width = title_bbox[2] - title_bbox[0]
-            title_x = (width - title_width) // 2
-            draw.text((title_x, 30), title_text, fill=(255, 215, 0), font=title_font)
-            
-            # Разделительная линия
-            draw.line([(50, 100), (width-50, 100)], fill=(100, 100, 150), width=2)
-            
-            # Русское слово (крупно)
-            russian_bbox = draw.textbbox((0, 0), russian_word.upper(), font=title_font)
-            russian_width = russian_bbox[2] - russian_bbox[0]
-            russian_x = (width - russian_width) // 2
-            draw.text((russian_x, 150), russian_word.upper(), fill=(255, 255, 255), font=title_font)
-            
-            # Метка "Русский"
-            draw.text((width//2 - 100, 220), "РУССКИЙ", fill=(100, 200, 100), font=info_font)
-            
-            # Стрелка перевода
-            arrow_y = 280
-            draw.polygon([(width//2-20, arrow_y), (width//2+20, arrow_y), (width//2, arrow_y+40)], fill=(100, 200, 255))
-            draw.text((width//2-30, arrow_y+50), "ПЕРЕВОД", fill=(100, 200, 255), font=info_font)
-            
-            # Английский перевод (крупно)
-            english_bbox = draw.textbbox((0, 0), english_translation.upper(), font=title_font)
-            english_width = english_bbox[2] - english_bbox[0]
-            english_x = (width - english_width) // 2
-            draw.text((english_x, 350), english_translation.upper(), fill=(100, 200, 255), font=title_font)
-            
-            # Метка "Английский"
-            draw.text((width//2 - 100, 420), "АНГЛИЙСКИЙ", fill=(100, 200, 255), font=info_font)
-            
-            # Инструкция для пользователя
-            instruction = "🎤 Произнесите английское слово вслух после сигнала!"
-            instr_bbox = draw.textbbox((0, 0), instruction, font=info_font)
-            instr_width = instr_bbox[2] - instr_bbox[0]
-            instr_x = (width - instr_width) // 2
-            draw.text((instr_x, 500), instruction, fill=(255, 150, 100), font=info_font)
-            
-            # Рамка вокруг всего изображения
-            draw.rectangle([10, 10, width-10, height-10], outline=(100, 100, 150), width=3)
-            
-            # Сохранение изображения
-            filename = f"translation_{russian_word}.jpg"
-            image.save(filename)
-            
-            # Загрузка изображения в Pygame
-            pygame_image = pygame.image.load(filename)
-            return pygame_image
-            
-        except Exception as e:
-            print(f"⚠️ Ошибка создания изображения: {e}")
-            return None
+    def translation_card(self, word):
+        """Карточка перевода слова игры (обычно уже готова в фоне)"""
+        return self.cards.get(word.ru, word.en, self.category_images.get(word.ru))
 
     def load_stats(self):
-        """Загрузка статистики из файла"""
-        try:
-            with open("game_stats.json", "r", encoding="utf-8") as f:
-                self.session_stats = json.load(f)
-                self.session_stats["words_learned"] = set(self.session_stats.get("words_learned", []))
-        except FileNotFoundError:
-            pass
-
-    def save_stats(self):
-        """Сохранение статистики в файл"""
-        try:
-            stats_to_save = self.session_stats.copy()
-            stats_to_save["words_learned"] = list(stats_to_save["words_learned"])
-            with open("game_stats.json", "w", encoding="utf-8") as f:
-                json.dump(stats_to_save, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Не удалось сохранить статистику: {e}")
-
-    def record_audio(self, duration=5, sample_rate=44100):
-        """Запись аудио с микрофона"""
-        print("\n🎤 Запись начинается... Говорите!")
-        try:
-            audio_data = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=1, dtype='int16')
-            sd.wait()
-            
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                write(tmp_file.name, sample_rate, audio_data)
-                return tmp_file.name
-        except Exception as e:
-            print(f"❌ Ошибка записи аудио: {e}")
+        """Загрузка статистики профиля игрока из базы прогресса (запись идет в фоновом потоке)"""
+        self.progress = ProgressStore(settings.PROFILE, front_end="speaking_game_2")
+        self.session_stats = self.progress.stats
+
+    @timed
+    def calibrate_microphone(self, duration=1.0):
+        """Однократная калибровка уровня фонового шума"""
+        print("🔇 Калибровка микрофона: помолчите секунду...")
+        ambient = measure_ambient(duration)
+        if ambient:
+            self.noise_floor.calibrate(ambient.as_array())
+            self.noise_floor.save()
+
+    def start_recording(self):
+        """Запуск фоновой записи на время отсчета"""
+        self.recording_duration = self.levels[self.current_level]["time_limit"]
+        if not self.recorder.start(self.recording_duration):
+            return
+        self.recording = True
+        self.recording_start_time = time.time()
+        self.last_result = None
+
+    def finish_recording(self):
+        """Остановка записи и отправка сигнала на распознавание в фоне"""
+        self.recording = False
+        audio_clip = self.recorder.stop()
+        timing.record("record_audio", time.time() - self.recording_start_time)
+        self.recognizing = True
+        correct_answer = self.current_words[self.current_word_index].en
+        self.current_job = self.recognition_pool.submit(self.recognize_recording, audio_clip, self.current_answers,
+                                                        correct_answer, word_index=self.current_word_index)
+
+    def recognize_recording(self, job, audio_clip, answers, correct_answer):
+        """Распознавание и анализ записанного ответа (выполняется в фоновом потоке)"""
+        if not audio_clip:
             return None
+        # На диск ответ попадает только при включенном архиве
+        if settings.AUDIO_ARCHIVE_DIR:
+            audio_clip.archive(settings.AUDIO_ARCHIVE_DIR)
+        recognition_start = time.perf_counter()
+        text = self.recognize_speech(audio_clip, answers, correct_answer)
+        return {
+            "text": text,
+            "latency": time.perf_counter() - recognition_start,
+            "pronunciation": self.analyze_pronunciation(audio_clip, correct_answer)
+        }
 
-    def recognize_speech(self, audio_file):
-        """Распознавание речи из аудиофайла"""
-        if not audio_file:
+    @timed
+    def recognize_speech(self, audio_clip, answers=None, expected=None):
+        """Распознавание речи из записанного ответа (answers — ответы категории, expected — правильный)"""
+        if not audio_clip:
             return None
             
         try:
-            with sr.AudioFile(audio_file) as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio, language='en-US')
-                return text.lower()
+            audio = audio_clip.as_audio_data()
+            alternatives = self.backend.recognize_alternatives(audio, 'en-US', answers)
+            # Любая из n-best гипотез, совпавшая с ответом категории, дает этот ответ
+            return resolve_answer(alternatives, answers, 'en', expected) if answers else alternatives[0].lower()
         except sr.UnknownValueError:
             return None
         except sr.RequestError as e:
@@ -279,42 +194,13 @@ class SpeakingGame:
             return None
 
     def get_word_list(self, category_id, level):
-        """Получение списка слов в зависимости от категории и уровня"""
-        category = self.word_categories[category_id]
-        all_words = list(category["words"].keys())
-        return random.sample(all_words, self.levels[level]["words"])
+        """Слова для игры: сначала те, которые пора повторить (недостающие — из соседних категорий)"""
+        return self.scheduler.select(category_id, self.levels[level]["words"])
 
-    def analyze_pronunciation(self, audio_file, correct_word):
-        """Анализ произношения"""
-        try:
-            with wave.open(audio_file, 'rb') as wav_file:
-                frames = wav_file.getnframes()
-                rate = wav_file.getframerate()
-                duration = frames / float(rate)
-                
-                signal = wav_file.readframes(frames)
-                audio_data = np.frombuffer(signal, dtype=np.int16)
-                volume = np.sqrt(np.mean(audio_data**2))
-                
-                feedback = []
-                
-                if duration < 0.5:
-                    feedback.append("🗣️ Слишком коротко")
-                elif duration > 3.0:
-                    feedback.append("🗣️ Слишком долго")
-                else:
-                    feedback.append("🗣️ Хорошая длительность")
-                
-                if volume < 1000:
-                    feedback.append("🔈 Слишком тихо")
-                elif volume > 10000:
-                    feedback.append("🔊 Слишком громко")
-                else:
-                    feedback.append("🔊 Хорошая громкость")
-                
-                return feedback
-        except:
-            return ["🔧 Анализ произношения недоступен"]
+    @timed
+    def analyze_pronunciation(self, audio_clip, correct_word):
+        """Анализ произношения: словарь признаков, подсказки — в ключе feedback"""
+        return analyze_audio(audio_clip.as_array(), audio_clip.sample_rate, noise_rms=self.noise_floor.rms)
 
     def check_achievements(self):
         """Проверка и выдача достижений"""
@@ -340,26 +226,56 @@ class SpeakingGame:
         self.current_level = level_id
         self.game_mode = game_mode
         self.current_words = self.get_word_list(category_id, level_id)
+        # Недостающие слова могут прийти из соседних категорий
+        self.current_answers = tuple(dict.fromkeys(vocabulary.answers(category_id)
+                                                   + tuple(word.en for word in self.current_words)))
         self.current_word_index = 0
         self.score = 0
         self.streak = 0
         self.lives = 3 if game_mode == "1" else 999
+        # Незавершенное распознавание прошлой игры не попадет в новую
+        self.recognition_pool.cancel_all()
+        self.current_job = None
+        self.recognizing = False
         self.current_state = "game"
-        self.session_stats["games_played"] += 1
+        self.progress.game_started(category_id, level_id, game_mode)
         
-        # Создаем первое изображение для визуального режима
+        # Карточки всех слов игры рисуются в фоне, пока игрок отвечает
         if game_mode == "3" and self.current_words:
-            first_word = self.current_words[0]
-            english_translation = self.word_categories[category_id]["words"][first_word]
-            self.current_image = self.create_unified_translation_image(first_word, english_translation, category_id)
+            self.cards.prerender([(word.ru, word.en, self.category_images.get(word.ru))
+                                  for word in self.current_words])
+            self.current_image = self.translation_card(self.current_words[0])
 
+    def finish_game(self):
+        """Переход к результатам и запись итога игры в хранилище прогресса"""
+        self.new_record = self.score > self.session_stats["best_score"]
+        self.current_state = "result"
+        self.progress.game_finished(self.score)
+
+    def load_category_images(self, category_id):
+        """Загрузка картинок выбранной категории из пакета ресурсов"""
+        self.assets.check([image_path(word) for word in vocabulary.words(category_id) if word.image])
+        if self.asset_pack and category_id in self.asset_pack.categories():
+            self.category_images = self.asset_pack.load_category(category_id)
+        else:
+            self.category_images = {}
+
+    @timed
     def draw_menu(self):
         """Отрисовка главного меню"""
+        # Меню полностью статично и меняется только вместе со статистикой
+        menu_key = ("menu", self.session_stats["games_played"], self.session_stats["best_score"],
+                    len(self.session_stats["words_learned"]))
+        renderer.begin(menu_key, self.draw_menu_static)
+
+    @timed
+    def draw_menu_static(self):
+        """Отрисовка статичного слоя меню"""
         screen.fill(DARK_BLUE)
         
         # Заголовок
-        title = title_font.render("🎓 ГОВОРИ ПРАВИЛЬНО", True, GOLD)
-        subtitle = font.render("Учи английский с помощью речи", True, LIGHT_BLUE)
+        title = text_cache.render(title_font, "🎓 ГОВОРИ ПРАВИЛЬНО", True, GOLD)
+        subtitle = text_cache.render(font, "Учи английский с помощью речи", True, LIGHT_BLUE)
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 50))
         screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, 100))
         
@@ -372,36 +288,36 @@ class SpeakingGame:
         ]
         
         for text in stats_text:
-            stat_surface = font.render(text, True, WHITE)
+            stat_surface = text_cache.render(font, text, True, WHITE)
             screen.blit(stat_surface, (WIDTH//2 - stat_surface.get_width()//2, stats_y))
             stats_y += 40
         
         # Выбор категории
         cat_y = 300
-        cat_title = font.render("📚 ВЫБЕРИТЕ КАТЕГОРИЮ СЛОВ:", True, WHITE)
+        cat_title = text_cache.render(font, "📚 ВЫБЕРИТЕ КАТЕГОРИЮ СЛОВ:", True, WHITE)
         screen.blit(cat_title, (WIDTH//2 - cat_title.get_width()//2, cat_y))
         cat_y += 40
         
-        for key, category in self.word_categories.items():
-            image_info = f" 🖼️({len(category.get('images', {}))} изображений)"
-            cat_text = font.render(f"{key}. {category['name']} ({len(category['words'])} слов){image_info}", True, LIGHT_BLUE)
+        for key, name in vocabulary.categories().items():
+            image_info = f" 🖼️({vocabulary.image_count(key)} изображений)"
+            cat_text = text_cache.render(font, f"{key}. {name} ({vocabulary.size(key)} слов){image_info}", True, LIGHT_BLUE)
             screen.blit(cat_text, (WIDTH//2 - cat_text.get_width()//2, cat_y))
             cat_y += 30
         
         # Выбор уровня
         level_y = 450
-        level_title = font.render("🎚️ ВЫБЕРИТЕ УРОВЕНЬ СЛОЖНОСТИ:", True, WHITE)
+        level_title = text_cache.render(font, "🎚️ ВЫБЕРИТЕ УРОВЕНЬ СЛОЖНОСТИ:", True, WHITE)
         screen.blit(level_title, (WIDTH//2 - level_title.get_width()//2, level_y))
         level_y += 40
         
         for key, level in self.levels.items():
-            level_text = font.render(f"{key}. {level['name']} ({level['words']} слов, {level['time_limit']} сек)", True, LIGHT_BLUE)
+            level_text = text_cache.render(font, f"{key}. {level['name']} ({level['words']} слов, {level['time_limit']} сек)", True, LIGHT_BLUE)
             screen.blit(level_text, (WIDTH//2 - level_text.get_width()//2, level_y))
             level_y += 30
         
         # Выбор режима
         mode_y = 550
-        mode_title = font.render("🎮 ВЫБЕРИТЕ РЕЖИМ ИГРЫ:", True, WHITE)
+        mode_title = text_cache.render(font, "🎮 ВЫБЕРИТЕ РЕЖИМ ИГРЫ:", True, WHITE)
         screen.blit(mode_title, (WIDTH//2 - mode_title.get_width()//2, mode_y))
         mode_y += 40
         
@@ -412,45 +328,94 @@ class SpeakingGame:
         ]
         
         for mode in modes:
-            mode_surface = font.render(mode, True, LIGHT_BLUE)
+            mode_surface = text_cache.render(font, mode, True, LIGHT_BLUE)
             screen.blit(mode_surface, (WIDTH//2 - mode_surface.get_width()//2, mode_y))
             mode_y += 30
         
         # Инструкция
-        instruction = font.render("Нажмите цифру для выбора, ESC для выхода", True, WHITE)
+        instruction = text_cache.render(font, "Нажмите цифру для выбора, ESC для выхода", True, WHITE)
         screen.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT - 50))
 
+    @timed
     def draw_game(self):
         """Отрисовка игрового экрана"""
+        game_key = ("game", self.current_word_index, self.game_mode, id(self.current_image))
+        renderer.begin(game_key, self.draw_game_static)
+        
+        # Статистика
+        stats_line = f"🎯 Счет: {self.score} | ❤️ Жизни: {self.lives} | 🔥 Серия: {self.streak}"
+        renderer.region("stats", pygame.Rect(WIDTH//2, 20, WIDTH//2, font.get_height()), stats_line,
+                        lambda: self.draw_game_stats(stats_line))
+        
+        # Инструкция
+        if self.recording:
+            elapsed = time.time() - self.recording_start_time
+            remaining = max(0, self.recording_duration - elapsed)
+            instruction = (f"🎤 Запись... Говорите! Осталось: {remaining:.1f} сек", RED)
+        elif self.recognizing:
+            instruction = ("⏳ Распознавание...", LIGHT_BLUE)
+        else:
+            instruction = ("🎤 Нажмите ПРОБЕЛ для начала записи", GOLD)
+        renderer.region("instruction", renderer.row(HEIGHT - 100, font), instruction,
+                        lambda: self.draw_centered_line(*instruction, HEIGHT - 100))
+        
+        # Индикатор записи
+        if self.recording:
+            pulse_frame = int(elapsed * 60) % len(recording_pulse)
+            renderer.region("recording", recording_pulse.rect(RECORDING_CENTER), pulse_frame,
+                            lambda: recording_pulse.draw(screen, RECORDING_CENTER, pulse_frame))
+        
+        # Результат предыдущей попытки
+        if self.last_result:
+            result_color = GREEN if self.last_result["correct"] else RED
+            message = self.last_result["message"]
+            renderer.region("result", renderer.row(HEIGHT - 150, font), (message, result_color),
+                            lambda: self.draw_centered_line(message, result_color, HEIGHT - 150))
+            
+            # Подсказки по произношению
+            feedback = self.last_result.get("feedback")
+            if feedback:
+                renderer.region("pronunciation", renderer.row(HEIGHT - 60, font), feedback,
+                                lambda: self.draw_centered_line(feedback, LIGHT_BLUE, HEIGHT - 60))
+
+    @timed
+    def draw_centered_line(self, text, color, y):
+        """Отрисовка строки текста по центру экрана"""
+        surface = text_cache.render(font, text, True, color)
+        screen.blit(surface, (WIDTH//2 - surface.get_width()//2, y))
+
+    @timed
+    def draw_game_stats(self, stats_line):
+        """Отрисовка счета, жизней и серии"""
+        stats_text = text_cache.render(font, stats_line, True, WHITE)
+        screen.blit(stats_text, (WIDTH - stats_text.get_width() - 20, 20))
+
+    @timed
+    def draw_game_static(self):
+        """Отрисовка статичного слоя игрового экрана"""
         screen.fill(DARK_BLUE)
         
         # Прогресс
         progress = int((self.current_word_index / len(self.current_words)) * 20)
         bar = "█" * progress + "░" * (20 - progress)
-        progress_text = font.render(f"📊 Прогресс: [{bar}] {self.current_word_index}/{len(self.current_words)}", True, WHITE)
+        progress_text = text_cache.render(font, f"📊 Прогресс: [{bar}] {self.current_word_index}/{len(self.current_words)}", True, WHITE)
         screen.blit(progress_text, (20, 20))
         
-        # Статистика
-        stats_text = font.render(f"🎯 Счет: {self.score} | ❤️ Жизни: {self.lives} | 🔥 Серия: {self.streak}", True, WHITE)
-        screen.blit(stats_text, (WIDTH - stats_text.get_width() - 20, 20))
-        
         # Текущее слово
-        current_word_ru = self.current_words[self.current_word_index]
-        current_category = self.word_categories[self.current_category]
-        correct_answer = current_category["words"][current_word_ru]
+        current_word_ru = self.current_words[self.current_word_index].ru
+        correct_answer = self.current_words[self.current_word_index].en
         
         # Визуальный режим - показываем изображение
         if self.game_mode == "3" and self.current_image:
-            # Масштабируем изображение для отображения
-            scaled_image = pygame.transform.scale(self.current_image, (600, 450))
-            screen.blit(scaled_image, (WIDTH//2 - 300, HEIGHT//2 - 225))
+            # Карточка уже приведена к размеру показа
+            screen.blit(self.current_image, CARD_RECT)
         else:
             # Классический режим - показываем текст
             # Отображение русского слова
-            ru_text = large_font.render(current_word_ru.upper(), True, WHITE)
+            ru_text = text_cache.render(large_font, current_word_ru.upper(), True, WHITE)
             screen.blit(ru_text, (WIDTH//2 - ru_text.get_width()//2, HEIGHT//2 - 100))
             
-            ru_label = font.render("РУССКИЙ", True, GREEN)
+            ru_label = text_cache.render(font, "РУССКИЙ", True, GREEN)
             screen.blit(ru_label, (WIDTH//2 - ru_label.get_width()//2, HEIGHT//2 - 150))
             
             # Стрелка перевода
@@ -460,38 +425,29 @@ class SpeakingGame:
                 (WIDTH//2, HEIGHT//2 + 10)
             ])
             
-            translate_label = font.render("ПЕРЕВОД", True, LIGHT_BLUE)
+            translate_label = text_cache.render(font, "ПЕРЕВОД", True, LIGHT_BLUE)
             screen.blit(translate_label, (WIDTH//2 - translate_label.get_width()//2, HEIGHT//2 + 20))
             
             # Английский перевод
-            en_text = large_font.render(correct_answer.upper(), True, LIGHT_BLUE)
+            en_text = text_cache.render(large_font, correct_answer.upper(), True, LIGHT_BLUE)
             screen.blit(en_text, (WIDTH//2 - en_text.get_width()//2, HEIGHT//2 + 80))
             
-            en_label = font.render("АНГЛИЙСКИЙ", True, LIGHT_BLUE)
+            en_label = text_cache.render(font, "АНГЛИЙСКИЙ", True, LIGHT_BLUE)
             screen.blit(en_label, (WIDTH//2 - en_label.get_width()//2, HEIGHT//2 + 150))
-        
-        # Инструкция
-        if self.recording:
-            elapsed = time.time() - self.recording_start_time
-            remaining = max(0, self.recording_duration - elapsed)
-            instruction = font.render(f"🎤 Запись... Говорите! Осталось: {remaining:.1f} сек", True, RED)
-        else:
-            instruction = font.render("🎤 Нажмите ПРОБЕЛ для начала записи", True, GOLD)
-        
-        screen.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT - 100))
-        
-        # Результат предыдущей попытки
-        if self.last_result:
-            result_color = GREEN if self.last_result["correct"] else RED
-            result_text = font.render(self.last_result["message"], True, result_color)
-            screen.blit(result_text, (WIDTH//2 - result_text.get_width()//2, HEIGHT - 150))
 
+    @timed
     def draw_result(self):
         """Отрисовка экрана результатов"""
+        result_key = ("result", self.score, self.current_word_index, len(self.current_words), self.max_streak)
+        renderer.begin(result_key, self.draw_result_static)
+
+    @timed
+    def draw_result_static(self):
+        """Отрисовка статичного слоя экрана результатов"""
         screen.fill(DARK_BLUE)
         
         # Заголовок
-        title = title_font.render("🎊 РЕЗУЛЬТАТЫ ИГРЫ", True, GOLD)
+        title = text_cache.render(title_font, "🎊 РЕЗУЛЬТАТЫ ИГРЫ", True, GOLD)
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 50))
         
         # Статистика игры
@@ -500,24 +456,22 @@ class SpeakingGame:
             f"🎯 Финальный счет: {self.score}",
             f"📊 Слов переведено: {self.current_word_index}/{len(self.current_words)}",
             f"🔥 Максимальная серия: {self.max_streak}",
-            f"📚 Новых слов выучено: {len([w for w in self.current_words if w in self.session_stats['words_learned']])}"
+            f"📚 Новых слов выучено: {len([w for w in self.current_words if w.ru in self.session_stats['words_learned']])}"
         ]
         
         for stat in stats:
-            stat_surface = font.render(stat, True, WHITE)
+            stat_surface = text_cache.render(font, stat, True, WHITE)
             screen.blit(stat_surface, (WIDTH//2 - stat_surface.get_width()//2, stats_y))
             stats_y += 40
         
-        # Обновление лучшего счета
-        if self.score > self.session_stats["best_score"]:
-            self.session_stats["best_score"] = self.score
-            new_record = font.render("🏅 НОВЫЙ РЕКОРД!", True, GOLD)
+        if self.new_record:
+            new_record = text_cache.render(font, "🏅 НОВЫЙ РЕКОРД!", True, GOLD)
             screen.blit(new_record, (WIDTH//2 - new_record.get_width()//2, stats_y))
             stats_y += 50
         
         # Кнопки
-        restart_text = font.render("Нажмите R для новой игры", True, LIGHT_BLUE)
-        menu_text = font.render("Нажмите M для возврата в меню", True, LIGHT_BLUE)
+        restart_text = text_cache.render(font, "Нажмите R для новой игры", True, LIGHT_BLUE)
+        menu_text = text_cache.render(font, "Нажмите M для возврата в меню", True, LIGHT_BLUE)
         
         screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT - 100))
         screen.blit(menu_text, (WIDTH//2 - menu_text.get_width()//2, HEIGHT - 60))
@@ -529,8 +483,9 @@ class SpeakingGame:
                 return False
             
             # Выбор категории
-            if event.unicode in self.word_categories:
+            if event.unicode in vocabulary:
                 self.selected_category = event.unicode
+                self.load_category_images(event.unicode)
                 
             # Выбор уровня
             if event.unicode in self.levels:
@@ -554,30 +509,30 @@ class SpeakingGame:
         """Обработка ввода во время игры"""
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
+                if self.recording:
+                    self.recorder.stop()
+                    self.recording = False
+                self.recognition_pool.cancel_all()
+                self.current_job = None
+                self.recognizing = False
                 self.current_state = "menu"
                 return True
             
-            if event.key == pygame.K_SPACE and not self.recording and not self.waiting_for_input:
+            if event.key == pygame.K_SPACE and not self.recording and not self.recognizing and not self.waiting_for_input:
                 # Начало записи
-                self.recording = True
-                self.recording_start_time = time.time()
-                self.recording_duration = self.levels[self.current_level]["time_limit"]
-                self.last_result = None
+                self.start_recording()
             
             if event.key == pygame.K_RETURN and self.waiting_for_input:
                 # Переход к следующему слову
                 self.waiting_for_input = False
                 self.current_word_index += 1
                 
-                # Создаем новое изображение для следующего слова в визуальном режиме
+                # Карточка следующего слова уже нарисована в фоне
                 if self.game_mode == "3" and self.current_word_index < len(self.current_words):
-                    next_word = self.current_words[self.current_word_index]
-                    english_translation = self.word_categories[self.current_category]["words"][next_word]
-                    self.current_image = self.create_unified_translation_image(next_word, english_translation, self.current_category)
+                    self.current_image = self.translation_card(self.current_words[self.current_word_index])
                 
                 if self.current_word_index >= len(self.current_words):
-                    self.current_state = "result"
-                    self.save_stats()
+                    self.finish_game()
         
         return True
 
@@ -599,95 +554,132 @@ class SpeakingGame:
         if self.current_state == "game" and self.recording:
             elapsed = time.time() - self.recording_start_time
             
-            if elapsed >= self.recording_duration:
+            if elapsed >= self.recording_duration or self.recorder.finished:
                 # Завершение записи
-                self.recording = False
-                audio_file = self.record_audio(duration=self.recording_duration)
-                user_answer = self.recognize_speech(audio_file)
-                
-                # Проверка ответа
-                current_word_ru = self.current_words[self.current_word_index]
-                current_category = self.word_categories[self.current_category]
-                correct_answer = current_category["words"][current_word_ru]
-                
-                if user_answer and user_answer == correct_answer:
-                    self.streak += 1
-                    self.max_streak = max(self.max_streak, self.streak)
-                    base_points = 10
-                    streak_bonus = min(self.streak - 1, 5) * 2
-                    level_bonus = int(base_points * (self.levels[self.current_level]["multiplier"] - 1))
-                    points_earned = base_points + streak_bonus + level_bonus
-                    
-                    self.score += points_earned
-                    self.session_stats["words_learned"].add(current_word_ru)
-                    
-                    self.last_result = {
-                        "correct": True,
-                        "message": f"✅ Правильно! +{points_earned} очков"
-                    }
-                    
-                    # Проверка достижений
-                    self.check_achievements()
-                else:
-                    self.streak = 0
-                    if self.game_mode == "1":  # Классический режим
-                        self.lives -= 1
-                    
-                    if user_answer:
-                        self.last_result = {
-                            "correct": False,
-                            "message": f"❌ Неправильно. Вы сказали: '{user_answer}'"
-                        }
-                    else:
-                        self.last_result = {
-                            "correct": False,
-                            "message": f"❌ Речь не распознана. Правильно: '{correct_answer}'"
-                        }
-                    
-                    # Проверка окончания игры в классическом режиме
-                    if self.game_mode == "1" and self.lives <= 0:
-                        self.current_state = "result"
-                        self.save_stats()
-                        return
-                
-                self.waiting_for_input = True
-                
-                # Очистка временного файла
-                if audio_file and os.path.exists(audio_file):
-                    os.unlink(audio_file)
+                self.finish_recording()
 
-    def run(self):
-        """Основной игровой цикл"""
+    def handle_recognition_done(self, event):
+        """Обработка результата распознавания из фонового потока"""
+        # Результат прерванной задачи (другого слова или прошлой игры) не засчитываем
+        if event.job is not self.current_job:
+            return
+        self.current_job = None
+        self.recognizing = False
+        if self.current_state != "game" or event.word_index != self.current_word_index:
+            return
+        result = event.result or {}
+        user_answer = result.get("text")
+        pronunciation = result.get("pronunciation")
+        
+        # Проверка ответа
+        current_word = self.current_words[self.current_word_index]
+        correct_answer = current_word.en
+        
+        correct = bool(user_answer and user_answer == correct_answer)
+        self.scheduler.review(current_word, correct)
+        if correct:
+            self.streak += 1
+            self.max_streak = max(self.max_streak, self.streak)
+            base_points = 10
+            streak_bonus = min(self.streak - 1, 5) * 2
+            level_bonus = int(base_points * (self.levels[self.current_level]["multiplier"] - 1))
+            points_earned = base_points + streak_bonus + level_bonus
+            
+            self.score += points_earned
+            self.progress.attempt(current_word, True, correct_answer, user_answer, points_earned,
+                                  result.get("latency"), pronunciation)
+            
+            self.last_result = {
+                "correct": True,
+                "message": f"✅ Правильно! +{points_earned} очков"
+            }
+            
+            # Проверка достижений
+            self.check_achievements()
+        else:
+            self.streak = 0
+            self.progress.attempt(current_word, False, correct_answer, user_answer,
+                                  latency=result.get("latency"), pronunciation=pronunciation)
+            if self.game_mode == "1":  # Классический режим
+                self.lives -= 1
+            
+            if user_answer:
+                self.last_result = {
+                    "correct": False,
+                    "message": f"❌ Неправильно. Вы сказали: '{user_answer}'"
+                }
+            else:
+                self.last_result = {
+                    "correct": False,
+                    "message": f"❌ Речь не распознана. Правильно: '{correct_answer}'"
+                }
+            
+            # Проверка окончания игры в классическом режиме
+            if self.game_mode == "1" and self.lives <= 0:
+                self.finish_game()
+                return
+        
+        if pronunciation:
+            self.last_result["feedback"] = "   ".join(pronunciation["feedback"])
+        self.waiting_for_input = True
+
+    @timed
+    def step(self, events):
+        """Один кадр: обработка событий, обновление и отрисовка; False — выход из игры"""
         running = True
-        clock = pygame.time.Clock()
-        
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                
-                # Обработка ввода в зависимости от состояния
-                if self.current_state == "menu":
-                    running = self.handle_menu_input(event)
-                elif self.current_state == "game":
-                    running = self.handle_game_input(event)
-                elif self.current_state == "result":
-                    running = self.handle_result_input(event)
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            
+            if event.type == RECOGNITION_DONE:
+                self.handle_recognition_done(event)
+                continue
             
-            # Обновление игры
-            self.update_game()
+            if self.overlay.handle_event(event):
+                continue
             
-            # Отрисовка
+            # Обработка ввода в зависимости от состояния
             if self.current_state == "menu":
-                self.draw_menu()
+                running = self.handle_menu_input(event) and running
             elif self.current_state == "game":
-                self.draw_game()
+                running = self.handle_game_input(event) and running
             elif self.current_state == "result":
-                self.draw_result()
-            
-            pygame.display.flip()
-            clock.tick(60)
+                running = self.handle_result_input(event) and running
+        
+        # Обновление игры
+        self.update_game()
+        
+        # Отрисовка
+        if self.current_state == "menu":
+            self.draw_menu()
+        elif self.current_state == "game":
+            self.draw_game()
+        elif self.current_state == "result":
+            self.draw_result()
+        
+        self.overlay.draw(renderer)
+        renderer.present()
+        self.overlay.frame()
+        return running
+
+    def animating(self):
+        """Нужны ли кадры с полной частотой: во время записи идут отсчет и индикатор"""
+        return self.current_state == "game" and self.recording
+
+    def run(self):
+        """Основной игровой цикл"""
+        running = True
+        clock = pygame.time.Clock()
+        events = pygame.event.get()
+        
+        while running:
+            running = self.step(events)
+            if running:
+                # Вне записи экран не меняется сам: цикл ждет ввода или результата распознавания
+                events = next_events(clock, self.animating(), idle_timeout=self.overlay.idle_timeout(IDLE_TIMEOUT))
         
+        self.progress.close()
+        self.noise_floor.save()
         pygame.quit()
         sys.exit()
 
@@ -1,5 +1,18 @@
-import pygame, threading
+import pygame, threading, time
 import speech_recognition as sr
+from render_cache import SurfaceCache, text_cache
+from renderer import LayeredRenderer, IDLE_TIMEOUT, next_events
+from animation import pulse_animation
+from noise_floor import NoiseFloor
+from recognizers import create_backend
+from answer_matching import resolve_answer
+from assets import AssetIndex
+from vocabulary import vocabulary, image_path
+from recognition_worker import RecognitionPool, RECOGNITION_DONE
+from progress_store import ProgressStore
+from debug_overlay import DebugOverlay
+import settings, timing
+from timing import timed
 
 # Инициализация Pygame
 pygame.init()
@@ -7,6 +20,7 @@ WIDTH, HEIGHT = 1000, 700
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Говори Правильно")
 clock = pygame.time.Clock()
+renderer = LayeredRenderer(screen)
 
 # Цвета
 WHITE, BLACK, BLUE, RED, GREEN = (255,255,255), (0,0,0), (0,0,255), (255,0,0), (0,128,0)
@@ -16,20 +30,58 @@ DARK_BLUE, GOLD, LIGHT_BLUE = (30,30,50), (255,215,0), (100,200,255)
 font_big = pygame.font.SysFont('Arial', 48, bold=True)
 font_medium = pygame.font.SysFont('Arial', 28)
 
-# Слова с картинками
-words = [
-    {"ru": "кот", "en": "cat", "img": "images/cat.jpg"},
-    {"ru": "дом", "en": "house", "img": "images/house.jpg"},
-    {"ru": "яблоко", "en": "apple", "img": "images/apple.jpg"},
-    {"ru": "машина", "en": "car", "img": "images/car.jpg"},
-    {"ru": "солнце", "en": "sun", "img": "images/sun.jpg"},
-    {"ru": "вода", "en": "water", "img": "images/water.jpg"},
-    {"ru": "книга", "en": "book", "img": "images/book.jpg"},
-    {"ru": "стол", "en": "table", "img": "images/table.jpg"},
-]
+# Кэш изображений (размер на экране и лимит памяти)
+IMAGE_SIZE = (400, 300)
+IMAGE_CACHE_BYTES = 32 * 1024 * 1024
+image_cache = SurfaceCache(IMAGE_CACHE_BYTES)
+# Собранные assets.py изображения вместо исходников
+assets = AssetIndex()
+
+# Анимация индикатора записи
+RECORDING_CENTER = (WIDTH // 2, 350)
+recording_pulse = pulse_animation()
+
+# Слова с картинками: набор игры из категории "Базовые слова" общего словаря
+GAME_CATEGORY = "1"
+GAME_WORDS = ["кот", "дом", "яблоко", "машина", "солнце", "вода", "книга", "стол"]
+words = [vocabulary.word(GAME_CATEGORY, word_ru) for word_ru in GAME_WORDS]
+
+def default_microphone_name():
+    try:
+        audio = sr.Microphone.get_pyaudio().PyAudio()
+        try: return audio.get_default_input_device_info()["name"]
+        finally: audio.terminate()
+    except Exception: return "default"
+
+class ListenCancelled(Exception):
+    """Задачу распознавания отменили, пока она слушала микрофон"""
+
+class CancellableStream:
+    """Поток источника звука, прерывающий listen() после отмены задачи.
+
+    Отмена проверяется перед чтением каждого блока, поэтому отмененная задача
+    освобождает микрофон почти сразу, а не после таймаута listen().
+    """
+    def __init__(self, stream, job): self.stream, self.job = stream, job
+    def read(self, size):
+        if self.job.cancelled: raise ListenCancelled()
+        return self.stream.read(size)
+    def __getattr__(self, name): return getattr(self.stream, name)
 
 class SpeechGame:
+    # Источник звука для sr.Recognizer; замеры подменяют его записанными ответами
+    microphone_source = sr.Microphone
+
     def __init__(self):
+        timing.start_session("speaking_game_3")
+        # Уровень шума калибруется один раз; дальше его подстраивают сами распознаватели
+        self.backend = create_backend()
+        self.noise_floor = NoiseFloor.load(default_microphone_name())
+        if not self.noise_floor.calibrated: self.calibrate_microphone()
+        # Пока один поток распознает ответ по сети, другой может слушать микрофон
+        self.microphone_lock = threading.Lock()
+        self.recognition_pool = RecognitionPool(workers=2, worker_state=self.make_recognizer)
+        self.current_job = None
         self.current_word_index = 0
         self.recognition_result = ""
         self.is_listening = False
@@ -42,12 +94,21 @@ class SpeechGame:
         self.hint_timer = 0
         self.game_completed = False
         self.running = True
+        # Отладочная панель (F3): частота кадров и задержки стадий
+        self.overlay = DebugOverlay()
+        # Каждая попытка сохраняется в профиле игрока
+        self.progress = ProgressStore(settings.PROFILE, front_end="speaking_game_3")
+        self.progress.game_started(GAME_CATEGORY)
+        assets.check([image_path(word) for word in words])
+        self.prefetch_neighbour_images()
 
+    @timed
     def draw_text_center(self, text, y, font, color=WHITE):
-        rendered = font.render(text, True, color)
+        rendered = text_cache.render(font, text, True, color)
         x = WIDTH // 2 - rendered.get_width() // 2
-        screen.blit(rendered, (x, y))
+        return screen.blit(rendered, (x, y))
 
+    @timed
     def draw_progress_bar(self, current, total, y_pos=10):
         bar_width, bar_height = 600, 20
         x_pos = WIDTH // 2 - bar_width // 2
@@ -57,60 +118,99 @@ class SpeechGame:
             filled_width = int(bar_width * progress)
             pygame.draw.rect(screen, GREEN, (x_pos, y_pos, filled_width, bar_height))
         progress_text = f"{current}/{total}"
-        text_surf = font_medium.render(progress_text, True, WHITE)
+        text_surf = text_cache.render(font_medium, progress_text, True, WHITE)
         screen.blit(text_surf, (x_pos + bar_width + 10, y_pos))
 
+    @timed
     def draw_recording_indicator(self):
-        center_x, center_y = WIDTH // 2, 350
-        radius = 20 + (self.frame_counter % 10)
-        for r in range(radius, radius + 15, 3):
-            alpha = 150 - (r - radius) * 10
-            if alpha > 0:
-                s = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-                pygame.draw.circle(s, (255,0,0,alpha), (r, r), r)
-                screen.blit(s, (center_x - r, center_y - r))
-        pygame.draw.circle(screen, RED, (center_x, center_y), 20)
-
-    def recognize_speech(self):
+        return recording_pulse.draw(screen, RECORDING_CENTER, self.frame_counter)
+
+    def make_recognizer(self):
+        # Порог задается перед каждой фразой в recognize_speech
+        return sr.Recognizer()
+
+    def calibrate_microphone(self):
         recognizer = sr.Recognizer()
         try:
-            with sr.Microphone() as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1)
-                audio = recognizer.listen(source, timeout=5, phrase_time_limit=5)
-            text = recognizer.recognize_google(audio, language="ru-RU")
-            return text.lower()
+            with self.microphone_source() as source:
+                with timing.stage("adjust_for_ambient_noise"): recognizer.adjust_for_ambient_noise(source, duration=1)
+            self.noise_floor.update_from(recognizer)
+            self.noise_floor.save()
+        except Exception as e: print(f"⚠️ Калибровка микрофона не удалась: {e}")
+
+    def recognize_speech(self, job):
+        recognizer = job.state
+        try:
+            with self.microphone_lock:
+                if job.cancelled: return None
+                # Распознаватели потоков пула слушают по очереди: каждый начинает с общей оценки шума
+                # и возвращает в нее порог, подстроенный за время ожидания фразы
+                self.noise_floor.apply_to(recognizer)
+                try:
+                    with self.microphone_source() as source:
+                        source.stream = CancellableStream(source.stream, job)
+                        with timing.stage("record_audio"): audio = recognizer.listen(source, timeout=5, phrase_time_limit=5)
+                finally:
+                    self.noise_floor.update_from(recognizer)
+            # Ответ для уже пропущенного слова не отправляем на распознавание
+            if job.cancelled: return None
+            recognition_start = time.perf_counter()
+            answers = [word.ru for word in words]
+            with timing.stage("recognize_speech"): alternatives = self.backend.recognize_alternatives(audio, "ru-RU", answers)
+            expected = words[job.event_fields["word_index"]].ru
+            job.latency = time.perf_counter() - recognition_start
+            return resolve_answer(alternatives, answers, "ru", expected)
+        except ListenCancelled: return None
         except sr.WaitTimeoutError: return "timeout"
         except sr.UnknownValueError: return "unknown"
         except Exception: return "error"
 
-    def speech_recognition_task(self):
-        result = self.recognize_speech()
-        self.is_listening = False
-        self.recognition_result = result
-
     def start_listening(self):
         if not self.is_listening:
             self.is_listening = True
             self.recognition_result = "Слушаю..."
             self.show_translation = False
             self.show_hint = False
-            thread = threading.Thread(target=self.speech_recognition_task)
-            thread.daemon = True
-            thread.start()
+            self.current_job = self.recognition_pool.submit(self.recognize_speech, word_index=self.current_word_index)
             self.total_attempts += 1
 
+    def cancel_listening(self):
+        if self.current_job: self.current_job.cancel()
+        self.current_job = None
+        self.is_listening = False
+
+    def handle_recognition_done(self, event):
+        # Поздние результаты отмененных задач и других слов не засчитываются
+        if event.job is not self.current_job or event.word_index != self.current_word_index: return
+        self.current_job = None
+        self.is_listening = False
+        self.recognition_result = event.result
+        self.process_recognition_result()
+        current_word = words[self.current_word_index]
+        recognized = None if event.result in (None, "timeout", "unknown", "error") else event.result
+        self.progress.attempt(current_word, event.result == current_word.ru, current_word.ru, recognized,
+                              latency=getattr(event.job, "latency", None))
+
+    def prefetch_neighbour_images(self):
+        neighbours = (self.current_word_index - 1, self.current_word_index + 1)
+        paths = [assets.resolve(image_path(words[i])) for i in neighbours if 0 <= i < len(words)]
+        image_cache.prefetch([path for path in paths if path], IMAGE_SIZE)
+
     def next_word(self):
         if self.current_word_index < len(words) - 1:
             self.current_word_index += 1
             self.reset_current_word_state()
+            self.prefetch_neighbour_images()
         else: self.game_completed = True
 
     def previous_word(self):
         if self.current_word_index > 0:
             self.current_word_index -= 1
             self.reset_current_word_state()
+            self.prefetch_neighbour_images()
 
     def reset_current_word_state(self):
+        self.cancel_listening()
         self.recognition_result = ""
         self.show_translation = False
         self.show_hint = False
@@ -123,7 +223,7 @@ class SpeechGame:
     def process_recognition_result(self):
         if not self.recognition_result or self.recognition_result == "Слушаю...": return
         current_word = words[self.current_word_index]
-        if self.recognition_result == current_word["ru"]:
+        if self.recognition_result == current_word.ru:
             if self.last_correct_word_index != self.current_word_index:
                 self.correct_count += 1
                 self.last_correct_word_index = self.current_word_index
@@ -132,13 +232,14 @@ class SpeechGame:
         if not self.recognition_result: return "", WHITE
         if self.recognition_result == "Слушаю...": return "Слушаю...", LIGHT_BLUE
         current_word = words[self.current_word_index]
-        if self.recognition_result == current_word["ru"]:
+        if self.recognition_result == current_word.ru:
             return f"Вы сказали: {self.recognition_result}", GREEN
         error_messages = {"timeout": "Время ожидания истекло", "unknown": "Речь не распознана", "error": "Ошибка распознавания"}
         display_text = error_messages.get(self.recognition_result, f"Вы сказали: {self.recognition_result}")
         return display_text, RED
 
-    def draw_game_screen(self):
+    @timed
+    def draw_static_game_screen(self):
         screen.fill(DARK_BLUE)
         current_word = words[self.current_word_index]
         
@@ -146,40 +247,55 @@ class SpeechGame:
         self.draw_progress_bar(self.current_word_index + 1, len(words))
         
         # Изображение
-        try:
-            img = pygame.image.load(current_word["img"])
-            img = pygame.transform.scale(img, (400, 300))
-            screen.blit(img, (WIDTH//2 - 200, HEIGHT//2 - 150))
-        except: pass
+        path = assets.resolve(image_path(current_word))
+        img = image_cache.get(path, IMAGE_SIZE) if path else None
+        if img: screen.blit(img, (WIDTH//2 - 200, HEIGHT//2 - 150))
         
         # Текущее слово
-        self.draw_text_center(f"Слово: {current_word['ru']}", 50, font_big, BLUE)
+        self.draw_text_center(f"Слово: {current_word.ru}", 50, font_big, BLUE)
+        
+        # Инструкции
+        self.draw_text_center("ПРОБЕЛ - говорить, ENTER - следующее слово", 520, font_medium, WHITE)
+        self.draw_text_center("←/→ - навигация, T - перевод, H - подсказка, R - сброс", 550, font_medium, WHITE)
+
+    @timed
+    def draw_game_screen(self):
+        renderer.begin(("game", self.current_word_index), self.draw_static_game_screen)
+        current_word = words[self.current_word_index]
         
         # Результат распознавания
         display_text, color = self.get_recognition_display_text()
-        if display_text: self.draw_text_center(display_text, 380, font_medium, color)
+        if display_text:
+            renderer.region("result", renderer.row(380, font_medium), (display_text, color),
+                            lambda: self.draw_text_center(display_text, 380, font_medium, color))
         
         # Перевод
         if self.show_translation:
-            self.draw_text_center(f"Перевод: {current_word['en']}", 420, font_medium, GOLD)
+            renderer.region("translation", renderer.row(420, font_medium), current_word.en,
+                            lambda: self.draw_text_center(f"Перевод: {current_word.en}", 420, font_medium, GOLD))
         
         # Подсказка
         if self.show_hint:
-            self.draw_text_center(f"Подсказка: {current_word['ru'][0]}...", 450, font_medium, LIGHT_BLUE)
+            renderer.region("hint", renderer.row(450, font_medium), current_word.ru,
+                            lambda: self.draw_text_center(f"Подсказка: {current_word.ru[0]}...", 450, font_medium, LIGHT_BLUE))
         
         # Статистика
         if self.total_attempts > 0:
             accuracy = int((self.correct_count / self.total_attempts) * 100)
-            self.draw_text_center(f"Правильно: {self.correct_count}/{self.total_attempts} ({accuracy}%)", 480, font_medium, LIGHT_BLUE)
-        
-        # Инструкции
-        self.draw_text_center("ПРОБЕЛ - говорить, ENTER - следующее слово", 520, font_medium, WHITE)
-        self.draw_text_center("←/→ - навигация, T - перевод, H - подсказка, R - сброс", 550, font_medium, WHITE)
+            stats_text = f"Правильно: {self.correct_count}/{self.total_attempts} ({accuracy}%)"
+            renderer.region("stats", renderer.row(480, font_medium), stats_text,
+                            lambda: self.draw_text_center(stats_text, 480, font_medium, LIGHT_BLUE))
         
         # Индикатор записи
         if self.is_listening:
-            self.draw_recording_indicator()
-            self.draw_text_center("Запись... ГОВОРИТЕ СЕЙЧАС", 320, font_medium, RED)
+            indicator_rect = recording_pulse.rect(RECORDING_CENTER)
+            renderer.region("recording", indicator_rect.union(renderer.row(320, font_medium)), self.frame_counter % len(recording_pulse),
+                            self.draw_recording)
+
+    @timed
+    def draw_recording(self):
+        self.draw_recording_indicator()
+        self.draw_text_center("Запись... ГОВОРИТЕ СЕЙЧАС", 320, font_medium, RED)
 
     def show_final_screen(self):
         screen.fill(DARK_BLUE)
@@ -190,37 +306,49 @@ class SpeechGame:
             self.draw_text_center(f"Точность: {accuracy}%", HEIGHT//2 + 20, font_medium, GOLD)
         self.draw_text_center("Нажми любую клавишу для выхода", HEIGHT//2 + 120, font_medium, WHITE)
         pygame.display.flip()
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type in (pygame.QUIT, pygame.KEYDOWN): waiting = False
+        # Экран не меняется: ожидание нажатия без опроса событий в цикле
+        while pygame.event.wait().type not in (pygame.QUIT, pygame.KEYDOWN): pass
+
+    @timed
+    def step(self, events):
+        """Один кадр: события, подсказка и отрисовка"""
+        self.frame_counter += 1
+        for event in events:
+            if event.type == pygame.QUIT: self.running = False
+            elif event.type == RECOGNITION_DONE: self.handle_recognition_done(event)
+            elif self.overlay.handle_event(event): continue
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE and not self.game_completed: self.start_listening()
+                elif event.key == pygame.K_RETURN and not self.game_completed: self.next_word()
+                elif event.key == pygame.K_t and not self.game_completed: self.show_translation = not self.show_translation
+                elif event.key == pygame.K_h and not self.game_completed: self.show_hint = True
+                elif event.key == pygame.K_r and not self.game_completed: self.reset_current_word_state()
+                elif event.key == pygame.K_LEFT and not self.game_completed: self.previous_word()
+                elif event.key == pygame.K_RIGHT and not self.game_completed: self.next_word()
+                elif event.key == pygame.K_ESCAPE: self.running = False
+        
+        self.update_hint_timer()
+        self.draw_game_screen()
+        self.overlay.draw(renderer)
+        renderer.present()
+        self.overlay.frame()
 
     def run(self):
+        events = pygame.event.get()
         while self.running:
-            self.frame_counter += 1
             if self.game_completed:
                 self.show_final_screen()
                 break
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: self.running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE and not self.game_completed: self.start_listening()
-                    elif event.key == pygame.K_RETURN and not self.game_completed: self.next_word()
-                    elif event.key == pygame.K_t and not self.game_completed: self.show_translation = not self.show_translation
-                    elif event.key == pygame.K_h and not self.game_completed: self.show_hint = True
-                    elif event.key == pygame.K_r and not self.game_completed: self.reset_current_word_state()
-                    elif event.key == pygame.K_LEFT and not self.game_completed: self.previous_word()
-                    elif event.key == pygame.K_RIGHT and not self.game_completed: self.next_word()
-                    elif event.key == pygame.K_ESCAPE: self.running = False
-            
-            self.update_hint_timer()
-            self.process_recognition_result()
-            self.draw_game_screen()
-            pygame.display.flip()
-            clock.tick(60)
+            self.step(events)
+            if self.running and not self.game_completed:
+                # Полная частота кадров нужна только индикатору записи; в остальное время цикл ждет событий
+                events = next_events(clock, self.is_listening, idle_timeout=self.overlay.idle_timeout(IDLE_TIMEOUT))
 
 if __name__ == "__main__":
     game = SpeechGame()
     game.run()
+    # В этой игре нет очков: правильные ответы видны в истории попыток
+    game.progress.game_finished(completed=game.game_completed)
+    game.progress.close()
+    game.noise_floor.save()
     pygame.quit()
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Сопоставление вариантов распознавания с ответами категории"""
+import pytest
+
+from answer_matching import AnswerIndex, normalize, resolve_answer
+
+ANSWERS = ["cat", "dog", "elephant", "butterfly", "house", "mouse", "ice cream"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AnswerIndex(ANSWERS)
+
+
+def test_normalize_drops_articles_case_and_punctuation():
+    assert normalize("The Cat!") == "cat"
+    assert normalize("Ёж") == "еж"
+
+
+@pytest.mark.parametrize("text, answer", [
+    ("cat", "cat"),
+    ("A cat.", "cat"),
+    ("cats", "cat"),
+    ("butterflies", "butterfly"),
+    ("I see a dog", "dog"),
+])
+def test_exact_forms(index, text, answer):
+    assert index.match(text) == answer
+
+
+@pytest.mark.parametrize("text, answer", [
+    ("elefant", "elephant"),
+    ("elephnt", "elephant"),
+    ("butterfy", "butterfly"),
+    ("mous", "mouse"),
+])
+def test_typos_within_edit_distance(index, text, answer):
+    assert index.match(text) == answer
+
+
+@pytest.mark.parametrize("text", ["ice cream", "Ice-cream", "icecream", "ice creams", "I want ice cream please"])
+def test_multi_word_phrase(index, text):
+    assert index.match(text) == "ice cream"
+
+
+@pytest.mark.parametrize("text", [
+    "cap",       # короткие слова сравниваются только точно и по звучанию
+    "table",
+    "louse",     # одна опечатка и до house, и до mouse
+    "element",   # три отличия от elephant
+    "ice",
+    "",
+    "the",
+])
+def test_near_misses_rejected(index, text):
+    assert index.match(text) is None
+
+
+def test_russian_answers():
+    index = AnswerIndex(["ёж", "кошка", "собака"], language="ru")
+    assert index.match("еж") == "ёж"
+    assert index.match("кашка") == "кошка"
+    assert index.match("коза") is None
+
+
+def test_match_any_prefers_expected_answer(index):
+    assert index.match_any(["hat", "cat", "dog"], expected="dog") == ("dog", "dog")
+    assert index.match_any(["hat", "cat", "dog"]) == ("cat", "cat")
+    assert index.match_any(["hat", "table"]) is None
+
+
+def test_resolve_answer_falls_back_to_best_alternative():
+    assert resolve_answer(["Hat", "cats"], ANSWERS) == "cat"
+    assert resolve_answer(["Table"], ANSWERS) == "table"
+    assert resolve_answer([], ANSWERS) is None
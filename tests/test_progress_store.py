@@ -0,0 +1,52 @@
+"""Хранилище прогресса: первый запуск нескольких игр и итоги без очков"""
+import json
+import multiprocessing
+import sqlite3
+
+import progress_store
+from progress_store import ProgressStore
+
+
+def open_store(path, legacy_path, profile):
+    """Открытие хранилища в отдельном процессе; текст ошибки или None"""
+    progress_store.LEGACY_STATS_FILE = legacy_path
+    try:
+        ProgressStore(profile, path=path).close()
+    except Exception as e:
+        return repr(e)
+    return None
+
+
+def test_legacy_stats_imported_once_when_games_start_together(tmp_path):
+    legacy = tmp_path / "game_stats.json"
+    legacy.write_text(json.dumps({"games_played": 3, "total_score": 40, "best_score": 20,
+                                  "words_learned": ["кот"]}), encoding="utf-8")
+    profiles = ["default"] * 4 + ["anna"] * 4
+    with multiprocessing.Pool(len(profiles)) as pool:
+        # Несколько первых запусков подряд: гонка проявляется не каждый раз
+        for attempt in range(5):
+            path = str(tmp_path / f"progress_{attempt}.db")
+            errors = pool.starmap(open_store, [(path, str(legacy), profile) for profile in profiles])
+            assert [error for error in errors if error] == []
+
+            connection = sqlite3.connect(path)
+            assert connection.execute("SELECT SUM(games_played), SUM(total_score) FROM profiles").fetchone() == (3, 40)
+            assert connection.execute("SELECT COUNT(*) FROM profiles").fetchone() == (2,)
+            connection.close()
+
+
+def test_game_without_score_keeps_profile_totals(tmp_path, monkeypatch):
+    monkeypatch.setattr(progress_store, "LEGACY_STATS_FILE", str(tmp_path / "missing.json"))
+    path = str(tmp_path / "progress.db")
+    store = ProgressStore(path=path)
+    store.game_started()
+    store.game_finished(completed=True)
+    store.game_started()
+    store.game_finished(7)
+    store.close()
+    assert (store.stats["total_score"], store.stats["best_score"]) == (7, 7)
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT score FROM games ORDER BY id").fetchall() == [(None,), (7,)]
+    assert connection.execute("SELECT games_played, total_score FROM profiles").fetchone() == (2, 7)
+    connection.close()
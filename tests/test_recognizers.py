@@ -0,0 +1,38 @@
+"""Детерминированный движок распознавания fake"""
+import pytest
+import speech_recognition as sr
+
+from recognizers import FakeBackend, audio_digest, create_backend
+
+
+def make_audio(value):
+    return sr.AudioData(bytes([value]) * 3200, 16000, 2)
+
+
+def test_transcript_found_by_audio_digest():
+    audio = make_audio(1)
+    backend = FakeBackend(transcripts={audio_digest(audio): "cat"}, responses=["dog"])
+    assert backend.recognize(audio, "en-US") == "cat"
+    # Ответ по отпечатку не расходует очередь ответов
+    assert backend.recognize(make_audio(2), "en-US") == "dog"
+    assert backend.calls == 2
+
+
+def test_responses_in_order_then_default():
+    backend = FakeBackend(responses=["cat", ["dog", "dot"]], default="house")
+    audio = make_audio(0)
+    assert backend.recognize_alternatives(audio, "en-US") == ["cat"]
+    assert backend.recognize_alternatives(audio, "en-US") == ["dog", "dot"]
+    assert backend.recognize(audio, "en-US") == "house"
+
+
+def test_empty_response_is_unintelligible():
+    backend = FakeBackend(responses=[None])
+    with pytest.raises(sr.UnknownValueError):
+        backend.recognize(make_audio(0), "en-US")
+    with pytest.raises(sr.UnknownValueError):
+        backend.recognize(make_audio(0), "en-US")
+
+
+def test_create_backend_by_name():
+    assert isinstance(create_backend("FAKE"), FakeBackend)
@@ -0,0 +1,99 @@
+"""Интервальное повторение слов"""
+import random
+
+import pytest
+
+from scheduler import DAY, DEFAULT_EASE, DUE, INTERVAL, MIN_EASE, RELEARN_INTERVAL, Scheduler
+from vocabulary import Word
+
+NOW = 1_000_000.0
+
+
+class FakeVocabulary:
+    """Словарь с категориями из списков русских слов"""
+
+    def __init__(self, categories):
+        self._words = {category_id: [Word(ru, ru + "_en", category_id, None) for ru in words]
+                       for category_id, words in categories.items()}
+
+    def categories(self):
+        return {category_id: category_id for category_id in self._words}
+
+    def words(self, category_id):
+        return self._words[category_id]
+
+
+@pytest.fixture
+def vocabulary():
+    return FakeVocabulary({
+        "animals": ["кот", "собака", "лиса", "волк"],
+        "food": ["хлеб", "сыр", "суп"],
+        "colors": ["красный", "синий"],
+    })
+
+
+def make_scheduler(vocabulary, states=None, **kwargs):
+    return Scheduler(vocabulary, {} if states is None else states, now=NOW, rng=random.Random(1), **kwargs)
+
+
+def test_overdue_words_come_before_new_and_future_ones(vocabulary):
+    states = {
+        "лиса": [NOW - DAY, DEFAULT_EASE, DAY, 1],
+        "волк": [NOW - 2 * DAY, DEFAULT_EASE, DAY, 1],
+        "кот": [NOW + DAY, DEFAULT_EASE, DAY, 1],
+    }
+    words = make_scheduler(vocabulary, states).select("animals", 4)
+    assert [word.ru for word in words] == ["волк", "лиса", "собака", "кот"]
+
+
+def test_short_category_is_filled_from_related_ones(vocabulary):
+    words = make_scheduler(vocabulary).select("colors", 6)
+    assert len(words) == 6
+    assert len({word.ru for word in words}) == 6
+    assert {word.ru for word in words[:2]} == {"красный", "синий"}
+    # Соседние категории чередуются
+    assert [word.category for word in words[2:4]] == ["food", "animals"]
+
+
+def test_select_more_words_than_vocabulary(vocabulary):
+    words = make_scheduler(vocabulary).select("animals", 20)
+    assert len(words) == 9
+
+
+def test_correct_answers_grow_interval(vocabulary):
+    scheduler = make_scheduler(vocabulary)
+    word = vocabulary.words("animals")[0]
+    intervals = []
+    now = NOW
+    for _ in range(4):
+        scheduler.review(word, True, now=now)
+        state = scheduler.states[word.ru]
+        intervals.append(state[INTERVAL])
+        assert state[DUE] == now + state[INTERVAL]
+        now = state[DUE]
+    assert intervals == [DAY, 6 * DAY, 6 * DAY * DEFAULT_EASE, 6 * DAY * DEFAULT_EASE ** 2]
+
+
+def test_wrong_answer_relearns_soon_and_lowers_ease(vocabulary):
+    scheduler = make_scheduler(vocabulary, {"кот": [NOW, 1.4, 6 * DAY, 2]})
+    word = vocabulary.words("animals")[0]
+    scheduler.review(word, False, now=NOW)
+    due, ease, interval, reps = scheduler.states["кот"]
+    assert (due, interval, reps) == (NOW + RELEARN_INTERVAL, RELEARN_INTERVAL, 0)
+    assert ease == MIN_EASE
+
+
+def test_reviewed_word_moves_back_in_queue(vocabulary):
+    scheduler = make_scheduler(vocabulary)
+    first = scheduler.select("food", 1)[0]
+    scheduler.review(first, True, now=NOW)
+    assert first not in scheduler.select("food", 2)
+    assert scheduler.select("food", 3)[-1] == first
+
+
+def test_learned_words_start_with_first_interval_and_report_changes(vocabulary):
+    changes = []
+    scheduler = make_scheduler(vocabulary, learned=["сыр"], on_change=lambda word, state: changes.append(word))
+    assert scheduler.states["сыр"] == [NOW + DAY, DEFAULT_EASE, DAY, 1]
+    scheduler.review(vocabulary.words("food")[0], False, now=NOW)
+    assert changes == ["сыр", "хлеб"]
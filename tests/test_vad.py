@@ -0,0 +1,82 @@
+"""Определение речи и конца фразы на синтетических сигналах"""
+import numpy as np
+import pytest
+
+from audio_capture import VoiceActivityDetector
+from noise_floor import NoiseFloor
+
+RATE = 16000
+BLOCK = 320
+
+
+def tone(seconds, amplitude=0.3, frequency=300.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def silence(seconds, amplitude=0.0, seed=0):
+    noise = np.random.default_rng(seed).normal(0.0, amplitude * 32767, int(seconds * RATE))
+    return noise.astype(np.int16)
+
+
+def feed(vad, signal):
+    """Подача сигнала блоками; позиция (в сэмплах), на которой фраза закончилась, или None"""
+    vad.reset(RATE)
+    for start in range(0, len(signal), BLOCK):
+        if vad.update(signal[start:start + BLOCK]):
+            return start + BLOCK
+    return None
+
+
+def test_phrase_ends_after_trailing_silence():
+    vad = VoiceActivityDetector(trailing_silence=0.5)
+    signal = np.concatenate([silence(0.3), tone(0.6), silence(2.0)])
+    end = feed(vad, signal)
+    assert end is not None
+    assert vad.speech_start == pytest.approx(0.3 * RATE, abs=BLOCK)
+    assert vad.speech_end == pytest.approx(0.9 * RATE, abs=BLOCK)
+    assert end - vad.speech_end == pytest.approx(0.5 * RATE, abs=BLOCK)
+
+
+def test_trim_keeps_speech_with_padding():
+    vad = VoiceActivityDetector(trailing_silence=0.5, padding=0.1)
+    signal = np.concatenate([silence(1.0), tone(0.6), silence(1.0)])
+    feed(vad, signal)
+    trimmed = vad.trim(signal)
+    assert len(trimmed) == pytest.approx((0.6 + 2 * 0.1) * RATE, abs=2 * BLOCK)
+
+
+def test_silence_never_ends_phrase():
+    vad = VoiceActivityDetector()
+    signal = silence(3.0, amplitude=0.002)
+    assert feed(vad, signal) is None
+    assert vad.speech_start is None
+    assert len(vad.trim(signal)) == 0
+
+
+def test_short_click_is_ignored():
+    vad = VoiceActivityDetector(trailing_silence=0.3, min_speech=0.1)
+    signal = np.concatenate([tone(0.04), silence(1.0)])
+    assert feed(vad, signal) is None
+    assert vad.speech_start is None
+
+
+def test_loud_hiss_is_not_speech():
+    vad = VoiceActivityDetector()
+    hiss = silence(0.1, amplitude=0.2)
+    assert vad.block_features(hiss)[0] > vad.threshold
+    assert not vad.is_speech(hiss)
+    assert vad.is_speech(tone(0.1))
+
+
+def test_noise_floor_learns_only_from_quiet_blocks():
+    floor = NoiseFloor("test", rms=0.002, path=None)
+    vad = VoiceActivityDetector(trailing_silence=0.5, noise_floor=floor)
+    assert vad.current_threshold() == floor.threshold
+
+    # Блоки громче половины порога (но не речь) и затухание сразу после речи оценку не меняют
+    feed(vad, np.concatenate([silence(0.5, amplitude=0.005, seed=1), tone(0.5), tone(0.1, amplitude=0.003)]))
+    assert floor.rms == pytest.approx(0.002)
+
+    feed(vad, silence(2.0, amplitude=0.001, seed=2))
+    assert floor.rms == pytest.approx(0.001, rel=0.1)
@@ -0,0 +1,243 @@
+"""Замеры времени стадий игры: скользящие задержки, сводка сессии и метрики Prometheus.
+
+Замеры включаются переменной SPEAKING_GAME_TIMING=1. Выключенные, они
+ничего не стоят: timed возвращает функцию без обертки, а stage() — общий
+пустой контекстный менеджер.
+
+    @timed
+    def recognize_speech(...): ...
+
+    with stage("save_progress"):
+        ...
+
+После start_session(front_end) фоновый поток обновляет файл метрик
+<front_end>.prom в settings.TIMING_DIR раз в EXPORT_INTERVAL секунд (для
+сборщика textfile в node_exporter), а при выходе рядом пишется сводка сессии
+в JSON. Замеры сами ничего не пишут на диск; если записать файлы не удалось,
+выгрузка выключается до конца сессии.
+"""
+import atexit
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import settings
+
+ENABLED = settings.TIMING
+# Число последних замеров стадии для скользящих задержек
+WINDOW = 256
+EXPORT_INTERVAL = 10.0
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageStats:
+    """Счетчики одной стадии: все вызовы и последние WINDOW замеров"""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=WINDOW)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        """Квантиль последних замеров в секундах"""
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def summary(self):
+        """Сводка стадии в миллисекундах"""
+        result = {"count": self.count, "total_ms": round(self.total * 1000, 3),
+                  "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                  "max_ms": round(self.max * 1000, 3)}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}_ms"] = round(self.quantile(q) * 1000, 3)
+        return result
+
+
+class Timings:
+    """Замеры стадий процесса; add() можно вызывать из любых потоков.
+
+    gauges — мгновенные значения для метрик (например, частота кадров):
+    имя -> функция без аргументов.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or settings.TIMING_DIR
+        self.front_end = None
+        self.started = time.time()
+        self.stages = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+        self.exporting = False
+        self._stop = threading.Event()
+        self._exporter = None
+
+    def add(self, name, seconds):
+        """Замер стадии name длительностью seconds"""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.add(seconds)
+
+    def recent(self, name, q=0.5):
+        """Скользящая задержка стадии (квантиль q последних замеров) в миллисекундах или None"""
+        with self._lock:
+            stats = self.stages.get(name)
+            return stats.quantile(q) * 1000 if stats is not None and stats.recent else None
+
+    def snapshot(self):
+        """Сводка всех стадий: имя -> словарь в миллисекундах"""
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self.stages.items())}
+
+    def start_session(self, front_end):
+        """Начало сессии игры: периодическая выгрузка метрик и сводка при выходе"""
+        self.front_end = front_end
+        self.started = time.time()
+        self.exporting = True
+        self._stop.clear()
+        self._exporter = threading.Thread(target=self._export_loop)
+        self._exporter.daemon = True
+        self._exporter.start()
+        atexit.register(self.finish_session)
+
+    def finish_session(self):
+        """Последняя выгрузка метрик и сводка сессии"""
+        if self._exporter is None:
+            return
+        self._stop.set()
+        self._exporter.join()
+        self._exporter = None
+        self._export(self.write_prometheus)
+        self._export(self.write_summary)
+
+    def _export_loop(self):
+        while not self._stop.wait(EXPORT_INTERVAL):
+            self._export(self.write_prometheus)
+
+    def _export(self, write):
+        """Запись файла замеров; при первой ошибке выгрузка выключается"""
+        if not self.exporting:
+            return
+        try:
+            write()
+        except OSError as e:
+            print(f"⚠️ Не удалось записать замеры в {self.directory} ({e}), выгрузка выключена")
+            self.exporting = False
+            self._stop.set()
+
+    def _path(self, name):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, name)
+
+    def write_summary(self):
+        """Сводка сессии в JSON; возвращает путь к файлу"""
+        started = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = self._path(f"{self.front_end}_{started}_{os.getpid()}.json")
+        summary = {
+            "front_end": self.front_end,
+            "profile": settings.PROFILE,
+            "started": self.started,
+            "duration": round(time.time() - self.started, 3),
+            "gauges": {name: gauge() for name, gauge in self.gauges.items()},
+            "stages": self.snapshot(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return path
+
+    def prometheus_text(self):
+        """Метрики в текстовом формате Prometheus"""
+        labels = f'front_end="{self.front_end}",profile="{_escape(settings.PROFILE)}"'
+        lines = ["# HELP speaking_game_stage_seconds Time spent in game stages (quantiles over recent calls).",
+                 "# TYPE speaking_game_stage_seconds summary"]
+        with self._lock:
+            stages = sorted(self.stages.items())
+            for name, stats in stages:
+                stage_labels = f'{labels},stage="{name}"'
+                for q in QUANTILES:
+                    lines.append(f'speaking_game_stage_seconds{{{stage_labels},quantile="{q}"}} {stats.quantile(q):.6f}')
+                lines.append(f"speaking_game_stage_seconds_sum{{{stage_labels}}} {stats.total:.6f}")
+                lines.append(f"speaking_game_stage_seconds_count{{{stage_labels}}} {stats.count}")
+        for name, gauge in sorted(self.gauges.items()):
+            lines.append(f"# TYPE speaking_game_{name} gauge")
+            lines.append(f"speaking_game_{name}{{{labels}}} {gauge():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        """Файл метрик <front_end>.prom; заменяется целиком, чтобы сборщик не прочитал его наполовину"""
+        path = self._path(f"{self.front_end}.prom")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary, path)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Общие замеры процесса
+timings = Timings()
+
+
+def timed(func):
+    """Декоратор: замер вызовов функции как стадии с ее именем"""
+    if not ENABLED:
+        return func
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.add(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def _stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+def stage(name):
+    """Контекстный менеджер: замер блока кода как стадии name"""
+    return _stage(name) if ENABLED else _NO_STAGE
+
+
+def record(name, seconds):
+    """Замер стадии, время которой измерено вызывающим кодом"""
+    if ENABLED:
+        timings.add(name, seconds)
+
+
+def start_session(front_end):
+    """Начало сессии игры (без включенных замеров ничего не делает)"""
+    if ENABLED:
+        timings.start_session(front_end)
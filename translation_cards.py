@@ -0,0 +1,147 @@
+"""Карточки перевода для визуального режима: отрисовка в памяти и фоновая подготовка"""
+import threading
+
+import pygame
+
+from render_cache import display_ready, font_lock
+from timing import timed
+
+CARD_SIZE = (800, 600)
+BACKGROUND = (30, 30, 50)
+FRAME = (100, 100, 150)
+TITLE_COLOR = (255, 215, 0)
+WORD_COLOR = (255, 255, 255)
+RUSSIAN_COLOR = (100, 200, 100)
+ENGLISH_COLOR = (100, 200, 255)
+INSTRUCTION_COLOR = (255, 150, 100)
+# Место для картинки слова на свободном поле слева
+PICTURE_RECT = pygame.Rect(40, 130, 220, 165)
+
+_fonts = {}
+
+
+def card_font(size):
+    """Шрифт карточки; создается один раз на размер"""
+    with font_lock:
+        if size not in _fonts:
+            _fonts[size] = pygame.font.SysFont("Arial", size)
+        return _fonts[size]
+
+
+def _render_text(font, text, color):
+    # Основной поток в это время может рисовать текст через text_cache
+    with font_lock:
+        return font.render(text, True, color)
+
+
+def _blit_centered(card, text, font, color, y):
+    surface = _render_text(font, text, color)
+    card.blit(surface, ((CARD_SIZE[0] - surface.get_width()) // 2, y))
+
+
+def _blit_at(card, text, font, color, position):
+    card.blit(_render_text(font, text, color), position)
+
+
+@timed
+def render_card(russian_word, english_translation, picture=None):
+    """Карточка с русским словом, переводом и картинкой слова (если есть)"""
+    width, height = CARD_SIZE
+    title_font, info_font = card_font(48), card_font(20)
+    card = pygame.Surface(CARD_SIZE)
+    card.fill(BACKGROUND)
+
+    # Заголовок и разделительная линия
+    _blit_centered(card, "🎓 ОБУЧЕНИЕ АНГЛИЙСКОМУ", title_font, TITLE_COLOR, 30)
+    pygame.draw.line(card, FRAME, (50, 100), (width - 50, 100), 2)
+
+    if picture is not None:
+        scale = min(PICTURE_RECT.width / picture.get_width(), PICTURE_RECT.height / picture.get_height())
+        size = (int(picture.get_width() * scale), int(picture.get_height() * scale))
+        card.blit(pygame.transform.smoothscale(picture, size), PICTURE_RECT.topleft)
+
+    # Русское слово и перевод
+    _blit_centered(card, russian_word.upper(), title_font, WORD_COLOR, 150)
+    _blit_at(card, "РУССКИЙ", info_font, RUSSIAN_COLOR, (width // 2 - 100, 220))
+    arrow_y = 280
+    pygame.draw.polygon(card, ENGLISH_COLOR,
+                        [(width // 2 - 20, arrow_y), (width // 2 + 20, arrow_y), (width // 2, arrow_y + 40)])
+    _blit_at(card, "ПЕРЕВОД", info_font, ENGLISH_COLOR, (width // 2 - 30, arrow_y + 50))
+    _blit_centered(card, english_translation.upper(), title_font, ENGLISH_COLOR, 350)
+    _blit_at(card, "АНГЛИЙСКИЙ", info_font, ENGLISH_COLOR, (width // 2 - 100, 420))
+
+    _blit_centered(card, "🎤 Произнесите английское слово вслух после сигнала!", info_font, INSTRUCTION_COLOR, 500)
+    pygame.draw.rect(card, FRAME, (10, 10, width - 20, height - 20), 3)
+    return card
+
+
+class CardDeck:
+    """Карточки слов текущей игры, готовые к выводу на экран.
+
+    prerender() запускает фоновый поток, который рисует карточки всех слов
+    по порядку и сразу приводит их к размеру показа; get() возвращает готовую
+    карточку или рисует ее сразу, если поток до нее еще не дошел. Новый вызов
+    prerender() отменяет предыдущий. Поверхности для показа хранятся вместе с
+    карточками и пересчитываются только при смене размера показа.
+    """
+
+    def __init__(self, display_size=CARD_SIZE):
+        self.display_size = tuple(display_size)
+        self._cards = {}
+        self._display = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def set_display_size(self, size):
+        """Смена размера показа (окно или разметка изменились)"""
+        with self._lock:
+            if tuple(size) != self.display_size:
+                self.display_size = tuple(size)
+                self._display = {}
+
+    def prerender(self, entries):
+        """entries — список (русское слово, перевод, картинка или None)"""
+        with self._lock:
+            self._generation += 1
+            self._cards = {}
+            self._display = {}
+            generation = self._generation
+        thread = threading.Thread(target=self._prerender_worker, args=(generation, list(entries)))
+        thread.daemon = True
+        thread.start()
+
+    def get(self, russian_word, english_translation, picture=None):
+        """Карточка слова размером display_size в формате экрана"""
+        key = (russian_word, english_translation)
+        with self._lock:
+            display = self._display.get(key)
+            card = self._cards.get(key)
+        if display is not None:
+            return display
+        if card is None:
+            card = render_card(russian_word, english_translation, picture)
+        return self._store(key, card, self._generation)
+
+    def _store(self, key, card, generation):
+        display_size = self.display_size
+        display = display_ready(card, display_size)
+        with self._lock:
+            if generation != self._generation:
+                return display
+            self._cards.setdefault(key, card)
+            if display_size == self.display_size:
+                display = self._display.setdefault(key, display)
+            return display
+
+    def _prerender_worker(self, generation, entries):
+        for russian_word, english_translation, picture in entries:
+            key = (russian_word, english_translation)
+            with self._lock:
+                if generation != self._generation:
+                    return
+                if key in self._display:
+                    continue
+                card = self._cards.get(key)
+            if card is None:
+                card = render_card(russian_word, english_translation, picture)
+            self._store(key, card, generation)
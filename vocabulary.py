@@ -0,0 +1,147 @@
+"""Общий словарь игр: категории и слова из data/vocabulary.json с индексами для быстрого поиска"""
+import json
+import os
+import threading
+from collections import namedtuple
+
+from asset_pack import AssetPack, PackError, PACK_FILE, VOCABULARY_FILE
+
+IMAGES_DIR = "images"
+
+# Слово словаря: русское слово, перевод, id категории и имя файла картинки (или None)
+Word = namedtuple("Word", "ru en category image")
+
+
+class Vocabulary:
+    """Словарь, загружаемый при первом обращении.
+
+    Если пакет ресурсов (python assets.py) не старше файла словаря, при
+    запуске читается только его индекс, а слова категории — при обращении к
+    ней. Иначе разбирается data/vocabulary.json. Слова категории
+    превращаются в Word только при обращении к категории, а индексы по
+    русскому и английскому слову и по картинке строятся при первом поиске.
+    """
+
+    def __init__(self, path=VOCABULARY_FILE, pack_path=PACK_FILE):
+        self.path = path
+        self.pack_path = pack_path
+        self._lock = threading.RLock()
+        self._index = None
+        self._pack = None
+        self._raw = None
+        self._words = {}
+        self._by_category_ru = {}
+        self._answers = {}
+        self._indexes = {}
+
+    def _open_pack(self):
+        try:
+            if os.path.getmtime(self.pack_path) < os.path.getmtime(self.path):
+                return None
+            return AssetPack(self.pack_path)
+        except (OSError, PackError):
+            return None
+
+    def _categories(self):
+        """Индекс категорий: id -> {"name", "count", "images"}"""
+        with self._lock:
+            if self._index is None:
+                self._pack = self._open_pack()
+                if self._pack is not None:
+                    self._index = self._pack.categories()
+                else:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._raw = json.load(f)["categories"]
+                    self._index = {
+                        category_id: {"name": category["name"], "count": len(category["words"]),
+                                      "images": sum(1 for entry in category["words"] if entry.get("image"))}
+                        for category_id, category in self._raw.items()
+                    }
+            return self._index
+
+    def _entries(self, category_id):
+        self._categories()
+        if self._pack is not None:
+            return self._pack.category(category_id)["words"]
+        return self._raw[category_id]["words"]
+
+    def categories(self):
+        """Словарь id категории -> название"""
+        return {category_id: category["name"] for category_id, category in self._categories().items()}
+
+    def __contains__(self, category_id):
+        return category_id in self._categories()
+
+    def name(self, category_id):
+        """Название категории"""
+        return self._categories()[category_id]["name"]
+
+    def size(self, category_id):
+        """Число слов в категории"""
+        return self._categories()[category_id]["count"]
+
+    def image_count(self, category_id):
+        """Число слов категории с картинками"""
+        return self._categories()[category_id]["images"]
+
+    def words(self, category_id):
+        """Слова категории (list of Word)"""
+        with self._lock:
+            if category_id not in self._words:
+                self._words[category_id] = [
+                    Word(entry["ru"], entry["en"], category_id, entry.get("image"))
+                    for entry in self._entries(category_id)
+                ]
+            return self._words[category_id]
+
+    def word(self, category_id, word_ru):
+        """Слово категории по русскому написанию"""
+        with self._lock:
+            index = self._by_category_ru.get(category_id)
+            if index is None:
+                index = self._by_category_ru[category_id] = {word.ru: word for word in self.words(category_id)}
+        return index[word_ru]
+
+    def translation(self, category_id, word_ru):
+        """Английский перевод слова категории"""
+        return self.word(category_id, word_ru).en
+
+    def answers(self, category_id):
+        """Ожидаемые ответы категории (английские слова)"""
+        with self._lock:
+            if category_id not in self._answers:
+                self._answers[category_id] = tuple(word.en for word in self.words(category_id))
+            return self._answers[category_id]
+
+    def _field_index(self, field):
+        with self._lock:
+            if field not in self._indexes:
+                index = {}
+                for category_id in self._categories():
+                    for word in self.words(category_id):
+                        key = getattr(word, field)
+                        if key is not None:
+                            index.setdefault(key, []).append(word)
+                self._indexes[field] = index
+            return self._indexes[field]
+
+    def by_ru(self, word_ru):
+        """Все слова с таким русским написанием (из любых категорий)"""
+        return self._field_index("ru").get(word_ru, [])
+
+    def by_en(self, word_en):
+        """Все слова с таким переводом"""
+        return self._field_index("en").get(word_en, [])
+
+    def by_image(self, image):
+        """Все слова с такой картинкой"""
+        return self._field_index("image").get(image, [])
+
+
+def image_path(word):
+    """Путь к картинке слова или None"""
+    return os.path.join(IMAGES_DIR, word.image) if word.image else None
+
+
+# Общий экземпляр для всех игр
+vocabulary = Vocabulary()